@@ -0,0 +1,72 @@
+# api/management/commands/benchmark_auth.py
+import time
+
+from api.authentication import LazyJWTAuthentication
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from finances.models import Currency
+from finances.views import CurrencyViewSet
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the authentication overhead of token, JWT and lazy JWT '
+        'authentication on a cached reference list'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=1000,
+            help='Number of timed requests per authentication class'
+        )
+
+    def handle(self, *args, **options):
+        # Everything runs in one transaction that is rolled back at the end,
+        # so the benchmark never leaves data behind.
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=['testserver']):
+            user = User.objects.create_user(
+                username='benchmark_user',
+                email='benchmark_user@example.com',
+                password='password',
+            )
+            Currency.objects.create(name='Dollar', code='USD', symbol='$', owner=user)
+            access = str(RefreshToken.for_user(user).access_token)
+            headers = {
+                TokenAuthentication: f'Token {Token.objects.create(user=user).key}',
+                JWTAuthentication: f'Bearer {access}',
+                LazyJWTAuthentication: f'Bearer {access}',
+            }
+            self.run_benchmark(headers, options['repeat'])
+            caches['reference'].clear()
+            transaction.set_rollback(True)
+
+    def run_benchmark(self, headers, repeat):
+        factory = APIRequestFactory()
+        self.stdout.write(f'{"authentication":<24}{"queries":>9}{"ms/request":>12}')
+        for authentication_class, header in headers.items():
+            view = CurrencyViewSet.as_view(
+                {'get': 'list'}, authentication_classes=[authentication_class])
+            # Warm the reference cache, so only authentication is left
+            view(factory.get('/api/v1/currencies/', HTTP_AUTHORIZATION=header))
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    response = view(factory.get(
+                        '/api/v1/currencies/', HTTP_AUTHORIZATION=header))
+                    response.render()
+                elapsed = time.perf_counter() - started
+            assert response.status_code == 200, response.status_code
+            self.stdout.write(
+                f'{authentication_class.__name__:<24}'
+                f'{len(queries) / repeat:>9.1f}{elapsed / repeat * 1000:>12.3f}'
+            )
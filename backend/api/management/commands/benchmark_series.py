@@ -0,0 +1,127 @@
+# api/management/commands/benchmark_series.py
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+import orjson
+from api.middleware import compress_content, supported_encodings
+from api.renderers import ORJSONRenderer, SeriesRenderer
+from api.series import decode_report
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+from finances.models import Account, AccountBalanceHistory, AccountType, Bank, Currency
+from finances.views import AccountsBalanceHistoryView
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare payload size and parse time of the balance history endpoint '
+        'in plain JSON and in the compact series encoding'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--accounts', type=int, default=5,
+            help='Number of accounts to generate'
+        )
+        parser.add_argument(
+            '--days', type=int, default=3650,
+            help='Number of days of balance history per account'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=10,
+            help='Number of timed renders and parses per format'
+        )
+
+    def handle(self, *args, **options):
+        # Everything runs in one transaction that is rolled back at the end,
+        # so the benchmark never leaves data behind.
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=['testserver']):
+            user = self.generate_data(options['accounts'], options['days'])
+            self.run_benchmark(user, options['days'], options['repeat'])
+            transaction.set_rollback(True)
+
+    def generate_data(self, accounts, days):
+        user = User.objects.create_user(
+            username='benchmark_user',
+            email='benchmark_user@example.com',
+            password='password',
+        )
+        currency = Currency.objects.create(
+            name='Dollar', code='USD', symbol='$', owner=user)
+        account_type = AccountType.objects.create(name='Savings', owner=user)
+        bank = Bank.objects.create(name='Test Bank', country='USA', owner=user)
+
+        # bulk_create skips the rollup signals, which are irrelevant here
+        start_date = timezone.localdate() - timedelta(days=days - 1)
+        for index in range(accounts):
+            account = Account.objects.create(
+                name=f'Benchmark Account {index}',
+                account_type=account_type,
+                bank=bank,
+                currency=currency,
+                balance=Decimal('1000.00'),
+                owner=user,
+            )
+            balance = Decimal('1000.00')
+            rows = []
+            for day in range(days):
+                # Most days have no transactions and keep the balance
+                if random.random() < 0.3:
+                    balance += Decimal(random.uniform(-200, 200)).quantize(Decimal('0.01'))
+                rows.append(AccountBalanceHistory(
+                    account=account, date=start_date + timedelta(days=day),
+                    balance=balance))
+            AccountBalanceHistory.objects.bulk_create(rows, batch_size=1000)
+        return user
+
+    def run_benchmark(self, user, days, repeat):
+        factory = APIRequestFactory()
+        end_date = timezone.localdate()
+        params = {
+            'start': end_date - timedelta(days=days - 1),
+            'end': end_date,
+            'total': 'true',
+        }
+        self.stdout.write(
+            f'{"format":<10}{"encoding":<10}{"bytes":>10}'
+            f'{"render ms":>11}{"parse ms":>10}'
+        )
+        for renderer_class, parse in (
+                (ORJSONRenderer, orjson.loads),
+                (SeriesRenderer, lambda content: decode_report(orjson.loads(content)))):
+            view = AccountsBalanceHistoryView.as_view(renderer_classes=[renderer_class])
+            request = factory.get('/api/v1/accounts/balance-history/', params)
+            force_authenticate(request, user=user)
+            data = view(request).data
+
+            renderer = renderer_class()
+            started = time.perf_counter()
+            for _ in range(repeat):
+                content = renderer.render(data)
+            render_time = (time.perf_counter() - started) / repeat
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                parse(content)
+            parse_time = (time.perf_counter() - started) / repeat
+
+            self.report(renderer_class.format, 'identity', len(content),
+                        render_time, parse_time)
+            for encoding in supported_encodings():
+                self.report(renderer_class.format, encoding,
+                            len(compress_content(content, encoding)),
+                            render_time, parse_time)
+
+    def report(self, format, encoding, size, render_time, parse_time):
+        self.stdout.write(
+            f'{format:<10}{encoding:<10}{size:>10}'
+            f'{render_time * 1000:>11.2f}{parse_time * 1000:>10.2f}'
+        )
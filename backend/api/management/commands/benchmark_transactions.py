@@ -0,0 +1,125 @@
+# api/management/commands/benchmark_transactions.py
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from api.middleware import compress_content, supported_encodings
+from api.renderers import ORJSONRenderer
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+from finances.models import Account, AccountType, Bank, Currency
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+from transactions.models import Expense, ExpenseCategory, Income, IncomeCategory
+from transactions.views import CombinedTransactionView
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure payload size and latency of the combined transactions '
+        'endpoint for each JSON renderer and content coding'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--transactions', type=int, default=5000,
+            help='Number of transactions to generate'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=1000,
+            help='Page size requested from the endpoint'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=10,
+            help='Number of timed requests per renderer'
+        )
+
+    def handle(self, *args, **options):
+        # Everything runs in one transaction that is rolled back at the end,
+        # so the benchmark never leaves data behind.
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=['testserver']):
+            user = self.generate_data(options['transactions'])
+            self.run_benchmark(user, options['limit'], options['repeat'])
+            transaction.set_rollback(True)
+
+    def generate_data(self, count):
+        user = User.objects.create_user(
+            username='benchmark_user',
+            email='benchmark_user@example.com',
+            password='password',
+        )
+        currency = Currency.objects.create(
+            name='Dollar', code='USD', symbol='$', owner=user)
+        account = Account.objects.create(
+            name='Benchmark Account',
+            account_type=AccountType.objects.create(name='Savings', owner=user),
+            bank=Bank.objects.create(name='Test Bank', country='USA', owner=user),
+            currency=currency,
+            balance=Decimal('1000.00'),
+            owner=user,
+        )
+        expense_category = ExpenseCategory.objects.create(name='Food', owner=user)
+        income_category = IncomeCategory.objects.create(name='Salary', owner=user)
+
+        # bulk_create skips the balance signals, which are irrelevant here
+        start_date = timezone.now() - timedelta(days=count)
+        rows = {Expense: [], Income: []}
+        for i in range(count):
+            model = Expense if i % 4 else Income
+            rows[model].append(model(
+                date=start_date + timedelta(hours=i),
+                amount=Decimal(random.uniform(5, 500)).quantize(Decimal('0.01')),
+                currency=currency,
+                account=account,
+                description=f'Benchmark transaction {i}',
+                category=expense_category if model is Expense else income_category,
+                owner=user,
+            ))
+        for model, objects in rows.items():
+            model.objects.bulk_create(objects, batch_size=1000)
+        return user
+
+    def run_benchmark(self, user, limit, repeat):
+        factory = APIRequestFactory()
+        self.stdout.write(
+            f'{"renderer":<16}{"encoding":<10}{"bytes":>10}'
+            f'{"view ms":>10}{"encode ms":>11}{"total ms":>10}'
+        )
+        for renderer_class in (JSONRenderer, ORJSONRenderer):
+            view = CombinedTransactionView.as_view(renderer_classes=[renderer_class])
+            view_time = render_time = 0.0
+            for _ in range(repeat):
+                request = factory.get(
+                    '/api/v1/transactions/transactions/', {'limit': limit})
+                force_authenticate(request, user=user)
+                started = time.perf_counter()
+                response = view(request)
+                rendered = time.perf_counter()
+                response.render()
+                view_time += rendered - started
+                render_time += time.perf_counter() - rendered
+            content = response.content
+            view_time /= repeat
+            render_time /= repeat
+            self.report(renderer_class.__name__, 'identity', len(content),
+                        view_time, render_time)
+
+            for encoding in supported_encodings():
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    compressed = compress_content(content, encoding)
+                compress_time = (time.perf_counter() - started) / repeat
+                self.report(renderer_class.__name__, encoding, len(compressed),
+                            view_time, render_time + compress_time)
+
+    def report(self, renderer, encoding, size, view_time, encode_time):
+        self.stdout.write(
+            f'{renderer:<16}{encoding:<10}{size:>10}{view_time * 1000:>10.2f}'
+            f'{encode_time * 1000:>11.2f}{(view_time + encode_time) * 1000:>10.2f}'
+        )
@@ -0,0 +1,95 @@
+# api/middleware.py
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+DEFAULT_MIN_SIZE = 1024
+
+re_accepts_encoding = _lazy_re_compile(r"([a-z*]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?")
+
+
+def supported_encodings():
+    """Content codings this server can produce, in order of preference"""
+    if brotli is not None:
+        return ["br", "gzip"]
+    return ["gzip"]
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Pick the best supported content coding for an Accept-Encoding header.
+
+    Returns None when the client accepts none of them.
+    """
+    weights = {}
+    for match in re_accepts_encoding.finditer(accept_encoding.lower()):
+        coding, quality = match.groups()
+        try:
+            weights[coding] = float(quality) if quality is not None else 1.0
+        except ValueError:
+            weights[coding] = 0.0
+
+    best, best_weight = None, 0.0
+    for coding in supported_encodings():
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress_content(content, encoding):
+    """Compress a response body with the given content coding"""
+    if encoding == "br":
+        return brotli.compress(content, quality=5)
+    return compress_string(content)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli or gzip depending on what the client accepts.
+
+    Only bodies of at least ``API_COMPRESSION_MIN_SIZE`` bytes are compressed;
+    smaller ones would not get noticeably smaller and only cost CPU time.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, "API_COMPRESSION_MIN_SIZE", DEFAULT_MIN_SIZE)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        if len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        encoding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        compressed = compress_content(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(response.content))
+
+        # The body is no longer byte-for-byte what a strong ETag promised.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,57 @@
+# api/reference.py
+
+"""
+Per-owner cache of reference data: currencies, account types, banks,
+accounts and categories.
+
+Every page of the frontend lists them, but they rarely change. So the
+serialized list of each model and owner is kept in the "reference" cache
+from the first request on; it is local memory unless settings configure
+another backend. Saving or deleting an object drops its owner's list of
+that model (see api.signals), so the next request rebuilds it.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+CACHE_ALIAS = "reference"
+
+
+def cache_key(model, owner_id):
+    return f"reference:{model._meta.label_lower}:{owner_id}"
+
+
+def cached_list(model, owner_id, build):
+    """The owner's cached list of the model, built with build() if missing"""
+    cache = caches[CACHE_ALIAS]
+    key = cache_key(model, owner_id)
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, settings.REFERENCE_CACHE_TIMEOUT)
+    return data
+
+
+def invalidate_reference(model, owner_id):
+    caches[CACHE_ALIAS].delete(cache_key(model, owner_id))
+
+
+class CachedListMixin:
+    """
+    List action of an owner-scoped viewset served from the reference cache.
+
+    The whole serialized list is cached and paginated in memory, so a page
+    takes no query once the list is warm.
+    """
+
+    def list(self, request, *args, **kwargs):
+        data = cached_list(
+            self.queryset.model,
+            request.user.pk,
+            lambda: list(self.get_serializer(self.get_queryset(), many=True).data),
+        )
+        page = self.paginate_queryset(data)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(data)
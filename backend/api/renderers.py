@@ -0,0 +1,60 @@
+# api/renderers.py
+
+from decimal import Decimal
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .series import MEDIA_TYPE, encode_report
+
+ORJSON_OPTIONS = (
+    orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+)
+
+_fallback_encoder = JSONEncoder()
+
+
+def orjson_default(obj):
+    """
+    Encode the types orjson does not know about.
+
+    Serializer fields already turn decimals into strings, so only raw
+    Decimals (e.g. aggregates) get here; like DRF's encoder they become JSON
+    numbers. Everything else is delegated to DRF's encoder so the output
+    matches the stock renderer.
+    """
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return _fallback_encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSON renderer backed by orjson"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        option = ORJSON_OPTIONS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+
+        return orjson.dumps(data, default=orjson_default, option=option)
+
+
+class SeriesRenderer(ORJSONRenderer):
+    """
+    Renders reports of date-aligned series in the compact encoding of
+    api.series. Selected with ``Accept: application/vnd.familybudget.series+json``
+    or ``?format=series``; responses without series render as plain JSON.
+    """
+
+    media_type = MEDIA_TYPE
+    format = 'series'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(
+            encode_report(data), accepted_media_type, renderer_context)
@@ -0,0 +1,154 @@
+# api/series.py
+
+"""
+Compact encoding of report responses made of date-aligned series.
+
+A report is a dict with a ``dates`` list and series of the same length,
+either directly (e.g. ``total``) or as ``values`` of the items of a list
+(e.g. ``series``). Encoded:
+
+* ``dates`` becomes ``{"start", "count", "step"}`` when the dates are
+  evenly spaced, ``{"start", "count", "offsets"}`` otherwise, with the day
+  gaps between consecutive dates packed as below;
+* every series becomes a base64 string of unsigned LEB128 varints, one per
+  value: 0 for null, otherwise 1 + the zigzag encoded difference in minor
+  units (``10 ** scale``) from the previous non-null value;
+* ``scale`` and ``encoded``, the keys that were encoded, are added.
+
+Flat or slowly moving balances mostly produce one byte per value.
+"""
+
+import base64
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+MEDIA_TYPE = "application/vnd.familybudget.series+json"
+SCALE = 2
+
+
+def pack_varints(numbers):
+    """Pack non-negative integers as unsigned LEB128"""
+    numbers = np.asarray(numbers, dtype=np.uint64)
+    if not numbers.size:
+        return b""
+    width = max(1, -(-int(numbers.max()).bit_length() // 7))
+    shifts = np.arange(width, dtype=np.uint64) * np.uint64(7)
+    groups = ((numbers[:, None] >> shifts) & np.uint64(0x7F)).astype(np.uint8)
+    # Number of 7 bit groups each number needs; all but the last get the
+    # continuation bit
+    length = 1 + (numbers[:, None] >= (np.uint64(1) << shifts[1:])).sum(axis=1)
+    columns = np.arange(width)
+    groups[columns < (length - 1)[:, None]] |= 0x80
+    return groups[columns < length[:, None]].tobytes()
+
+
+def unpack_varints(packed):
+    data = np.frombuffer(packed, dtype=np.uint8)
+    if not data.size:
+        return np.zeros(0, dtype=np.uint64)
+    last = (data & 0x80) == 0
+    starts = np.flatnonzero(np.concatenate([[True], last[:-1]]))
+    number = np.repeat(np.arange(starts.size), np.diff(np.append(starts, data.size)))
+    shifts = ((np.arange(data.size) - starts[number]) * 7).astype(np.uint64)
+    return np.add.reduceat((data & 0x7F).astype(np.uint64) << shifts, starts)
+
+
+def encode_values(values, scale=SCALE):
+    amounts = np.array(list(values), dtype=float)
+    known = ~np.isnan(amounts)
+    units = np.rint(amounts[known] * 10 ** scale).astype(np.int64)
+    deltas = np.diff(units, prepend=0)
+    tokens = np.zeros(amounts.size, dtype=np.uint64)
+    tokens[known] = ((deltas << 1) ^ (deltas >> 63)).astype(np.uint64) + np.uint64(1)
+    return base64.b64encode(pack_varints(tokens)).decode("ascii")
+
+
+def decode_values(encoded, scale=SCALE):
+    """Values of an encoded series as floats, like a JSON parser returns them"""
+    tokens = unpack_varints(base64.b64decode(encoded)).astype(np.int64)
+    known = tokens != 0
+    zigzag = tokens[known] - 1
+    units = np.cumsum((zigzag >> 1) ^ -(zigzag & 1))
+    values = np.full(tokens.size, None, dtype=object)
+    values[known] = units / 10 ** scale
+    return values.tolist()
+
+
+def encode_dates(dates):
+    gaps = [(later - earlier).days for earlier, later in zip(dates, dates[1:])]
+    encoded = {"start": dates[0] if dates else None, "count": len(dates)}
+    if len(set(gaps)) <= 1:
+        encoded["step"] = gaps[0] if gaps else 1
+    else:
+        encoded["offsets"] = base64.b64encode(pack_varints(gaps)).decode("ascii")
+    return encoded
+
+
+def decode_dates(encoded):
+    if encoded["count"] == 0:
+        return []
+    if "step" in encoded:
+        gaps = [encoded["step"]] * (encoded["count"] - 1)
+    else:
+        gaps = unpack_varints(base64.b64decode(encoded["offsets"])).tolist()
+    dates = [date.fromisoformat(str(encoded["start"]))]
+    for gap in gaps:
+        dates.append(dates[-1] + timedelta(days=gap))
+    return dates
+
+
+def is_series(value, count):
+    return (
+        isinstance(value, list)
+        and len(value) == count
+        and all(item is None or isinstance(item, (int, float, Decimal)) for item in value)
+    )
+
+
+def is_series_list(value):
+    return isinstance(value, list) and all(
+        isinstance(item, dict) and "values" in item for item in value)
+
+
+def encode_report(data, scale=SCALE):
+    """Encode a report, leaving data without ``dates`` unchanged"""
+    if not isinstance(data, dict) or not isinstance(data.get("dates"), list):
+        return data
+
+    count = len(data["dates"])
+    report = {}
+    encoded = []
+    for key, value in data.items():
+        if key == "dates":
+            value = encode_dates(value)
+        elif is_series_list(value):
+            value = [
+                {**item, "values": encode_values(item["values"], scale)}
+                for item in value
+            ]
+            encoded.append(key)
+        elif is_series(value, count):
+            value = encode_values(value, scale)
+            encoded.append(key)
+        report[key] = value
+    report["scale"] = scale
+    report["encoded"] = encoded
+    return report
+
+
+def decode_report(report):
+    """Inverse of encode_report(), also accepting the report parsed from JSON"""
+    data = {key: value for key, value in report.items()
+            if key not in ("scale", "encoded")}
+    data["dates"] = decode_dates(report["dates"])
+    for key in report["encoded"]:
+        if isinstance(report[key], list):
+            data[key] = [
+                {**item, "values": decode_values(item["values"], report["scale"])}
+                for item in report[key]
+            ]
+        else:
+            data[key] = decode_values(report[key], report["scale"])
+    return data
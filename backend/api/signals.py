@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from finances.models import Account, AccountType, Bank, Currency
+from transactions.models import ExpenseCategory, IncomeCategory
+
+from .reference import invalidate_reference
+
+# Models whose lists are kept in the reference cache
+REFERENCE_MODELS = (
+    Currency,
+    AccountType,
+    Bank,
+    Account,
+    ExpenseCategory,
+    IncomeCategory,
+)
+
+
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+@receiver(post_save, sender=AccountType)
+@receiver(post_delete, sender=AccountType)
+@receiver(post_save, sender=Bank)
+@receiver(post_delete, sender=Bank)
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+@receiver(post_save, sender=ExpenseCategory)
+@receiver(post_delete, sender=ExpenseCategory)
+@receiver(post_save, sender=IncomeCategory)
+@receiver(post_delete, sender=IncomeCategory)
+def invalidate_owner_reference(sender, instance, **kwargs):
+    invalidate_reference(sender, instance.owner_id)
+
+
+@receiver(post_save, sender=get_user_model())
+def clear_new_user_reference(sender, instance, created, **kwargs):
+    # Drop lists left behind by a deleted user whose ID was reused
+    if created:
+        for model in REFERENCE_MODELS:
+            invalidate_reference(model, instance.pk)
@@ -0,0 +1,74 @@
+from django.core.cache import caches
+from django.urls import reverse
+from finances.models import Currency
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from users.models import User
+
+
+class JWTAuthenticationTests(APITestCase):
+
+    def setUp(self):
+        caches["reference"].clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="Testpass123")
+        Currency.objects.create(name="Dollar", code="USD", symbol="$", owner=self.user)
+        self.url = reverse("currency-list")
+
+    def obtain_tokens(self):
+        response = self.client.post(reverse("jwt-create"), {
+            "email": "test@example.com", "password": "Testpass123"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_obtain_and_refresh_tokens(self):
+        tokens = self.obtain_tokens()
+        self.assertEqual(set(tokens), {"access", "refresh"})
+
+        response = self.client.post(
+            reverse("jwt-refresh"), {"refresh": tokens["refresh"]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("access", response.json())
+
+        response = self.client.post(reverse("jwt-create"), {
+            "email": "test@example.com", "password": "wrong"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_access_token_is_checked_without_queries(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {self.obtain_tokens()['access']}")
+        self.client.get(self.url)
+        # The user is never loaded for a cached list filtered by owner
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.json()["results"][0]["code"], "USD")
+
+        # Writes load the user to assign it as owner
+        response = self.client.post(
+            self.url, {"name": "Euro", "code": "EUR", "symbol": "€"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Currency.objects.get(code="EUR").owner, self.user)
+        response = self.client.get(reverse("user-me"))
+        self.assertEqual(response.json()["email"], "test@example.com")
+
+    def test_invalid_and_revoked_access(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer not-a-token")
+        self.assertEqual(
+            self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {self.obtain_tokens()['access']}")
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.post(
+            self.url, {"name": "Euro", "code": "EUR", "symbol": "€"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_authentication_still_works(self):
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
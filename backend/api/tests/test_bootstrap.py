@@ -0,0 +1,78 @@
+from decimal import Decimal
+
+from budgets.models import Budget
+from django.core.cache import caches
+from django.urls import reverse
+from finances.models import Account, AccountType, Bank, Currency
+from rest_framework import status
+from rest_framework.test import APITestCase
+from transactions.models import ExpenseCategory, IncomeCategory
+from users.models import User
+
+
+class BootstrapViewTests(APITestCase):
+
+    def setUp(self):
+        caches["reference"].clear()
+        self.url = reverse("bootstrap")
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="Testpass123")
+        self.client.force_authenticate(user=self.user)
+        currency = Currency.objects.create(
+            name="Dollar", code="USD", symbol="$", owner=self.user)
+        self.account = Account.objects.create(
+            name="Main",
+            balance=Decimal("1000.00"),
+            owner=self.user,
+            account_type=AccountType.objects.create(name="Savings", owner=self.user),
+            currency=currency,
+            bank=Bank.objects.create(name="Bank", country="USA", owner=self.user),
+        )
+        ExpenseCategory.objects.create(name="Food", owner=self.user)
+        IncomeCategory.objects.create(name="Salary", owner=self.user)
+        Budget.objects.create(
+            owner=self.user, name="January", total_amount=Decimal("500.00"),
+            start_date="2024-01-01", end_date="2024-01-31")
+        other = User.objects.create_user(
+            username="otheruser", email="other@example.com", password="Testpass123")
+        Currency.objects.create(name="Euro", code="EUR", symbol="€", owner=other)
+
+    def test_returns_all_reference_data(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data["user"]["email"], "test@example.com")
+        self.assertNotIn("accounts", data["user"])
+        self.assertNotIn("password", data["user"])
+        self.assertEqual([item["code"] for item in data["currencies"]], ["USD"])
+        self.assertEqual(data["accounts"][0]["balance"], "1000.00")
+        for name in ("account_types", "banks", "income_categories",
+                     "expense_categories", "budgets"):
+            self.assertEqual(len(data[name]), 1, name)
+
+        # Same lists as the reference endpoints, which share their cache
+        with self.assertNumQueries(0):
+            currencies = self.client.get(reverse("currency-list")).json()
+        self.assertEqual(currencies["results"], data["currencies"])
+
+    def test_warm_request_only_queries_budgets(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+    def test_etag(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f"W/{etag}")
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.account.balance = Decimal("900.00")
+        self.account.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
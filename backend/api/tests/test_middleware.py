@@ -0,0 +1,52 @@
+import gzip
+
+import brotli
+from api.middleware import CompressionMiddleware, negotiate_encoding
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+
+@override_settings(API_COMPRESSION_MIN_SIZE=100)
+class CompressionMiddlewareTests(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.body = b'{"results": [' + b'{"amount": "10.00"},' * 50 + b'{}]}'
+
+    def get_response(self, body, **headers):
+        middleware = CompressionMiddleware(lambda request: HttpResponse(body))
+        return middleware(self.factory.get("/api/v1/expenses/", **headers))
+
+    def test_negotiate_encoding(self):
+        """Test that brotli is preferred and q-values are honoured"""
+        self.assertEqual(negotiate_encoding("gzip, deflate, br"), "br")
+        self.assertEqual(negotiate_encoding("br;q=0.5, gzip"), "gzip")
+        self.assertEqual(negotiate_encoding("gzip;q=0, br;q=0"), None)
+        self.assertEqual(negotiate_encoding("*"), "br")
+        self.assertEqual(negotiate_encoding(""), None)
+
+    def test_brotli_response(self):
+        """Test that a large response is brotli-compressed when accepted"""
+        response = self.get_response(self.body, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(brotli.decompress(response.content), self.body)
+
+    def test_gzip_response(self):
+        """Test that gzip is used when brotli is not accepted"""
+        response = self.get_response(self.body, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+
+    def test_small_response_is_not_compressed(self):
+        """Test that responses below the threshold are sent as is"""
+        response = self.get_response(b'{"id": 1}', HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, b'{"id": 1}')
+
+    def test_identity_when_nothing_accepted(self):
+        """Test that the body is untouched without Accept-Encoding"""
+        response = self.get_response(self.body)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, self.body)
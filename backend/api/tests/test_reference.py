@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.urls import reverse
+from django.utils import timezone
+from finances.models import Account, AccountType, Bank, Currency
+from rest_framework import status
+from rest_framework.test import APITestCase
+from transactions.models import Expense, ExpenseCategory
+from users.models import User
+
+
+class ReferenceCacheTests(APITestCase):
+
+    def setUp(self):
+        caches["reference"].clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="Testpass123")
+        self.other = User.objects.create_user(
+            username="otheruser", email="other@example.com", password="Testpass123")
+        self.client.force_authenticate(user=self.user)
+        self.currency = Currency.objects.create(
+            name="Dollar", code="USD", symbol="$", owner=self.user)
+        Currency.objects.create(name="Euro", code="EUR", symbol="€", owner=self.other)
+        self.account = Account.objects.create(
+            name="Main",
+            balance=Decimal("1000.00"),
+            owner=self.user,
+            account_type=AccountType.objects.create(name="Savings", owner=self.user),
+            currency=self.currency,
+            bank=Bank.objects.create(name="Bank", country="USA", owner=self.user),
+        )
+
+    def test_lists_are_served_from_the_cache(self):
+        url = reverse("currency-list")
+        first = self.client.get(url, {"limit": 50})
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {"limit": 50})
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(second.json()["count"], 1)
+        self.assertEqual(second.json()["results"][0]["code"], "USD")
+
+        # Pages are cut from the cached list
+        Currency.objects.create(name="Pound", code="GBP", symbol="£", owner=self.user)
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"limit": 1, "offset": 1})
+        self.assertEqual(response.json()["count"], 2)
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    def test_changes_invalidate_their_owners_list(self):
+        url = reverse("currency-list")
+        self.client.get(url)
+        response = self.client.post(
+            url, {"name": "Pound", "code": "GBP", "symbol": "£"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.get(url).json()["count"], 2)
+
+        self.client.delete(reverse("currency-detail", args=[response.json()["id"]]))
+        self.assertEqual(self.client.get(url).json()["count"], 1)
+
+        # Other owners' changes keep the list
+        Currency.objects.create(name="Yen", code="JPY", symbol="¥", owner=self.other)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+    def test_account_balances_follow_transactions(self):
+        url = reverse("account-list")
+        self.assertEqual(self.client.get(url).json()["results"][0]["balance"], "1000.00")
+        category = ExpenseCategory.objects.create(name="Food", owner=self.user)
+        self.assertEqual(
+            self.client.get(reverse("expensecategory-list")).json()["count"], 1)
+        Expense.objects.create(
+            date=timezone.now(), amount=Decimal("25.00"), currency=self.currency,
+            account=self.account, category=category, owner=self.user)
+        self.assertEqual(self.client.get(url).json()["results"][0]["balance"], "975.00")
@@ -0,0 +1,61 @@
+import io
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from api.parsers import ORJSONParser
+from api.renderers import ORJSONRenderer
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRendererTests(SimpleTestCase):
+
+    def test_matches_stock_renderer_for_serializer_output(self):
+        """Test that serializer-style data renders byte-for-byte the same"""
+        data = {
+            "count": 1,
+            "next": None,
+            "results": [
+                {"id": 1, "amount": "100.00", "description": "Grocery shopping"}
+            ],
+        }
+        self.assertEqual(
+            ORJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_renders_decimal_and_dates(self):
+        """Test that raw decimals and dates render like the stock renderer"""
+        data = {
+            "amount": Decimal("1234.10"),
+            "date": date(2024, 1, 31),
+            "created_at": datetime(2024, 1, 31, 12, 0, tzinfo=timezone.utc),
+        }
+        self.assertEqual(
+            ORJSONRenderer().render(data),
+            b'{"amount":1234.1,"date":"2024-01-31",'
+            b'"created_at":"2024-01-31T12:00:00Z"}',
+        )
+        self.assertEqual(
+            ORJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_renders_none_as_empty_body(self):
+        """Test that an empty response produces no body"""
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+
+class ORJSONParserTests(SimpleTestCase):
+
+    def test_parse(self):
+        """Test that a JSON body is parsed"""
+        stream = io.BytesIO('{"name": "Еда", "amount": "10.50"}'.encode())
+        self.assertEqual(
+            ORJSONParser().parse(stream),
+            {"name": "Еда", "amount": "10.50"},
+        )
+
+    def test_parse_error(self):
+        """Test that malformed JSON raises a ParseError"""
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"name": '))
@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import orjson
+from api.renderers import SeriesRenderer
+from api.series import decode_report, decode_values, encode_report, encode_values
+from django.test import SimpleTestCase
+
+
+class SeriesEncodingTests(SimpleTestCase):
+
+    def test_values_round_trip(self):
+        """Test that amounts, nulls and large jumps survive encoding"""
+        values = [None, None, Decimal("0.00"), Decimal("1234.56"),
+                  Decimal("-99999999.99"), Decimal("99999999.99"), None,
+                  Decimal("0.01"), 0]
+        self.assertEqual(decode_values(encode_values(values)), [
+            None, None, 0.0, 1234.56, -99999999.99, 99999999.99, None, 0.01, 0.0,
+        ])
+
+    def test_flat_series_takes_one_byte_per_value(self):
+        """Test that unchanged balances encode to a single byte each"""
+        encoded = encode_values([Decimal("0.00")] * 300)
+        self.assertEqual(len(encoded), 400)  # 300 bytes in base64
+
+    def test_report_round_trip(self):
+        """Test that a rendered report decodes back to the original data"""
+        dates = [date(2024, 1, 1) + timedelta(days=day) for day in range(5)]
+        data = {
+            "start": dates[0],
+            "end": dates[-1],
+            "dates": dates,
+            "series": [
+                {"account": 1, "values": [None, Decimal("10.00"), Decimal("10.00"),
+                                          Decimal("7.50"), Decimal("7.50")]},
+            ],
+            "total": [0, Decimal("10.00"), Decimal("10.00"),
+                      Decimal("7.50"), Decimal("7.50")],
+        }
+
+        report = orjson.loads(SeriesRenderer().render(data))
+        self.assertEqual(report["dates"], {"start": "2024-01-01", "count": 5, "step": 1})
+        self.assertEqual(report["encoded"], ["series", "total"])
+
+        decoded = decode_report(report)
+        self.assertEqual(decoded["dates"], dates)
+        self.assertEqual(decoded["series"][0]["account"], 1)
+        self.assertEqual(decoded["series"][0]["values"], [None, 10.0, 10.0, 7.5, 7.5])
+        self.assertEqual(decoded["total"], [0.0, 10.0, 10.0, 7.5, 7.5])
+
+    def test_irregular_dates(self):
+        """Test that unevenly spaced dates are packed as offsets"""
+        dates = [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1), date(2024, 3, 9)]
+        report = encode_report({"dates": dates, "total": [1, 2, 3, 4]})
+        self.assertIn("offsets", report["dates"])
+        self.assertEqual(decode_report(report)["dates"], dates)
+
+    def test_leaves_other_data_unchanged(self):
+        """Test that error responses and other data are not encoded"""
+        data = {"start": ["Start date must be earlier than or equal to end date."]}
+        self.assertEqual(encode_report(data), data)
@@ -3,11 +3,19 @@ from budgets.views import BudgetViewSet
 from django.urls import include, path
 from finances.views import (
     AccountBalanceHistoryView,
+    AccountsBalanceHistoryView,
     AccountTypeViewSet,
     AccountViewSet,
     BankViewSet,
     CurrencyViewSet,
 )
+from reports.views import (
+    CashflowReportView,
+    ExpenseBalanceReportView,
+    ForecastReportView,
+    NetWorthReportView,
+    PivotReportView,
+)
 from rest_framework import routers
 from transactions.views import (
     CombinedTransactionView,
@@ -15,9 +23,12 @@ from transactions.views import (
     ExpenseViewSet,
     IncomeCategoryViewSet,
     IncomeViewSet,
+    RecurringTransactionView,
 )
 from users.views import LocaleChoicesView, UserViewSet, change_password
 
+from .views import BootstrapView
+
 router = routers.DefaultRouter()
 router.register(r"users", UserViewSet)
 router.register(r"currencies", CurrencyViewSet)
@@ -31,8 +42,16 @@ router.register(r'expenses', ExpenseViewSet)
 router.register(r'budgets', BudgetViewSet, basename='budget')
 
 urlpatterns = [
+    # Must come before the router, whose account detail route would match it
+    path(
+        "v1/accounts/balance-history/",
+        AccountsBalanceHistoryView.as_view(),
+        name="accounts-balance-history",
+    ),
     path("v1/", include(router.urls)),
+    path("v1/auth/", include("djoser.urls.jwt")),
     path("v1/auth/", include("djoser.urls.authtoken")),
+    path("v1/bootstrap/", BootstrapView.as_view(), name="bootstrap"),
     path("v1/users/set_password", change_password, name="change-password"),
     path(
         "v1/accounts/<int:account_id>/balance-history/",
@@ -44,5 +63,35 @@ urlpatterns = [
         CombinedTransactionView.as_view(),
         name="combined-transactions",
     ),
+    path(
+        "v1/transactions/recurring/",
+        RecurringTransactionView.as_view(),
+        name="recurring-transactions",
+    ),
     path('v1/locale-choices/', LocaleChoicesView.as_view(), name='locale_choices'),
+    path(
+        "v1/reports/cashflow/",
+        CashflowReportView.as_view(),
+        name="report-cashflow",
+    ),
+    path(
+        "v1/reports/expense-balance/",
+        ExpenseBalanceReportView.as_view(),
+        name="report-expense-balance",
+    ),
+    path(
+        "v1/reports/pivot/",
+        PivotReportView.as_view(),
+        name="report-pivot",
+    ),
+    path(
+        "v1/reports/forecast/",
+        ForecastReportView.as_view(),
+        name="report-forecast",
+    ),
+    path(
+        "v1/reports/net-worth/",
+        NetWorthReportView.as_view(),
+        name="report-net-worth",
+    ),
 ]
@@ -0,0 +1,91 @@
+# api/views.py
+
+import hashlib
+import json
+
+from budgets.models import Budget
+from budgets.serializers import BudgetSerializer
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from finances.models import Account, AccountType, Bank, Currency
+from finances.serializers import (
+    AccountSerializer,
+    AccountTypeSerializer,
+    BankSerializer,
+    CurrencySerializer,
+)
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from transactions.models import ExpenseCategory, IncomeCategory
+from transactions.serializers import ExpenseCategorySerializer, IncomeCategorySerializer
+from users.serializers import UserSerializer
+
+from .reference import cached_list
+
+# Lists shared with the reference viewsets' cache
+REFERENCE_LISTS = {
+    "currencies": (Currency, CurrencySerializer),
+    "account_types": (AccountType, AccountTypeSerializer),
+    "banks": (Bank, BankSerializer),
+    "accounts": (Account, AccountSerializer),
+    "income_categories": (IncomeCategory, IncomeCategorySerializer),
+    "expense_categories": (ExpenseCategory, ExpenseCategorySerializer),
+}
+
+
+class BootstrapUserSerializer(UserSerializer):
+    """The user without their accounts, which bootstrap lists on their own"""
+
+    accounts = None
+
+    class Meta(UserSerializer.Meta):
+        fields = [field for field in UserSerializer.Meta.fields if field != "accounts"]
+
+
+def data_etag(data):
+    """Strong ETag of the JSON form of data"""
+    body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return '"%s"' % hashlib.sha1(body.encode()).hexdigest()
+
+
+class BootstrapView(APIView):
+    """
+    Everything the app loads after login in one response: the user, their
+    currencies, account types, banks, accounts, income and expense
+    categories, and budgets.
+
+    The reference lists come from the per-owner reference cache, so a warm
+    request only queries the budgets. The ETag covers the whole response;
+    a matching If-None-Match gets a 304 without a body.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        context = {"request": request}
+        data = {"user": BootstrapUserSerializer(user, context=context).data}
+        for name, (model, serializer_class) in REFERENCE_LISTS.items():
+            data[name] = cached_list(model, user.pk, lambda: list(serializer_class(
+                model.objects.filter(owner=user), many=True, context=context).data))
+        data["budgets"] = BudgetSerializer(
+            Budget.objects.filter(owner=user).with_spent(), many=True,
+            context=context).data
+
+        etag = data_etag(data)
+        # Compressed responses carry the weak form of the ETag
+        known = [
+            tag.removeprefix("W/")
+            for tag in parse_etags(request.headers.get("If-None-Match", ""))
+        ]
+        if etag in known or "*" in known:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ["Authorization"])
+        return response
@@ -2,7 +2,7 @@
 
 from django.contrib import admin
 
-from .models import Budget, BudgetCategory
+from .models import Budget, BudgetAlert, BudgetCategory
 
 
 class BudgetCategoryInline(admin.TabularInline):
@@ -14,3 +14,8 @@ class BudgetCategoryInline(admin.TabularInline):
 class BudgetAdmin(admin.ModelAdmin):
     list_display = ('name', 'owner', 'total_amount', 'start_date', 'end_date')
     inlines = [BudgetCategoryInline]
+
+
+@admin.register(BudgetAlert)
+class BudgetAlertAdmin(admin.ModelAdmin):
+    list_display = ('budget', 'category', 'threshold', 'spent', 'created_at', 'sent_at')
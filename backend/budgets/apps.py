@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class BudgetsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "budgets"
+
+    def ready(self):
+        # This import is necessary for signal registration
+        import budgets.signals  # noqa: F401
@@ -0,0 +1,28 @@
+# budgets/management/commands/rebuild_budget_spending.py
+from budgets.models import Budget
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+
+class Command(BaseCommand):
+    help = 'Recompute the budget spending counters from the expenses'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int,
+            help='Only rebuild the budgets of the user with this ID'
+        )
+
+    def handle(self, *args, **options):
+        budgets = Budget.objects.all()
+        if options['user']:
+            budgets = budgets.filter(owner_id=options['user'])
+
+        count = 0
+        for budget in budgets.iterator():
+            with transaction.atomic():
+                budget.rebuild_spending()
+            count += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt spending counters for {count} budgets'))
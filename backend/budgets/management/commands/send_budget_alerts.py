@@ -0,0 +1,47 @@
+# budgets/management/commands/send_budget_alerts.py
+from itertools import groupby
+from urllib.error import URLError
+
+from budgets.models import BudgetAlert
+from budgets.notifications import format_alerts, send_telegram_message
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Send pending budget alerts to Telegram, one message per user'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Print the messages instead of sending them'
+        )
+
+    def handle(self, *args, **options):
+        alerts = BudgetAlert.objects.filter(
+            sent_at__isnull=True,
+            budget__owner__telegram_id__isnull=False,
+        ).exclude(
+            budget__owner__telegram_id='',
+        ).select_related(
+            'budget__owner', 'category',
+        ).order_by('budget__owner', 'created_at')
+
+        sent = 0
+        for owner, owner_alerts in groupby(alerts, key=lambda a: a.budget.owner):
+            owner_alerts = list(owner_alerts)
+            message = format_alerts(owner_alerts)
+            if options['dry_run']:
+                self.stdout.write(f'{owner.telegram_id}:\n{message}')
+                continue
+            try:
+                send_telegram_message(owner.telegram_id, message)
+            except URLError as error:
+                self.stderr.write(f'Failed to notify {owner}: {error}')
+                continue
+            BudgetAlert.objects.filter(
+                id__in=[alert.id for alert in owner_alerts]
+            ).update(sent_at=timezone.now())
+            sent += len(owner_alerts)
+
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} budget alerts'))
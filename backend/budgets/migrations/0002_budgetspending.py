@@ -0,0 +1,73 @@
+# Generated by Django 5.1.2 on 2026-10-19 11:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def populate_budget_spending(apps, schema_editor):
+    Budget = apps.get_model("budgets", "Budget")
+    BudgetSpending = apps.get_model("budgets", "BudgetSpending")
+    Expense = apps.get_model("transactions", "Expense")
+
+    for budget in Budget.objects.iterator():
+        totals = (
+            Expense.objects.filter(
+                owner_id=budget.owner_id,
+                date__date__gte=budget.start_date,
+                date__date__lte=budget.end_date,
+            )
+            .order_by()
+            .values("category")
+            .annotate(total=Sum("amount"))
+        )
+        BudgetSpending.objects.bulk_create(
+            [
+                BudgetSpending(
+                    budget=budget, category_id=row["category"], amount=row["total"]
+                )
+                for row in totals
+            ]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("budgets", "0001_initial"),
+        ("transactions", "0007_alter_expense_options_alter_income_options"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BudgetSpending",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("amount", models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+            options={
+                "verbose_name": "Budget Spending",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="budget",
+            index=models.Index(fields=["owner", "start_date", "end_date"], name="budgets_bud_owner_i_a5058b_idx"),
+        ),
+        migrations.AddField(
+            model_name="budgetspending",
+            name="budget",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="spending", to="budgets.budget"),
+        ),
+        migrations.AddField(
+            model_name="budgetspending",
+            name="category",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="transactions.expensecategory"),
+        ),
+        migrations.AlterUniqueTogether(
+            name="budgetspending",
+            unique_together={("budget", "category")},
+        ),
+        migrations.RunPython(populate_budget_spending, migrations.RunPython.noop),
+    ]
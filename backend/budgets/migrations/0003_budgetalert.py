@@ -0,0 +1,34 @@
+# Generated by Django 5.1.2 on 2026-10-19 11:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("budgets", "0002_budgetspending"),
+        ("transactions", "0007_alter_expense_options_alter_income_options"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BudgetAlert",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("threshold", models.PositiveSmallIntegerField(help_text="Percentage of the planned amount")),
+                ("spent", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("limit", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("sent_at", models.DateTimeField(blank=True, null=True)),
+                ("budget", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="alerts", to="budgets.budget")),
+                ("category", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="transactions.expensecategory")),
+            ],
+            options={
+                "verbose_name": "Budget Alert",
+                "ordering": ["created_at"],
+                "indexes": [models.Index(fields=["sent_at"], name="budgets_bud_sent_at_8df6ca_idx")],
+                "unique_together": {("budget", "category", "threshold")},
+            },
+        ),
+    ]
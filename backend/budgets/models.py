@@ -1,14 +1,49 @@
 # budgets/models.py
 from datetime import datetime
+from decimal import Decimal
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
-from django.utils.timezone import is_naive, make_aware
-from transactions.models import ExpenseCategory
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, OuterRef, Prefetch, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils.timezone import is_naive, localdate, make_aware
+from transactions.models import Expense, ExpenseCategory
 
 User = get_user_model()
 
 
+class BudgetQuerySet(models.QuerySet):
+    def with_spent(self):
+        """
+        Annotate total spend and prefetch categories annotated with their spend.
+
+        Both come from the BudgetSpending counters, so the expense table is not
+        touched and the cost is two queries however many budgets are loaded.
+        """
+        total_spent = BudgetSpending.objects.filter(
+            budget=OuterRef('pk')
+        ).order_by().values('budget').annotate(total=Sum('amount')).values('total')
+        category_spent = BudgetSpending.objects.filter(
+            budget=OuterRef('budget'), category=OuterRef('category')
+        ).values('amount')[:1]
+        return self.annotate(
+            total_spent_amount=Coalesce(
+                Subquery(total_spent), Value(0),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2)),
+        ).prefetch_related(
+            Prefetch(
+                'budget_categories',
+                queryset=BudgetCategory.objects.annotate(
+                    spent_amount=Coalesce(
+                        Subquery(category_spent), Value(0),
+                        output_field=models.DecimalField(
+                            max_digits=12, decimal_places=2)),
+                ),
+            )
+        )
+
+
 class Budget(models.Model):
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='budgets')
     name = models.CharField(max_length=100)
@@ -19,12 +54,16 @@ class Budget(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BudgetQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=['owner', 'start_date', 'end_date'])]
+
     def __str__(self):
         return f'{self.name} ({self.start_date} - {self.end_date})'
 
     @property
     def total_spent(self):
-        from transactions.models import Expense
         start_datetime = datetime.combine(self.start_date, datetime.min.time())
         end_datetime = datetime.combine(self.end_date, datetime.max.time())
         if is_naive(start_datetime):
@@ -39,7 +78,6 @@ class Budget(models.Model):
         return total
 
     def category_spent(self, category):
-        from transactions.models import Expense
         start_datetime = datetime.combine(self.start_date, datetime.min.time())
         end_datetime = datetime.combine(self.end_date, datetime.max.time())
         if is_naive(start_datetime):
@@ -55,6 +93,20 @@ class Budget(models.Model):
         total = expenses.aggregate(total=models.Sum('amount'))['total'] or 0
         return total
 
+    def rebuild_spending(self):
+        """Recompute the BudgetSpending counters from the expenses"""
+        totals = Expense.objects.filter(
+            owner_id=self.owner_id,
+            date__date__gte=self.start_date,
+            date__date__lte=self.end_date,
+        ).order_by().values('category').annotate(total=Sum('amount'))
+        BudgetSpending.objects.filter(budget=self).delete()
+        BudgetSpending.objects.bulk_create([
+            BudgetSpending(budget=self, category_id=row['category'],
+                           amount=row['total'])
+            for row in totals
+        ])
+
 
 class BudgetCategory(models.Model):
     budget = models.ForeignKey(
@@ -64,3 +116,134 @@ class BudgetCategory(models.Model):
 
     def __str__(self):
         return f'{self.category.name} - {self.amount}'
+
+
+class BudgetSpending(models.Model):
+    """
+    Running total of the expenses of one category within one budget period.
+
+    Kept up to date by the expense signals in budgets.signals, so budget
+    progress can be read without aggregating over the expense table.
+    """
+
+    budget = models.ForeignKey(
+        Budget, on_delete=models.CASCADE, related_name='spending')
+    category = models.ForeignKey(ExpenseCategory, on_delete=models.CASCADE)
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = 'Budget Spending'
+        unique_together = ['budget', 'category']
+
+    def __str__(self):
+        return f'{self.budget} - {self.category}: {self.amount}'
+
+    @classmethod
+    def record(cls, changes):
+        """
+        Apply spending deltas given as (owner_id, category_id, date, amount).
+
+        Each change is matched to the budgets whose period contains its date,
+        deltas hitting the same counter are merged and counters that do not
+        exist yet are created.
+        """
+        deltas = {}
+        budgets = {}
+        for owner_id, category_id, date, amount in changes:
+            if is_naive(date):
+                date = date.date()
+            else:
+                date = localdate(date)
+            # Edits mostly keep their owner and day
+            if (owner_id, date) not in budgets:
+                budgets[owner_id, date] = list(Budget.objects.filter(
+                    owner_id=owner_id, start_date__lte=date, end_date__gte=date
+                ).values_list('pk', flat=True))
+            for budget_id in budgets[owner_id, date]:
+                key = (budget_id, category_id)
+                deltas[key] = deltas.get(key, Decimal('0')) + amount
+
+        for (budget_id, category_id), amount in deltas.items():
+            if not amount:
+                continue
+            updated = cls.objects.filter(
+                budget_id=budget_id, category_id=category_id
+            ).update(amount=F('amount') + amount)
+            if not updated:
+                try:
+                    # In a savepoint, so that losing the race to create the
+                    # counter leaves the surrounding transaction usable
+                    with transaction.atomic():
+                        cls.objects.create(
+                            budget_id=budget_id, category_id=category_id, amount=amount)
+                except IntegrityError:
+                    cls.objects.filter(
+                        budget_id=budget_id, category_id=category_id
+                    ).update(amount=F('amount') + amount)
+            BudgetAlert.evaluate(budget_id, category_id, amount)
+
+
+class BudgetAlert(models.Model):
+    """Spending of a budget category crossed a share of its planned amount"""
+
+    budget = models.ForeignKey(
+        Budget, on_delete=models.CASCADE, related_name='alerts')
+    category = models.ForeignKey(ExpenseCategory, on_delete=models.CASCADE)
+    threshold = models.PositiveSmallIntegerField(
+        help_text='Percentage of the planned amount')
+    spent = models.DecimalField(max_digits=12, decimal_places=2)
+    limit = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Budget Alert'
+        unique_together = ['budget', 'category', 'threshold']
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['sent_at'])]
+
+    def __str__(self):
+        return f'{self.budget} - {self.category}: {self.threshold}%'
+
+    @classmethod
+    def evaluate(cls, budget_id, category_id, delta):
+        """
+        Record or withdraw alerts after a category's spending moved by delta.
+
+        Only the affected budget category is looked up. An alert is recorded
+        once per threshold; pending alerts are dropped again if spending falls
+        back below their threshold before they are sent.
+        """
+        row = BudgetCategory.objects.filter(
+            budget_id=budget_id, category_id=category_id
+        ).annotate(
+            spent=Subquery(BudgetSpending.objects.filter(
+                budget_id=budget_id, category_id=category_id
+            ).values('amount')[:1])
+        ).values_list('amount', 'spent').first()
+        if row is None or not row[0] or row[1] is None:
+            return
+
+        limit, spent = row
+        previous = spent - delta
+        crossed, dropped = [], []
+        for threshold in settings.BUDGET_ALERT_THRESHOLDS:
+            boundary = limit * threshold / 100
+            if previous < boundary <= spent:
+                crossed.append(threshold)
+            elif spent < boundary <= previous:
+                dropped.append(threshold)
+
+        if crossed:
+            cls.objects.bulk_create([
+                cls(budget_id=budget_id, category_id=category_id,
+                    threshold=threshold, spent=spent, limit=limit)
+                for threshold in crossed
+            ], ignore_conflicts=True)
+        if dropped:
+            cls.objects.filter(
+                budget_id=budget_id,
+                category_id=category_id,
+                threshold__in=dropped,
+                sent_at__isnull=True,
+            ).delete()
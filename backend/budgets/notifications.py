@@ -0,0 +1,30 @@
+# budgets/notifications.py
+
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+TELEGRAM_API_URL = "https://api.telegram.org/bot{token}/sendMessage"
+
+
+def format_alerts(alerts):
+    """Build one message out of the alerts of a single user"""
+    lines = ["Budget alerts:"]
+    for alert in alerts:
+        lines.append(
+            f"{alert.budget.name} / {alert.category.name}: "
+            f"{alert.threshold}% reached ({alert.spent} of {alert.limit})"
+        )
+    return "\n".join(lines)
+
+
+def send_telegram_message(chat_id, text):
+    """Send a text message through the Telegram Bot API"""
+    if not settings.TELEGRAM_BOT_TOKEN:
+        raise ImproperlyConfigured("TELEGRAM_BOT_TOKEN is not set.")
+    url = TELEGRAM_API_URL.format(token=settings.TELEGRAM_BOT_TOKEN)
+    data = urlencode({"chat_id": chat_id, "text": text}).encode()
+    with urlopen(url, data=data, timeout=10) as response:
+        response.read()
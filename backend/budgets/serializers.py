@@ -1,10 +1,43 @@
+from django.db import transaction
 from rest_framework import serializers
 from transactions.models import ExpenseCategory
 from .models import Budget, BudgetCategory
 
 
+class ExpenseCategoryField(serializers.PrimaryKeyRelatedField):
+    """
+    Category field that resolves from the categories loaded in bulk by
+    BudgetCategoryListSerializer instead of one query per item.
+    """
+
+    def to_internal_value(self, data):
+        categories = getattr(self.parent, 'categories', None)
+        if categories is None:
+            return super().to_internal_value(data)
+        try:
+            return categories[int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class BudgetCategoryListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            ids = set()
+            for item in data:
+                try:
+                    ids.add(int(item.get('category')))
+                except (AttributeError, TypeError, ValueError):
+                    continue
+            self.child.categories = ExpenseCategory.objects.in_bulk(ids)
+        return super().to_internal_value(data)
+
+
 class BudgetCategorySerializer(serializers.ModelSerializer):
-    category = serializers.PrimaryKeyRelatedField(
+    id = serializers.IntegerField(required=False, allow_null=True)
+    category = ExpenseCategoryField(
         queryset=ExpenseCategory.objects.all()
     )
     spent = serializers.SerializerMethodField()
@@ -12,13 +45,17 @@ class BudgetCategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = BudgetCategory
         fields = ['id', 'category', 'amount', 'spent']
+        list_serializer_class = BudgetCategoryListSerializer
 
     def get_spent(self, obj):
+        # Annotated by Budget.objects.with_spent()
+        if hasattr(obj, 'spent_amount'):
+            return obj.spent_amount
         return obj.budget.category_spent(obj.category)
 
     def validate_category(self, value):
         user = self.context['request'].user
-        if value.owner != user:
+        if value.owner_id != user.id:
             raise serializers.ValidationError(
                 "Category does not belong to the current user."
             )
@@ -26,6 +63,7 @@ class BudgetCategorySerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         budget = self.context.get('budget')
+        validated_data.pop('id', None)
         return BudgetCategory.objects.create(budget=budget, **validated_data)
 
 
@@ -45,6 +83,26 @@ class BudgetSerializer(serializers.ModelSerializer):
             'budget_categories'
         ]
 
+    def validate_budget_categories(self, value):
+        # Partial updates make every field optional, but new rows need them all
+        existing = set()
+        if self.instance:
+            existing = {
+                budget_category.id
+                for budget_category in self.instance.budget_categories.all()
+            }
+        errors = [
+            {
+                field: ['This field is required.']
+                for field in ('category', 'amount') if field not in category_data
+            }
+            if category_data.get('id') not in existing else {}
+            for category_data in value
+        ]
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return value
+
     def validate(self, data):
         user = self.context['request'].user
         start_date = data.get('start_date')
@@ -77,45 +135,67 @@ class BudgetSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         budget_categories_data = validated_data.pop('budget_categories', [])
-        budget = Budget.objects.create(
-            **validated_data, owner=self.context['request'].user
-        )
-
-        for category_data in budget_categories_data:
-            BudgetCategory.objects.create(budget=budget, **category_data)
-        return budget
+        with transaction.atomic():
+            budget = Budget.objects.create(
+                **validated_data, owner=self.context['request'].user
+            )
+            BudgetCategory.objects.bulk_create([
+                BudgetCategory(
+                    budget=budget,
+                    category=category_data['category'],
+                    amount=category_data['amount'],
+                )
+                for category_data in budget_categories_data
+            ])
+        # Reload with the annotated spend so the response costs no extra queries
+        return Budget.objects.with_spent().get(pk=budget.pk)
 
     def update(self, instance, validated_data):
         budget_categories_data = validated_data.pop('budget_categories', [])
-        instance.name = validated_data.get('name', instance.name)
-        instance.total_amount = validated_data.get(
-            'total_amount', instance.total_amount)
-        instance.start_date = validated_data.get('start_date', instance.start_date)
-        instance.end_date = validated_data.get('end_date', instance.end_date)
-        instance.save()
-
-        # Handle updating budget_categories
-        existing_ids = [
-            item.get('id') for item in budget_categories_data if item.get('id')]
-        # Remove categories that were not sent in the request
-        BudgetCategory.objects.filter(
-            budget=instance).exclude(id__in=existing_ids).delete()
-
-        for category_data in budget_categories_data:
-            category_id = category_data.get('id', None)
-            if category_id:
-                # Update existing category
-                budget_category = BudgetCategory.objects.get(
-                    id=category_id, budget=instance)
-                budget_category.amount = category_data.get(
-                    'amount', budget_category.amount)
-                budget_category.category_id = category_data.get(
-                    'category', budget_category.category_id)
-                budget_category.save()
-            else:
-                # Create new category
-                BudgetCategory.objects.create(budget=instance, **category_data)
-        return instance
+        with transaction.atomic():
+            instance.name = validated_data.get('name', instance.name)
+            instance.total_amount = validated_data.get(
+                'total_amount', instance.total_amount)
+            instance.start_date = validated_data.get(
+                'start_date', instance.start_date)
+            instance.end_date = validated_data.get('end_date', instance.end_date)
+            instance.save()
+
+            # Diff the sent categories against the existing ones
+            existing = {
+                budget_category.id: budget_category
+                for budget_category in instance.budget_categories.all()
+            }
+            to_update = []
+            to_create = []
+            for category_data in budget_categories_data:
+                budget_category = existing.pop(category_data.get('id'), None)
+                if budget_category is None:
+                    to_create.append(BudgetCategory(
+                        budget=instance,
+                        category=category_data['category'],
+                        amount=category_data['amount'],
+                    ))
+                    continue
+                if 'amount' in category_data:
+                    budget_category.amount = category_data['amount']
+                if 'category' in category_data:
+                    budget_category.category = category_data['category']
+                to_update.append(budget_category)
+
+            # Remove categories that were not sent in the request
+            if existing:
+                BudgetCategory.objects.filter(
+                    budget=instance, id__in=existing).delete()
+            if to_update:
+                BudgetCategory.objects.bulk_update(to_update, ['category', 'amount'])
+            if to_create:
+                BudgetCategory.objects.bulk_create(to_create)
+        # Reload with the annotated spend so the response costs no extra queries
+        return Budget.objects.with_spent().get(pk=instance.pk)
 
     def get_total_spent(self, obj):
+        # Annotated by Budget.objects.with_spent()
+        if hasattr(obj, 'total_spent_amount'):
+            return obj.total_spent_amount
         return obj.total_spent
@@ -0,0 +1,39 @@
+from decimal import Decimal
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from transactions.models import Expense
+
+from .models import Budget, BudgetSpending
+
+
+@receiver(post_save, sender=Expense)
+def update_budget_spending_on_save(sender, instance, created, **kwargs):
+    changes = [(
+        instance.owner_id,
+        instance.category_id,
+        instance.date,
+        Decimal(str(instance.amount)),
+    )]
+    # Loaded before the save by transactions.signals
+    previous = instance.previous
+    if previous:
+        changes.append((
+            previous.owner_id, previous.category_id, previous.date, -previous.amount))
+    BudgetSpending.record(changes)
+
+
+@receiver(post_delete, sender=Expense)
+def update_budget_spending_on_delete(sender, instance, **kwargs):
+    BudgetSpending.record([(
+        instance.owner_id,
+        instance.category_id,
+        instance.date,
+        -Decimal(str(instance.amount)),
+    )])
+
+
+@receiver(post_save, sender=Budget)
+def rebuild_budget_spending(sender, instance, **kwargs):
+    # The period may have changed, so start over from the expenses
+    instance.rebuild_spending()
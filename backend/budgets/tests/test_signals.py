@@ -0,0 +1,194 @@
+# budgets/tests/test_signals.py
+
+import datetime
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from budgets.models import Budget, BudgetAlert, BudgetCategory, BudgetSpending
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.test import TestCase
+from finances.models import Account, AccountType, Bank, Currency
+from transactions.models import Expense, ExpenseCategory
+
+User = get_user_model()
+
+
+class BudgetSignalsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='password',
+            email="testuser@email.com"
+        )
+        self.currency = Currency.objects.create(
+            code='USD', name='US Dollar', symbol='$', owner=self.user)
+        self.account = Account.objects.create(
+            name='Test Account',
+            account_type=AccountType.objects.create(name='Checking', owner=self.user),
+            bank=Bank.objects.create(name='Test Bank', country='Testland',
+                                     owner=self.user),
+            currency=self.currency,
+            balance=1000.00,
+            owner=self.user
+        )
+        self.food = ExpenseCategory.objects.create(name='Food', owner=self.user)
+        self.transport = ExpenseCategory.objects.create(
+            name='Transport', owner=self.user)
+        self.november = Budget.objects.create(
+            owner=self.user,
+            name='November Budget',
+            total_amount=5000.00,
+            start_date=datetime.date(2023, 11, 1),
+            end_date=datetime.date(2023, 11, 30)
+        )
+        self.december = Budget.objects.create(
+            owner=self.user,
+            name='December Budget',
+            total_amount=5000.00,
+            start_date=datetime.date(2023, 12, 1),
+            end_date=datetime.date(2023, 12, 31)
+        )
+
+    def create_expense(self, day, amount, category=None):
+        return Expense.objects.create(
+            owner=self.user,
+            date=datetime.datetime(2023, 11, day, 12, 0, tzinfo=datetime.timezone.utc),
+            amount=amount,
+            currency=self.currency,
+            account=self.account,
+            category=category or self.food
+        )
+
+
+class BudgetSpendingSignalsTestCase(BudgetSignalsTestCase):
+    def spending(self, budget):
+        return {
+            row.category_id: row.amount
+            for row in BudgetSpending.objects.filter(budget=budget)
+        }
+
+    def test_create_expense(self):
+        self.create_expense(10, Decimal('100.00'))
+        self.create_expense(11, Decimal('50.50'))
+        self.assertEqual(self.spending(self.november),
+                         {self.food.id: Decimal('150.50')})
+        self.assertEqual(self.spending(self.december), {})
+
+    def test_update_amount_and_category(self):
+        expense = self.create_expense(10, Decimal('100.00'))
+        expense.amount = Decimal('80.00')
+        expense.category = self.transport
+        expense.save()
+        self.assertEqual(self.spending(self.november), {
+            self.food.id: Decimal('0.00'),
+            self.transport.id: Decimal('80.00'),
+        })
+
+    def test_move_expense_to_another_budget(self):
+        expense = self.create_expense(10, Decimal('100.00'))
+        expense.date = datetime.datetime(2023, 12, 5, tzinfo=datetime.timezone.utc)
+        expense.save()
+        self.assertEqual(self.spending(self.november),
+                         {self.food.id: Decimal('0.00')})
+        self.assertEqual(self.spending(self.december),
+                         {self.food.id: Decimal('100.00')})
+
+    def test_delete_expense(self):
+        expense = self.create_expense(10, Decimal('100.00'))
+        self.create_expense(12, Decimal('20.00'))
+        expense.delete()
+        self.assertEqual(self.spending(self.november),
+                         {self.food.id: Decimal('20.00')})
+
+    def test_budget_period_change_rebuilds_spending(self):
+        self.create_expense(10, Decimal('100.00'))
+        self.december.start_date = datetime.date(2023, 11, 5)
+        self.november.end_date = datetime.date(2023, 11, 4)
+        self.november.save()
+        self.december.save()
+        self.assertEqual(self.spending(self.november), {})
+        self.assertEqual(self.spending(self.december),
+                         {self.food.id: Decimal('100.00')})
+
+    def test_counter_created_concurrently(self):
+        # Another request creates the counter after the update missed it
+        BudgetSpending.objects.create(
+            budget=self.november, category=self.food, amount=Decimal('30.00'))
+        update = QuerySet.update
+        missed = []
+
+        def miss_once(queryset, **kwargs):
+            if queryset.model is BudgetSpending and not missed:
+                missed.append(queryset)
+                return 0
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', autospec=True, side_effect=miss_once):
+            self.create_expense(10, Decimal('100.00'))
+        self.assertTrue(missed)
+        self.assertEqual(self.spending(self.november),
+                         {self.food.id: Decimal('130.00')})
+
+    def test_rebuild_command(self):
+        self.create_expense(10, Decimal('100.00'))
+        self.create_expense(15, Decimal('30.00'), self.transport)
+        BudgetSpending.objects.all().delete()
+        call_command('rebuild_budget_spending', stdout=StringIO())
+        self.assertEqual(self.spending(self.november), {
+            self.food.id: Decimal('100.00'),
+            self.transport.id: Decimal('30.00'),
+        })
+        self.assertEqual(
+            Budget.objects.with_spent().get(pk=self.november.pk).total_spent_amount,
+            Decimal('130.00')
+        )
+
+
+class BudgetAlertSignalsTestCase(BudgetSignalsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user.telegram_id = '12345'
+        self.user.save()
+        BudgetCategory.objects.create(
+            budget=self.november, category=self.food, amount=Decimal('200.00'))
+
+    def alerts(self):
+        return list(BudgetAlert.objects.values_list('threshold', 'spent'))
+
+    def test_thresholds_are_recorded_once(self):
+        self.create_expense(10, Decimal('150.00'))
+        self.assertEqual(self.alerts(), [])
+        self.create_expense(11, Decimal('10.00'))
+        self.assertEqual(self.alerts(), [(80, Decimal('160.00'))])
+        self.create_expense(12, Decimal('100.00'))
+        self.assertEqual(self.alerts(), [
+            (80, Decimal('160.00')), (100, Decimal('260.00'))])
+
+    def test_unbudgeted_category_has_no_alerts(self):
+        self.create_expense(10, Decimal('500.00'), self.transport)
+        self.assertEqual(self.alerts(), [])
+
+    def test_pending_alert_is_dropped_when_spending_falls_back(self):
+        expense = self.create_expense(10, Decimal('170.00'))
+        self.assertEqual(self.alerts(), [(80, Decimal('170.00'))])
+        expense.amount = Decimal('100.00')
+        expense.save()
+        self.assertEqual(self.alerts(), [])
+
+    @mock.patch('budgets.management.commands.send_budget_alerts.send_telegram_message')
+    def test_send_budget_alerts(self, send_telegram_message):
+        self.create_expense(10, Decimal('250.00'))
+        call_command('send_budget_alerts', stdout=StringIO())
+        send_telegram_message.assert_called_once()
+        chat_id, message = send_telegram_message.call_args.args
+        self.assertEqual(chat_id, '12345')
+        self.assertIn('Food: 80% reached', message)
+        self.assertIn('Food: 100% reached', message)
+        self.assertFalse(BudgetAlert.objects.filter(sent_at__isnull=True).exists())
+
+        # Already sent alerts are not sent again
+        call_command('send_budget_alerts', stdout=StringIO())
+        send_telegram_message.assert_called_once()
@@ -1,12 +1,17 @@
 # budgets/tests/test_views.py
 
+import datetime
+
 from budgets.models import Budget, BudgetCategory
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from finances.models import Account, AccountType, Bank, Currency
 from rest_framework import status
 from rest_framework.test import APIClient
-from transactions.models import ExpenseCategory
+from transactions.models import Expense, ExpenseCategory
 
 User = get_user_model()
 
@@ -144,3 +149,151 @@ class BudgetViewSetTestCase(TestCase):
         # Попытка удалить чужой бюджет
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_budget_list_spent_query_count(self):
+        currency = Currency.objects.create(
+            code='USD', name='US Dollar', symbol='$', owner=self.user)
+        account = Account.objects.create(
+            name='Test Account',
+            account_type=AccountType.objects.create(name='Checking', owner=self.user),
+            bank=Bank.objects.create(name='Test Bank', country='Testland',
+                                     owner=self.user),
+            currency=currency,
+            balance=1000.00,
+            owner=self.user
+        )
+        categories = [self.expense_category] + [
+            ExpenseCategory.objects.create(name=f'Category {i}', owner=self.user)
+            for i in range(3)
+        ]
+        for month in range(2, 7):
+            budget = Budget.objects.create(
+                owner=self.user,
+                name=f'Budget {month}',
+                total_amount=4000.00,
+                start_date=datetime.date(2024, month, 1),
+                end_date=datetime.date(2024, month, 28)
+            )
+            for category in categories:
+                BudgetCategory.objects.create(
+                    budget=budget, category=category, amount=500.00)
+        for category in categories[:2]:
+            Expense.objects.create(
+                date=datetime.datetime(2024, 1, 10, 12, 0, tzinfo=datetime.timezone.utc),
+                amount=100.00,
+                currency=currency,
+                account=account,
+                category=category,
+                owner=self.user
+            )
+
+        # count + budgets + budget categories, whatever the number of budgets
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('budget-list'), {'limit': 50})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        january = next(
+            budget for budget in response.data['results']
+            if budget['id'] == self.budget.id
+        )
+        self.assertEqual(float(january['total_spent']), 200.00)
+        spent = {item['category']: float(item['spent'])
+                 for item in january['budget_categories']}
+        self.assertEqual(spent, {self.expense_category.id: 100.00})
+        february = next(
+            budget for budget in response.data['results']
+            if budget['name'] == 'Budget 2'
+        )
+        self.assertEqual(float(february['total_spent']), 0)
+        self.assertEqual(len(february['budget_categories']), 4)
+
+    def test_budget_update_many_categories_query_count(self):
+        categories = [
+            ExpenseCategory.objects.create(name=f'Category {i}', owner=self.user)
+            for i in range(40)
+        ]
+        budget_categories = BudgetCategory.objects.bulk_create([
+            BudgetCategory(budget=self.budget, category=category, amount=100)
+            for category in categories[:30]
+        ])
+        # Update 29 categories, drop one and the original one, add 10 new ones
+        data = {
+            'name': 'January Budget',
+            'total_amount': '4000.00',
+            'start_date': '2024-01-01',
+            'end_date': '2024-01-31',
+            'budget_categories': [
+                {'id': budget_category.id, 'category': categories[i].id,
+                 'amount': '150.00'}
+                for i, budget_category in enumerate(budget_categories[:29])
+            ] + [
+                {'id': None, 'category': category.id, 'amount': '50.00'}
+                for category in categories[30:]
+            ]
+        }
+        url = reverse('budget-detail', args=[self.budget.id])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(len(queries), 20)
+
+        self.assertEqual(len(response.data['budget_categories']), 39)
+        amounts = dict(
+            self.budget.budget_categories.values_list('category_id', 'amount'))
+        self.assertEqual(len(amounts), 39)
+        self.assertEqual(float(amounts[categories[0].id]), 150.00)
+        self.assertEqual(float(amounts[categories[39].id]), 50.00)
+        self.assertNotIn(categories[29].id, amounts)
+        self.assertNotIn(self.expense_category.id, amounts)
+        self.assertTrue(
+            BudgetCategory.objects.filter(id=budget_categories[0].id).exists())
+
+    def test_budget_update_foreign_category(self):
+        other_user = User.objects.create_user(
+            username='otheruser',
+            password='password',
+            email='otheruser@example.com',
+        )
+        other_category = ExpenseCategory.objects.create(
+            name='Other', owner=other_user)
+        url = reverse('budget-detail', args=[self.budget.id])
+        data = {
+            'name': 'January Budget',
+            'total_amount': '4000.00',
+            'start_date': '2024-01-01',
+            'end_date': '2024-01-31',
+            'budget_categories': [
+                {'category': other_category.id, 'amount': '10.00'},
+                {'category': 999999, 'amount': '10.00'},
+            ]
+        }
+        response = self.client.put(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Category does not belong to the current user.',
+                      str(response.data))
+        self.assertIn('999999', str(response.data))
+
+    def test_budget_partial_update_new_category_needs_amount(self):
+        other_category = ExpenseCategory.objects.create(
+            name='Travel', owner=self.user)
+        url = reverse('budget-detail', args=[self.budget.id])
+        data = {
+            'start_date': '2024-01-01',
+            'end_date': '2024-01-31',
+            'budget_categories': [
+                {'id': self.budget_category.id, 'amount': '1700.00'},
+                {'category': other_category.id},
+            ]
+        }
+        response = self.client.patch(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['budget_categories'][0], {})
+        self.assertIn('amount', response.data['budget_categories'][1])
+        self.assertEqual(self.budget.budget_categories.count(), 1)
+
+        data['budget_categories'][1]['amount'] = '200.00'
+        response = self.client.patch(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            dict(self.budget.budget_categories.values_list('category_id', 'amount')),
+            {self.expense_category.id: 1700, other_category.id: 200})
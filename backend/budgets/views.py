@@ -12,4 +12,4 @@ class BudgetViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Budget.objects.filter(owner=self.request.user)
+        return Budget.objects.filter(owner=self.request.user).with_spent()
@@ -55,6 +55,7 @@ INSTALLED_APPS = [
     "finances.apps.FinancesConfig",
     "transactions.apps.TransactionsConfig",
     "budgets.apps.BudgetsConfig",
+    "reports.apps.ReportsConfig",
     "api.apps.ApiConfig",
 ]
 
@@ -69,6 +70,16 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Response compression (brotli when installed, gzip otherwise)
+API_COMPRESSION = config("API_COMPRESSION", default=True, cast=bool)
+API_COMPRESSION_MIN_SIZE = config("API_COMPRESSION_MIN_SIZE", default=1024, cast=int)
+
+if API_COMPRESSION:
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("corsheaders.middleware.CorsMiddleware") + 1,
+        "api.middleware.CompressionMiddleware",
+    )
+
 ROOT_URLCONF = "family_budget.urls"
 
 TEMPLATES = [
@@ -163,18 +174,76 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # Bearer JWTs are checked without a query; "Token" keys still work
     "DEFAULT_AUTHENTICATION_CLASSES": [
+        "api.authentication.LazyJWTAuthentication",
         "rest_framework.authentication.TokenAuthentication",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 10,
 }
 
+# orjson-backed renderer and parser instead of the stdlib json ones
+API_FAST_JSON = config("API_FAST_JSON", default=True, cast=bool)
+
+if API_FAST_JSON:
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = [
+        "api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ]
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"] = [
+        "api.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ]
+
 
 SIMPLE_JWT = {
     # Устанавливаем срок жизни токена
-    "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
+    "ACCESS_TOKEN_LIFETIME": timedelta(
+        minutes=config("JWT_ACCESS_TOKEN_MINUTES", default=1440, cast=int)),
+    "REFRESH_TOKEN_LIFETIME": timedelta(
+        days=config("JWT_REFRESH_TOKEN_DAYS", default=14, cast=int)),
     "AUTH_HEADER_TYPES": ("Bearer",),
+    # Log in with email and password, like the token login of djoser
+    "TOKEN_OBTAIN_SERIALIZER": "users.serializers.EmailTokenObtainPairSerializer",
 }
 
 DJOSER = {"LOGIN_FIELD": "email"}
+
+# Budget alerts
+BUDGET_ALERT_THRESHOLDS = [80, 100]
+TELEGRAM_BOT_TOKEN = config("TELEGRAM_BOT_TOKEN", default="")
+
+# Balance history older than this many months is compacted to month ends
+BALANCE_HISTORY_RETENTION_MONTHS = config(
+    "BALANCE_HISTORY_RETENTION_MONTHS", default=18, cast=int
+)
+
+# Seconds cached reports, such as the balance forecast, are kept at most
+REPORT_CACHE_TIMEOUT = config("REPORT_CACHE_TIMEOUT", default=86400, cast=int)
+
+# The default cache holds reports and the versions of the exchange rates
+# and default currencies; the "reference" cache the per-owner lists of
+# currencies, account types, banks, accounts and categories (api.reference).
+# Both are local memory unless another backend is set. With several
+# processes, such as web workers and management commands, the default cache
+# must be one they share, or changes made in one reach the others only
+# when their entries expire.
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": config("CACHE_LOCATION", default=""),
+    },
+    "reference": {
+        "BACKEND": config(
+            "REFERENCE_CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": config("REFERENCE_CACHE_LOCATION", default="reference"),
+    },
+}
+REFERENCE_CACHE_TIMEOUT = config("REFERENCE_CACHE_TIMEOUT", default=3600, cast=int)
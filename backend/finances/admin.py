@@ -1,6 +1,15 @@
 from django.contrib import admin
 
-from .models import Account, AccountBalanceHistory, AccountType, Bank, Currency
+from .models import (
+    Account,
+    AccountBalanceHistory,
+    AccountType,
+    Bank,
+    Currency,
+    ExchangeRate,
+    MonthlyBalanceHistory,
+    WeeklyBalanceHistory,
+)
 
 
 @admin.register(Account)
@@ -53,3 +62,20 @@ class AccountBalanceHistoryAdmin(admin.ModelAdmin):
     search_fields = ["account"]
     ordering = ["account", "date"]
     list_per_page = 10
+
+
+@admin.register(WeeklyBalanceHistory, MonthlyBalanceHistory)
+class BalanceRollupAdmin(admin.ModelAdmin):
+    list_display = ["account", "date", "closing_date", "balance"]
+    list_filter = ["account"]
+    ordering = ["account", "date"]
+    list_per_page = 10
+
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ["date", "base", "quote", "rate"]
+    list_filter = ["base", "quote"]
+    search_fields = ["base", "quote"]
+    ordering = ["-date", "base", "quote"]
+    list_per_page = 10
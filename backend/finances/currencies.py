@@ -0,0 +1,42 @@
+# finances/currencies.py
+
+"""
+Default currency of each owner: the currency of their first account, or
+their first currency while they have no account.
+
+Lookups are served from a dictionary of this process. Each owner's entry
+is checked against a version kept in the default Django cache, which new
+and deleted accounts, account currency changes and currency changes bump,
+so every process sharing the cache (CACHE_BACKEND) drops stale entries
+without querying the database.
+"""
+
+import time
+
+from django.core.cache import cache
+
+from .models import Account, Currency
+
+VERSION_KEY = "finances:default-currency-version:{owner}"
+
+# (version, currency ID) of each owner resolved in this process
+resolved = {}
+
+
+def default_currency_id(owner_id):
+    """ID of the owner's default currency, None if they have none"""
+    version = cache.get(VERSION_KEY.format(owner=owner_id))
+    entry = resolved.get(owner_id)
+    if entry is None or entry[0] != version:
+        currency_id = Account.objects.filter(owner_id=owner_id).order_by(
+            "pk").values_list("currency_id", flat=True).first()
+        if currency_id is None:
+            currency_id = Currency.objects.filter(owner_id=owner_id).order_by(
+                "pk").values_list("pk", flat=True).first()
+        entry = resolved[owner_id] = (version, currency_id)
+    return entry[1]
+
+
+def invalidate_default_currency(owner_id):
+    resolved.pop(owner_id, None)
+    cache.set(VERSION_KEY.format(owner=owner_id), time.time_ns(), None)
@@ -0,0 +1,58 @@
+# finances/downsampling.py
+
+import numpy as np
+
+
+def even_indices(length, points):
+    """``points`` evenly spaced indices into a sequence of ``length`` items"""
+    return np.unique(np.linspace(0, length - 1, points).round().astype(int))
+
+
+def lttb_indices(series, length, points):
+    """
+    Indices of the ``points`` days that best keep the visual shape of the
+    series, picked with Largest-Triangle-Three-Buckets.
+
+    ``series`` holds one or more sequences of ``length`` values, None for
+    unknown. The same days are picked for all of them so the downsampled
+    series stay aligned: each series is scaled to its own range and the
+    triangle areas are summed, so a large account does not drown out the
+    shape of a small one. The first and last day are always kept.
+    """
+    if points >= length:
+        return np.arange(length)
+    if points < 3:
+        return even_indices(length, points)
+
+    data = np.array(list(series), dtype=float).reshape(-1, length)
+    data = data[~np.isnan(data).all(axis=1)]
+    if not len(data):
+        return even_indices(length, points)
+
+    low = np.nanmin(data, axis=1, keepdims=True)
+    span = np.nanmax(data, axis=1, keepdims=True) - low
+    span[span == 0] = 1
+    data = np.nan_to_num((data - low) / span)
+
+    # The days between the first and the last are split into points - 2
+    # buckets; one day is picked from each.
+    edges = np.linspace(1, length - 1, points - 1).astype(int)
+    starts, ends = edges[:-1], edges[1:]
+    bucket_x = (starts + ends - 1) / 2
+    bucket_y = np.add.reduceat(data[:, :length - 1], starts, axis=1) / (ends - starts)
+    # Third corner of each bucket's triangles: the next bucket's average
+    next_x = np.append(bucket_x[1:], length - 1)
+    next_y = np.concatenate([bucket_y[:, 1:], data[:, -1:]], axis=1)
+
+    selected = np.empty(points, dtype=int)
+    selected[0], selected[-1] = 0, length - 1
+    for bucket, (start, end) in enumerate(zip(starts, ends)):
+        previous = selected[bucket]
+        previous_y = data[:, previous:previous + 1]
+        areas = np.abs(
+            (previous - next_x[bucket]) * (data[:, start:end] - previous_y)
+            - (previous - np.arange(start, end))
+            * (next_y[:, bucket:bucket + 1] - previous_y)
+        )
+        selected[bucket + 1] = start + areas.sum(axis=0).argmax()
+    return selected
@@ -0,0 +1,261 @@
+# finances/history.py
+
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models import CharField, FloatField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Cast, TruncDate
+from django.utils import timezone
+from transactions.conversion import ACCOUNT_AMOUNT
+from transactions.models import Expense, Income
+
+from .models import AccountBalanceHistory, MonthlyBalanceHistory, WeeklyBalanceHistory
+
+DEFAULT_PERIOD_DAYS = 30
+
+# Tables holding the balances of each resolution, finest first
+RESOLUTIONS = {
+    "day": AccountBalanceHistory,
+    "week": WeeklyBalanceHistory,
+    "month": MonthlyBalanceHistory,
+}
+
+
+def default_date_range(start_date=None, end_date=None):
+    """
+    Complete a partially given date range.
+
+    A missing end defaults to today and a missing start to the first of the
+    DEFAULT_PERIOD_DAYS days leading up to the end.
+    """
+    end_date = end_date or timezone.localdate()
+    start_date = start_date or end_date - timedelta(days=DEFAULT_PERIOD_DAYS - 1)
+    return start_date, end_date
+
+
+def date_range(start_date, end_date):
+    """Every date from start_date to end_date, inclusive"""
+    return [
+        start_date + timedelta(days=offset)
+        for offset in range((end_date - start_date).days + 1)
+    ]
+
+
+def period_range(start_date, end_date, resolution="day"):
+    """
+    First day of every period of the resolution from the one containing
+    start_date to the one containing end_date
+    """
+    if resolution == "day":
+        return date_range(start_date, end_date)
+    model = RESOLUTIONS[resolution]
+    periods = []
+    period = model.period_start(start_date)
+    while period <= end_date:
+        periods.append(period)
+        period = model.period_end(period) + timedelta(days=1)
+    return periods
+
+
+def choose_resolution(start_date, end_date, points):
+    """Coarsest resolution that still has at least ``points`` periods"""
+    for resolution in reversed(RESOLUTIONS):
+        if len(period_range(start_date, end_date, resolution)) >= points:
+            return resolution
+    return "day"
+
+
+def balance_snapshots(accounts, start_date, end_date, model=AccountBalanceHistory):
+    """
+    Balance rows of the accounts within the date range, plus the last row
+    before start_date of each account to carry its balance into the range.
+
+    ``model`` is AccountBalanceHistory or one of its rollups. Returns
+    (account_id, date, balance) tuples ordered by account and date,
+    fetched with a single query.
+    """
+    previous_date = model.objects.filter(
+        account=OuterRef("account"), date__lt=start_date
+    ).order_by("-date").values("date")[:1]
+    return model.objects.filter(
+        Q(date__gte=start_date) | Q(date=Subquery(previous_date)),
+        account__in=accounts,
+        date__lte=end_date,
+    ).order_by("account", "date").values_list("account", "date", "balance")
+
+
+def months_before(day, months):
+    """First day of the month ``months`` months before the one of day"""
+    month = day.year * 12 + day.month - 1 - months
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def retention_cutoff(months=None, today=None):
+    """
+    First day of the oldest month whose daily balance history is kept in
+    full, BALANCE_HISTORY_RETENTION_MONTHS months before the current one
+    """
+    if months is None:
+        months = settings.BALANCE_HISTORY_RETENTION_MONTHS
+    return months_before(today or timezone.localdate(), months)
+
+
+def transaction_deltas(accounts, start_date, end_date):
+    """
+    Net amount the transactions changed each account's balance by per day,
+    in the account's currency.
+
+    Returns {account_id: {date: amount}}, fetched with a single query.
+    """
+    bounds = {
+        "account__in": accounts,
+        "date__gte": timezone.make_aware(datetime.combine(start_date, time.min)),
+        "date__lt": timezone.make_aware(
+            datetime.combine(end_date + timedelta(days=1), time.min)),
+    }
+    incomes = Income.objects.filter(**bounds).annotate(
+        day=TruncDate("date")).order_by().values("account", "day").annotate(
+        net=Sum(ACCOUNT_AMOUNT)).values_list("account", "day", "net")
+    expenses = Expense.objects.filter(**bounds).annotate(
+        day=TruncDate("date")).order_by().values("account", "day").annotate(
+        net=-Sum(ACCOUNT_AMOUNT)).values_list("account", "day", "net")
+
+    deltas = {}
+    for account_id, day, net in incomes.union(expenses, all=True):
+        account_deltas = deltas.setdefault(account_id, {})
+        account_deltas[day] = account_deltas.get(day, 0) + net
+    return deltas
+
+
+def compacted_until(accounts, dates):
+    """
+    Day daily history is compacted until within a daily range, None when
+    none of the accounts has compacted history in it
+    """
+    until = max(
+        (account.history_compacted_until for account in accounts
+         if account.history_compacted_until),
+        default=None,
+    )
+    return None if until is None or until <= dates[0] else until
+
+
+def compacted_deltas(accounts, dates):
+    """
+    transaction_deltas() of the compacted part of a daily range, or {} when
+    none of the accounts has compacted history in it
+    """
+    until = compacted_until(accounts, dates)
+    if until is None:
+        return {}
+    # Transactions between the row carried into the range and its first
+    # day all fall within the first day's month
+    return transaction_deltas(
+        [account.pk for account in accounts],
+        dates[0].replace(day=1),
+        min(dates[-1], until - timedelta(days=1)),
+    )
+
+
+def balance_series(accounts, dates, resolution="day"):
+    """
+    Dense balance series of each account at the given resolution.
+
+    ``dates`` are the period starts from period_range(). Each value is the
+    balance at the end of its period; periods without a snapshot carry the
+    last known balance forward and periods before an account's first
+    snapshot are None. Returns a dict mapping account IDs to lists aligned
+    with dates.
+
+    Compacted daily history only keeps month ends, so the days in between
+    are rebuilt from the last kept balance and the transactions since.
+    """
+    offsets = {day: offset for offset, day in enumerate(dates)}
+    known = {account.pk: {} for account in accounts}
+    carried = {}
+    snapshots = balance_snapshots(
+        accounts, dates[0], dates[-1], RESOLUTIONS[resolution])
+    for account_id, day, balance in snapshots:
+        if day in offsets:
+            known[account_id][offsets[day]] = balance
+        else:
+            carried[account_id] = (day, balance)
+    deltas = compacted_deltas(accounts, dates) if resolution == "day" else {}
+
+    series = {}
+    for account_id, balances in known.items():
+        account_deltas = deltas.get(account_id, {})
+        balance = None
+        if account_id in carried:
+            carried_date, balance = carried[account_id]
+            balance += sum(
+                amount for day, amount in account_deltas.items()
+                if carried_date < day < dates[0]
+            )
+        values = series[account_id] = []
+        for offset, day in enumerate(dates):
+            if offset in balances:
+                balance = balances[offset]
+            elif balance is not None:
+                balance += account_deltas.get(day, 0)
+            values.append(balance)
+    return series
+
+
+def balance_matrix(accounts, dates, resolution="day"):
+    """
+    balance_series() as an account × period float array in the order of
+    accounts, NaN before each account's first snapshot.
+
+    Dates and balances are fetched as text and floats and placed and
+    carried forward with NumPy, which avoids building a date, a Decimal and
+    a dict entry per snapshot.
+    Daily ranges reaching into compacted history need the transactions
+    between kept balances and go through balance_series().
+    """
+    if resolution == "day" and compacted_until(accounts, dates):
+        series = balance_series(accounts, dates, resolution)
+        return np.array(
+            [series[account.pk] for account in accounts], dtype=float,
+        ).reshape(len(accounts), len(dates))
+
+    # Column 0 holds the balance carried into the range
+    matrix = np.full((len(accounts), len(dates) + 1), np.nan)
+    rows = list(balance_snapshots(
+        accounts, dates[0], dates[-1], RESOLUTIONS[resolution],
+    ).values_list(
+        "account", Cast("date", CharField()), Cast("balance", FloatField())))
+    if rows:
+        account_ids, days, balances = zip(*rows)
+        positions = {account.pk: position for position, account in enumerate(accounts)}
+        matrix[
+            np.fromiter(map(positions.__getitem__, account_ids), dtype=np.int64,
+                        count=len(rows)),
+            np.searchsorted(
+                np.array(dates, dtype="datetime64[D]"),
+                np.array(days, dtype="datetime64[D]"),
+                side="right",
+            ),
+        ] = balances
+
+    # Index of the last known column of each cell, 0 (NaN or carried) if none
+    last = np.where(np.isnan(matrix), 0, np.arange(len(dates) + 1))
+    np.maximum.accumulate(last, axis=1, out=last)
+    return np.take_along_axis(matrix, last, axis=1)[:, 1:]
+
+
+def daily_balances(accounts, start_date, end_date):
+    """
+    Dense daily balance series of each account between two dates, see
+    balance_series()
+    """
+    return balance_series(accounts, date_range(start_date, end_date))
+
+
+def total_series(series, days):
+    """Day by day sum of several balance series, skipping unknown values"""
+    return [
+        sum(values[offset] or 0 for values in series.values())
+        for offset in range(days)
+    ]
@@ -0,0 +1,78 @@
+# finances/management/commands/compact_balance_history.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from finances.history import retention_cutoff
+from finances.models import Account, AccountBalanceHistory
+from finances.signals import keep_balance_rollups
+
+# Stays below SQLite's limit of query parameters
+DELETE_BATCH_SIZE = 900
+
+
+class Command(BaseCommand):
+    help = (
+        'Reduce balance history older than the retention period to the first '
+        'row of each account and the last row of every month'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months', type=int, default=settings.BALANCE_HISTORY_RETENTION_MONTHS,
+            help='Number of months of daily history to keep'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=100,
+            help='Number of accounts compacted per transaction'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only count the rows that would be deleted'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = retention_cutoff(options['months'])
+        account_ids = list(
+            AccountBalanceHistory.objects.filter(date__lt=cutoff)
+            .order_by('account').values_list('account', flat=True).distinct()
+        )
+        chunk_size = options['chunk_size']
+
+        deleted = 0
+        for index in range(0, len(account_ids), chunk_size):
+            chunk = account_ids[index:index + chunk_size]
+            with transaction.atomic():
+                deleted += self.compact(chunk, cutoff, options['dry_run'])
+
+        action = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {deleted} balance history rows before {cutoff} '
+            f'of {len(account_ids)} accounts'))
+
+    def compact(self, account_ids, cutoff, dry_run):
+        rows = list(AccountBalanceHistory.objects.filter(
+            account__in=account_ids, date__lt=cutoff
+        ).order_by('account', 'date').values_list('pk', 'account', 'date'))
+
+        # The last row of every month, plus each account's first row so the
+        # start of its history stays where it was
+        first_rows = {}
+        month_ends = {}
+        for pk, account_id, date in rows:
+            first_rows.setdefault(account_id, pk)
+            month_ends[account_id, date.year, date.month] = pk
+        keep = set(first_rows.values()) | set(month_ends.values())
+        drop = [pk for pk, _, _ in rows if pk not in keep]
+        if dry_run or not drop:
+            return len(drop)
+
+        with keep_balance_rollups():
+            for index in range(0, len(drop), DELETE_BATCH_SIZE):
+                AccountBalanceHistory.objects.filter(
+                    pk__in=drop[index:index + DELETE_BATCH_SIZE]).delete()
+        Account.objects.filter(pk__in=account_ids).filter(
+            Q(history_compacted_until__isnull=True)
+            | Q(history_compacted_until__lt=cutoff)
+        ).update(history_compacted_until=cutoff)
+        return len(drop)
@@ -0,0 +1,20 @@
+# finances/management/commands/load_exchange_rates.py
+from django.core.management.base import BaseCommand, CommandError
+from finances.rates import load_rates
+
+
+class Command(BaseCommand):
+    help = (
+        'Load exchange rates from a CSV file (date, base, quote, rate columns) '
+        'or a JSON file, replacing stored rates of the same pair and day'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSON file with the rates')
+
+    def handle(self, *args, **options):
+        try:
+            count = load_rates(options['path'])
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f'Could not load {options["path"]}: {error}')
+        self.stdout.write(self.style.SUCCESS(f'Loaded {count} exchange rates'))
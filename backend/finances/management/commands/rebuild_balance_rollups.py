@@ -0,0 +1,25 @@
+# finances/management/commands/rebuild_balance_rollups.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from finances.models import Account, MonthlyBalanceHistory, WeeklyBalanceHistory
+
+
+class Command(BaseCommand):
+    help = 'Recompute the weekly and monthly balance rollups from the daily history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int,
+            help='Only rebuild the accounts of the user with this ID'
+        )
+
+    def handle(self, *args, **options):
+        accounts = None
+        if options['user']:
+            accounts = Account.objects.filter(owner_id=options['user'])
+
+        for rollup in (WeeklyBalanceHistory, MonthlyBalanceHistory):
+            with transaction.atomic():
+                count = rollup.rebuild(accounts)
+            self.stdout.write(self.style.SUCCESS(
+                f'Rebuilt {count} {rollup._meta.verbose_name} rows'))
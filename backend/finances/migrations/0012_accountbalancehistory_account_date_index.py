@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-19 11:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0011_alter_account_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="accountbalancehistory",
+            index=models.Index(fields=["account", "date"], name="finances_ac_account_1ef0f5_idx"),
+        ),
+    ]
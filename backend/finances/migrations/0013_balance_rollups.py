@@ -0,0 +1,80 @@
+# Generated by Django 5.1.2 on 2026-10-19 11:35
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_balance_rollups(apps, schema_editor):
+    AccountBalanceHistory = apps.get_model("finances", "AccountBalanceHistory")
+    rollups = {
+        apps.get_model("finances", "WeeklyBalanceHistory"): (
+            lambda date: date - timedelta(days=date.weekday())
+        ),
+        apps.get_model("finances", "MonthlyBalanceHistory"): (
+            lambda date: date.replace(day=1)
+        ),
+    }
+    history = AccountBalanceHistory.objects.order_by("account", "date").values_list(
+        "account", "date", "balance"
+    )
+    for model, period_start in rollups.items():
+        closing = {}
+        for account_id, date, balance in history.iterator():
+            closing[account_id, period_start(date)] = (date, balance)
+        model.objects.bulk_create(
+            [
+                model(
+                    account_id=account_id,
+                    date=period,
+                    closing_date=closing_date,
+                    balance=balance,
+                )
+                for (account_id, period), (closing_date, balance) in closing.items()
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0012_accountbalancehistory_account_date_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyBalanceHistory",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("closing_date", models.DateField()),
+                ("balance", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("account", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="finances.account")),
+            ],
+            options={
+                "verbose_name": "Monthly Balance History",
+                "ordering": ["-date"],
+                "abstract": False,
+                "unique_together": {("account", "date")},
+            },
+        ),
+        migrations.CreateModel(
+            name="WeeklyBalanceHistory",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("closing_date", models.DateField()),
+                ("balance", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("account", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="finances.account")),
+            ],
+            options={
+                "verbose_name": "Weekly Balance History",
+                "ordering": ["-date"],
+                "abstract": False,
+                "unique_together": {("account", "date")},
+            },
+        ),
+        migrations.RunPython(populate_balance_rollups, migrations.RunPython.noop),
+    ]
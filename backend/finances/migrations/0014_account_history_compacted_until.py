@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-19 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0013_balance_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="account",
+            name="history_compacted_until",
+            field=models.DateField(blank=True, editable=False, help_text="Balance history before this date only keeps month ends", null=True, verbose_name="History compacted until"),
+        ),
+    ]
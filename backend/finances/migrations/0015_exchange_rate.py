@@ -0,0 +1,28 @@
+# Generated by Django 5.1.2 on 2026-10-19 12:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0014_account_history_compacted_until"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExchangeRate",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField(help_text="Date the rate is valid from", verbose_name="Date")),
+                ("base", models.CharField(help_text="Code of the base currency", max_length=3, verbose_name="Base")),
+                ("quote", models.CharField(help_text="Code of the quote currency", max_length=3, verbose_name="Quote")),
+                ("rate", models.DecimalField(decimal_places=8, help_text="Units of the quote currency per unit of the base currency", max_digits=18, verbose_name="Rate")),
+            ],
+            options={
+                "verbose_name": "Exchange Rate",
+                "ordering": ["-date", "base", "quote"],
+                "unique_together": {("base", "quote", "date")},
+            },
+        ),
+    ]
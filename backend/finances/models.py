@@ -1,5 +1,8 @@
 # finances/models.py
 
+from calendar import monthrange
+from datetime import timedelta
+
 from django.db import models
 
 
@@ -39,6 +42,36 @@ class Currency(models.Model):
         return self.code
 
 
+class ExchangeRate(models.Model):
+    """
+    Exchange rate model: units of the quote currency one unit of the base
+    currency buys from a date on, until the next rate of the pair. Rates
+    are shared by all users and keyed by currency code.
+    """
+
+    date = models.DateField(verbose_name="Date", help_text="Date the rate is valid from")
+    base = models.CharField(
+        max_length=3, verbose_name="Base", help_text="Code of the base currency"
+    )
+    quote = models.CharField(
+        max_length=3, verbose_name="Quote", help_text="Code of the quote currency"
+    )
+    rate = models.DecimalField(
+        max_digits=18,
+        decimal_places=8,
+        verbose_name="Rate",
+        help_text="Units of the quote currency per unit of the base currency",
+    )
+
+    class Meta:
+        verbose_name = "Exchange Rate"
+        unique_together = ["base", "quote", "date"]
+        ordering = ["-date", "base", "quote"]
+
+    def __str__(self):
+        return f"{self.base}/{self.quote} {self.date}: {self.rate}"
+
+
 class AccountType(models.Model):
     """Account Type model"""
 
@@ -133,6 +166,13 @@ class Account(models.Model):
         verbose_name="Owner",
         help_text="Select account owner",
     )
+    history_compacted_until = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="History compacted until",
+        help_text="Balance history before this date only keeps month ends",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -144,6 +184,13 @@ class Account(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Currency as saved, to tell the saves that change it
+        instance._saved_currency_id = instance.__dict__.get("currency_id")
+        return instance
+
 
 class AccountBalanceHistory(models.Model):
     account = models.ForeignKey(Account, on_delete=models.CASCADE)
@@ -153,3 +200,122 @@ class AccountBalanceHistory(models.Model):
     class Meta:
         verbose_name = "Account Balance History"
         ordering = ['-date']
+        indexes = [models.Index(fields=["account", "date"])]
+
+
+class BalanceRollup(models.Model):
+    """
+    Closing balance of an account per period, rolled up from the daily
+    AccountBalanceHistory rows.
+
+    ``date`` is the first day of the period and ``balance`` the balance of
+    the period's last daily snapshot, taken on ``closing_date``. Kept current
+    by the AccountBalanceHistory signals in finances.signals.
+    """
+
+    account = models.ForeignKey(Account, on_delete=models.CASCADE)
+    date = models.DateField()
+    closing_date = models.DateField()
+    balance = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        abstract = True
+        ordering = ['-date']
+        unique_together = ['account', 'date']
+
+    def __str__(self):
+        return f'{self.account} {self.date}: {self.balance}'
+
+    @staticmethod
+    def period_start(date):
+        raise NotImplementedError
+
+    @staticmethod
+    def period_end(start):
+        raise NotImplementedError
+
+    @classmethod
+    def record(cls, account_id, date, balance):
+        """Roll a daily snapshot into its period unless a later one closes it"""
+        # Snapshots created in memory may still hold a datetime
+        date = cls._meta.get_field('date').to_python(date)
+        period = cls.period_start(date)
+        updated = cls.objects.filter(
+            account_id=account_id, date=period, closing_date__lte=date
+        ).update(closing_date=date, balance=balance)
+        if not updated:
+            cls.objects.get_or_create(
+                account_id=account_id,
+                date=period,
+                defaults={'closing_date': date, 'balance': balance},
+            )
+
+    @classmethod
+    def refresh(cls, account_id, date):
+        """Recompute the period containing date from the daily snapshots"""
+        date = cls._meta.get_field('date').to_python(date)
+        period = cls.period_start(date)
+        last = AccountBalanceHistory.objects.filter(
+            account_id=account_id,
+            date__range=(period, cls.period_end(period)),
+        ).order_by('-date').first()
+        if last is None:
+            cls.objects.filter(account_id=account_id, date=period).delete()
+        else:
+            cls.objects.update_or_create(
+                account_id=account_id,
+                date=period,
+                defaults={'closing_date': last.date, 'balance': last.balance},
+            )
+
+    @classmethod
+    def rebuild(cls, accounts=None):
+        """Recompute all periods of the accounts (default: all accounts)"""
+        history = AccountBalanceHistory.objects.order_by('account', 'date')
+        rollups = cls.objects.all()
+        if accounts is not None:
+            history = history.filter(account__in=accounts)
+            rollups = rollups.filter(account__in=accounts)
+
+        closing = {}
+        for account_id, date, balance in history.values_list(
+                'account', 'date', 'balance').iterator():
+            closing[account_id, cls.period_start(date)] = (date, balance)
+
+        rollups.delete()
+        cls.objects.bulk_create([
+            cls(account_id=account_id, date=period,
+                closing_date=closing_date, balance=balance)
+            for (account_id, period), (closing_date, balance) in closing.items()
+        ], batch_size=1000)
+        return len(closing)
+
+
+class WeeklyBalanceHistory(BalanceRollup):
+    """Closing balance of an account per week, starting on Monday"""
+
+    class Meta(BalanceRollup.Meta):
+        verbose_name = 'Weekly Balance History'
+
+    @staticmethod
+    def period_start(date):
+        return date - timedelta(days=date.weekday())
+
+    @staticmethod
+    def period_end(start):
+        return start + timedelta(days=6)
+
+
+class MonthlyBalanceHistory(BalanceRollup):
+    """Closing balance of an account per calendar month"""
+
+    class Meta(BalanceRollup.Meta):
+        verbose_name = 'Monthly Balance History'
+
+    @staticmethod
+    def period_start(date):
+        return date.replace(day=1)
+
+    @staticmethod
+    def period_end(start):
+        return start.replace(day=monthrange(start.year, start.month)[1])
@@ -0,0 +1,210 @@
+# finances/rates.py
+
+"""
+Exchange rate lookups and currency conversion.
+
+The rates of every pair are kept in memory, sorted by date, so a lookup
+is a binary search for the rate in effect on a day (the latest one on or
+before it). Pairs without rates of their own are served by the inverse
+pair or crossed through a currency both sides have rates with. The cache
+is built once per process and rebuilt when the version of the rates in
+the default Django cache changes. Processes see each other's changes only
+if that cache is shared (CACHE_BACKEND); with the local memory default,
+rates loaded by a management command reach running web workers when they
+restart.
+"""
+
+import csv
+import json
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+import numpy as np
+from django.core.cache import cache
+
+from .models import ExchangeRate
+
+VERSION_KEY = "finances:exchange-rates-version"
+
+# The rate cache of this process and the version it was built at
+loaded = {"cache": None, "version": None}
+
+
+class MissingExchangeRate(LookupError):
+    """No rate converts between two currencies on a day"""
+
+
+def to_ordinals(days):
+    if isinstance(days, np.ndarray) and days.dtype.kind == "i":
+        return days
+    return np.fromiter(map(date.toordinal, days), dtype=np.int64, count=len(days))
+
+
+class ExchangeRateCache:
+    """Date-indexed exchange rates of every pair"""
+
+    def __init__(self, rows):
+        grouped = defaultdict(list)
+        for base, quote, day, rate in rows:
+            grouped[(base, quote)].append((day.toordinal(), float(rate)))
+        self.currencies = {currency for pair in grouped for currency in pair}
+        self.pairs = {}
+        for pair, values in grouped.items():
+            values.sort()
+            self.pairs[pair] = self.make_series(*zip(*values))
+
+    @staticmethod
+    def make_series(days, rates):
+        """Days as a list for bisect and an array, with the rates"""
+        days = np.asarray(days, dtype=np.int64)
+        return days.tolist(), days, np.asarray(rates, dtype=float)
+
+    def own_series(self, base, quote):
+        if (base, quote) in self.pairs:
+            return self.pairs[(base, quote)]
+        if (quote, base) in self.pairs:
+            _, days, rates = self.pairs[(quote, base)]
+            return self.make_series(days, 1 / rates)
+        return None
+
+    def cross_series(self, base, quote):
+        """Rates crossed through the first currency both sides have rates with"""
+        for pivot in sorted(self.currencies - {base, quote}):
+            first, second = self.own_series(base, pivot), self.own_series(pivot, quote)
+            if first is None or second is None:
+                continue
+            # Both legs are known from the later of their first days on
+            days = np.union1d(first[1], second[1])
+            days = days[days >= max(first[1][0], second[1][0])]
+            return self.make_series(days, (
+                first[2][np.searchsorted(first[1], days, side="right") - 1]
+                * second[2][np.searchsorted(second[1], days, side="right") - 1]
+            ))
+        return None
+
+    def series(self, base, quote):
+        """Days and rates of a pair, derived and kept if it has none of its own"""
+        if (base, quote) not in self.pairs:
+            series = self.own_series(base, quote) or self.cross_series(base, quote)
+            if series is None:
+                raise MissingExchangeRate(f"No exchange rate from {base} to {quote}")
+            self.pairs[(base, quote)] = series
+        return self.pairs[(base, quote)]
+
+    def rate(self, base, quote, day):
+        """Rate in effect on a day"""
+        if base == quote:
+            return 1.0
+        days, _, rates = self.series(base, quote)
+        index = bisect_right(days, day.toordinal()) - 1
+        if index < 0:
+            raise MissingExchangeRate(f"No {base}/{quote} rate on or before {day}")
+        return float(rates[index])
+
+    def rates(self, base, quote, days, strict=True):
+        """
+        Rates in effect on many days, as an array. Unless ``strict``, days
+        without a rate get NaN instead of raising MissingExchangeRate.
+        """
+        ordinals = to_ordinals(days)
+        if base == quote:
+            return np.ones(len(ordinals))
+        try:
+            _, known, rates = self.series(base, quote)
+        except MissingExchangeRate:
+            if strict:
+                raise
+            return np.full(len(ordinals), np.nan)
+        index = np.searchsorted(known, ordinals, side="right") - 1
+        if strict and (index < 0).any():
+            day = date.fromordinal(int(ordinals[index < 0].min()))
+            raise MissingExchangeRate(f"No {base}/{quote} rate on or before {day}")
+        return np.where(index < 0, np.nan, rates[index])
+
+    def convert(self, amounts, currencies, days, target):
+        """
+        Amounts in the currencies with the given codes, on the given days,
+        converted to the target currency. One lookup per currency covers all
+        of its amounts.
+        """
+        amounts = np.asarray(amounts, dtype=float)
+        ordinals = to_ordinals(days)
+        codes, inverse = np.unique(np.asarray(currencies, dtype=str), return_inverse=True)
+        factors = np.ones(len(amounts))
+        for index, code in enumerate(codes.tolist()):
+            if code != target:
+                selected = inverse == index
+                factors[selected] = self.rates(code, target, ordinals[selected])
+        return amounts * factors
+
+
+def get_rate_cache():
+    """The exchange rate cache of this process, rebuilt if rates changed"""
+    version = cache.get(VERSION_KEY)
+    if loaded["cache"] is None or loaded["version"] != version:
+        loaded["cache"] = ExchangeRateCache(
+            ExchangeRate.objects.values_list("base", "quote", "date", "rate").iterator())
+        loaded["version"] = version
+    return loaded["cache"]
+
+
+def invalidate_rate_cache():
+    loaded["cache"] = None
+    cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def parse_rate(base, quote, day, rate, source):
+    try:
+        rate = Decimal(str(rate))
+        day = date.fromisoformat(str(day))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"{source}: invalid date or rate")
+    if rate <= 0 or len(base) != 3 or len(quote) != 3:
+        raise ValueError(f"{source}: invalid currency code or rate")
+    return ExchangeRate(date=day, base=base.upper(), quote=quote.upper(), rate=rate)
+
+
+def read_rates(path):
+    """
+    Exchange rates from a CSV file with date, base, quote and rate columns,
+    or a JSON file with a list of such objects or with a "base" code and
+    "rates" mapping dates to {quote code: rate}
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="") as file:
+            return [
+                parse_rate(row["base"], row["quote"], row["date"], row["rate"],
+                           f"line {line}")
+                for line, row in enumerate(csv.DictReader(file), start=2)
+            ]
+    data = json.loads(path.read_text())
+    if isinstance(data, dict):
+        return [
+            parse_rate(data["base"], quote, day, rate, day)
+            for day, quotes in data["rates"].items()
+            for quote, rate in quotes.items()
+        ]
+    return [
+        parse_rate(item["base"], item["quote"], item["date"], item["rate"],
+                   f"item {index}")
+        for index, item in enumerate(data)
+    ]
+
+
+def load_rates(path):
+    """Add the rates of a file, replacing stored ones of the same pair and day"""
+    rates = read_rates(path)
+    ExchangeRate.objects.bulk_create(
+        rates,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["base", "quote", "date"],
+        update_fields=["rate"],
+    )
+    invalidate_rate_cache()
+    return len(rates)
@@ -81,3 +81,53 @@ class AccountBalanceHistorySerializer(serializers.ModelSerializer):
     class Meta:
         model = AccountBalanceHistory
         fields = ("id", "date", "balance")
+
+
+class IdListField(serializers.Field):
+    """Comma separated list of IDs, e.g. ``accounts=1,2,3``"""
+
+    default_error_messages = {
+        "invalid": "Expected a comma separated list of IDs.",
+    }
+
+    def to_internal_value(self, data):
+        try:
+            return [int(value) for value in str(data).split(",") if value.strip()]
+        except ValueError:
+            self.fail("invalid")
+
+    def to_representation(self, value):
+        return ",".join(str(item) for item in value)
+
+
+class DateRangeQuerySerializer(serializers.Serializer):
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        start_date = attrs.get("start_date")
+        end_date = attrs.get("end_date")
+        if start_date and end_date and start_date > end_date:
+            raise serializers.ValidationError(
+                "Start date must be earlier than or equal to end date."
+            )
+        return attrs
+
+
+class BalanceHistoryQuerySerializer(serializers.Serializer):
+    accounts = IdListField(required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    total = serializers.BooleanField(default=False)
+    points = serializers.IntegerField(required=False, min_value=3)
+    resolution = serializers.ChoiceField(
+        choices=["day", "week", "month", "auto"], default="day")
+
+    def validate(self, attrs):
+        start = attrs.get("start")
+        end = attrs.get("end")
+        if start and end and start > end:
+            raise serializers.ValidationError(
+                "Start date must be earlier than or equal to end date."
+            )
+        return attrs
@@ -1,27 +1,35 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from decimal import Decimal
 
-from django.db.models.signals import post_delete, post_save, pre_save
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from finances.models import AccountBalanceHistory
+from finances.models import (
+    Account,
+    AccountBalanceHistory,
+    Currency,
+    ExchangeRate,
+    MonthlyBalanceHistory,
+    WeeklyBalanceHistory,
+)
 from transactions.models import Expense, Income
 
-# Global variable to store the original value of amount
-previous_amount = {}
+from .currencies import invalidate_default_currency
+from .rates import invalidate_rate_cache
 
+BALANCE_ROLLUPS = (WeeklyBalanceHistory, MonthlyBalanceHistory)
 
-@receiver(pre_save, sender=Expense)
-@receiver(pre_save, sender=Income)
-def set_previous_amount(sender, instance, **kwargs):
-    if instance.pk:  # If the transaction exists (i.e., it's not a creation)
-        previous_amount[instance.pk] = Decimal(
-            sender.objects.get(pk=instance.pk).amount)
+# Set inside keep_balance_rollups(), per thread and task
+rollups_kept = ContextVar("rollups_kept", default=False)
 
 
 @receiver(post_save, sender=Expense)
 @receiver(post_save, sender=Income)
 def update_account_balance_on_save(sender, instance, created, **kwargs):
     account = instance.account
-    amount = Decimal(instance.amount)  # Ensure amount is a Decimal
+    # In the account's currency, converted when the transaction was saved
+    amount = Decimal(instance.account_amount)
     if created:
         if isinstance(instance, Expense):
             account.balance = Decimal(account.balance) - amount
@@ -29,13 +37,12 @@ def update_account_balance_on_save(sender, instance, created, **kwargs):
             account.balance = Decimal(account.balance) + amount
     else:
         # Use the saved value before the change
-        old_amount = previous_amount.get(instance.pk, Decimal("0.00"))
-        old_amount = Decimal(old_amount)
+        previous = instance.previous
+        old_amount = Decimal(previous.account_amount if previous else "0.00")
         if isinstance(instance, Expense):
             account.balance += old_amount - amount
         elif isinstance(instance, Income):
             account.balance -= old_amount - amount
-        previous_amount.pop(instance.pk, None)
     account.save()
 
 
@@ -43,7 +50,8 @@ def update_account_balance_on_save(sender, instance, created, **kwargs):
 @receiver(post_delete, sender=Income)
 def update_account_balance_on_delete(sender, instance, **kwargs):
     account = instance.account
-    amount = Decimal(instance.amount)  # Ensure amount is a Decimal
+    # In the account's currency, converted when the transaction was saved
+    amount = Decimal(instance.account_amount)
     if isinstance(instance, Expense):
         account.balance = Decimal(account.balance) + amount
     elif isinstance(instance, Income):
@@ -80,3 +88,55 @@ def log_balance_history(sender, instance, **kwargs):
     )
     # Обновляем будущие записи баланса после текущей транзакции
     update_future_balances(account, instance.date.date())
+
+
+@receiver(post_save, sender=AccountBalanceHistory)
+def roll_up_balance_history(sender, instance, **kwargs):
+    for rollup in BALANCE_ROLLUPS:
+        rollup.record(instance.account_id, instance.date, instance.balance)
+
+
+@contextmanager
+def keep_balance_rollups():
+    """
+    Delete daily balance history without refreshing the rollups, which
+    keep the closing balances computed from the full history
+    """
+    token = rollups_kept.set(True)
+    try:
+        yield
+    finally:
+        rollups_kept.reset(token)
+
+
+@receiver(post_delete, sender=AccountBalanceHistory)
+def refresh_balance_rollups(sender, instance, origin=None, **kwargs):
+    # The rollups of a deleted account go away with it
+    deleting_accounts = isinstance(origin, Account) or (
+        isinstance(origin, QuerySet) and origin.model is Account)
+    if deleting_accounts or rollups_kept.get():
+        return
+    for rollup in BALANCE_ROLLUPS:
+        rollup.refresh(instance.account_id, instance.date)
+
+
+@receiver(post_save, sender=ExchangeRate)
+@receiver(post_delete, sender=ExchangeRate)
+def invalidate_rates(sender, instance, **kwargs):
+    invalidate_rate_cache()
+
+
+@receiver(post_save, sender=Account)
+def invalidate_default_currency_on_account_save(sender, instance, created, **kwargs):
+    # Balance updates save the account on every transaction, but only new
+    # accounts and currency changes can change the default currency
+    if created or instance.currency_id != getattr(instance, "_saved_currency_id", None):
+        invalidate_default_currency(instance.owner_id)
+    instance._saved_currency_id = instance.currency_id
+
+
+@receiver(post_delete, sender=Account)
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def invalidate_owner_default_currency(sender, instance, **kwargs):
+    invalidate_default_currency(instance.owner_id)
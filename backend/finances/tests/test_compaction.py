@@ -0,0 +1,178 @@
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from threading import Thread
+
+import numpy as np
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from finances.history import (
+    balance_matrix,
+    balance_series,
+    daily_balances,
+    period_range,
+)
+from finances.models import (
+    Account,
+    AccountBalanceHistory,
+    AccountType,
+    Bank,
+    Currency,
+    MonthlyBalanceHistory,
+    WeeklyBalanceHistory,
+)
+from finances.signals import keep_balance_rollups, rollups_kept
+from transactions.models import Expense, ExpenseCategory, Income, IncomeCategory
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        username="testuser", password="password", email="testuser@test.com"
+    )
+
+
+@pytest.fixture
+def account(user):
+    currency = Currency.objects.create(
+        name="Dollar", code="USD", symbol="$", owner=user
+    )
+    account_type = AccountType.objects.create(name="Savings", owner=user)
+    bank = Bank.objects.create(name="Test Bank", country="Test Country", owner=user)
+
+    return Account.objects.create(
+        name="Main Account",
+        account_type=account_type,
+        bank=bank,
+        balance=Decimal("1000.00"),
+        currency=currency,
+        owner=user
+    )
+
+
+@pytest.fixture
+def transactions(user, account):
+    """Two years of transactions every few days, in date order"""
+    expense_category = ExpenseCategory.objects.create(name="Groceries", owner=user)
+    income_category = IncomeCategory.objects.create(name="Salary", owner=user)
+    day = date(2022, 1, 3)
+    while day < date(2024, 1, 1):
+        moment = datetime(day.year, day.month, day.day, 12, tzinfo=dt_timezone.utc)
+        if day.day <= 4:
+            Income.objects.create(
+                category=income_category, amount=Decimal("500.00"), account=account,
+                currency=account.currency, date=moment, owner=user)
+        else:
+            Expense.objects.create(
+                category=expense_category, amount=Decimal(day.day) + Decimal("0.25"),
+                account=account, currency=account.currency, date=moment, owner=user)
+        day += timedelta(days=3)
+
+
+def series(account, start, end):
+    account = Account.objects.get(pk=account.pk)
+    return {
+        resolution: balance_series(
+            [account], period_range(start, end, resolution), resolution)[account.pk]
+        for resolution in ("day", "week", "month")
+    }
+
+
+@pytest.mark.django_db
+def test_compaction_keeps_first_row_and_month_ends(account, transactions):
+    before = AccountBalanceHistory.objects.count()
+    first = AccountBalanceHistory.objects.order_by("date").first()
+
+    call_command("compact_balance_history", months=6, stdout=StringIO())
+
+    rows = list(AccountBalanceHistory.objects.order_by("date").values_list("date", flat=True))
+    assert len(rows) == 25  # the first row and one row for each of 24 months
+    assert len(rows) < before
+    assert rows[0] == first.date
+    assert all(row.month != later.month for row, later in zip(rows[1:], rows[2:]))
+    account.refresh_from_db()
+    assert account.history_compacted_until is not None
+
+
+@pytest.mark.django_db
+def test_compaction_keeps_point_in_time_balances(account, transactions):
+    ranges = [
+        (date(2022, 1, 1), date(2023, 12, 31)),
+        (date(2022, 3, 17), date(2022, 3, 17)),
+        (date(2023, 6, 10), date(2023, 8, 2)),
+    ]
+    expected = [series(account, start, end) for start, end in ranges]
+
+    call_command("compact_balance_history", months=6, stdout=StringIO())
+
+    for (start, end), values in zip(ranges, expected):
+        assert series(account, start, end) == values
+
+
+@pytest.mark.django_db
+def test_compaction_keeps_rollups(account, transactions):
+    weekly = list(WeeklyBalanceHistory.objects.values_list("date", "balance"))
+    monthly = list(MonthlyBalanceHistory.objects.values_list("date", "balance"))
+
+    call_command("compact_balance_history", months=6, stdout=StringIO())
+
+    assert list(WeeklyBalanceHistory.objects.values_list("date", "balance")) == weekly
+    assert list(MonthlyBalanceHistory.objects.values_list("date", "balance")) == monthly
+
+
+def test_kept_rollups_are_per_thread():
+    seen = []
+    with keep_balance_rollups():
+        thread = Thread(target=lambda: seen.append(rollups_kept.get()))
+        thread.start()
+        thread.join()
+        assert rollups_kept.get()
+    assert seen == [False]
+    assert not rollups_kept.get()
+
+
+@pytest.mark.django_db
+def test_compaction_dry_run(account, transactions):
+    before = AccountBalanceHistory.objects.count()
+
+    out = StringIO()
+    call_command("compact_balance_history", months=6, dry_run=True, stdout=out)
+
+    assert out.getvalue().startswith(f"Would delete {before - 25} ")
+    assert AccountBalanceHistory.objects.count() == before
+    account.refresh_from_db()
+    assert account.history_compacted_until is None
+
+
+@pytest.mark.django_db
+def test_uncompacted_history_reads_no_transactions(
+        account, transactions, django_assert_num_queries):
+    account = Account.objects.get(pk=account.pk)
+    with django_assert_num_queries(1):
+        daily_balances([account], date(2022, 1, 1), date(2023, 12, 31))
+
+
+@pytest.mark.django_db
+def test_balance_matrix_matches_series(account, transactions):
+    ranges = [
+        (date(2021, 12, 20), date(2022, 2, 1)),
+        (date(2022, 3, 17), date(2022, 3, 17)),
+        (date(2023, 6, 10), date(2023, 8, 2)),
+    ]
+    for compacted in (False, True):
+        if compacted:
+            call_command("compact_balance_history", months=6, stdout=StringIO())
+        account = Account.objects.get(pk=account.pk)
+        for (start, end), values in (
+                (bounds, series(account, *bounds)) for bounds in ranges):
+            for resolution, expected in values.items():
+                matrix = balance_matrix(
+                    [account], period_range(start, end, resolution), resolution)
+                assert matrix.shape == (1, len(expected))
+                assert matrix[0].tolist() == pytest.approx(
+                    [np.nan if value is None else float(value) for value in expected],
+                    nan_ok=True)
@@ -0,0 +1,37 @@
+import math
+
+import numpy as np
+from finances.downsampling import lttb_indices
+
+
+def test_lttb_indices_keeps_short_series():
+    assert list(lttb_indices([[1, 2, 3]], 3, 10)) == [0, 1, 2]
+
+
+def test_lttb_indices_keeps_ends_and_extremes():
+    values = [0.0] * 1000
+    values[437] = 50.0
+    values[712] = -30.0
+
+    indices = lttb_indices([values], 1000, 20)
+    assert len(indices) == 20
+    assert indices[0] == 0 and indices[-1] == 999
+    assert 437 in indices and 712 in indices
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_indices_follows_every_series():
+    large = [1000.0 * math.sin(day / 50) for day in range(500)]
+    small = [0.0] * 500
+    small[333] = 1.0
+
+    # The spike in the small series survives next to the large one
+    assert 333 in lttb_indices([large, small], 500, 50)
+
+
+def test_lttb_indices_handles_unknown_values():
+    values = [None] * 100 + [float(day % 7) for day in range(100)]
+
+    indices = lttb_indices([values, [None] * 200], 200, 30)
+    assert len(indices) == 30
+    assert list(lttb_indices([[None] * 200], 200, 5)) == [0, 50, 100, 149, 199]
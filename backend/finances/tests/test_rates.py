@@ -0,0 +1,106 @@
+import json
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from finances.models import ExchangeRate
+from finances.rates import ExchangeRateCache, MissingExchangeRate, get_rate_cache
+
+RATES = [
+    ("EUR", "USD", date(2024, 1, 1), Decimal("1.10")),
+    ("EUR", "USD", date(2024, 1, 10), Decimal("1.20")),
+    ("EUR", "GBP", date(2024, 1, 5), Decimal("0.80")),
+]
+
+
+@pytest.fixture
+def rates():
+    return ExchangeRateCache(RATES)
+
+
+def test_as_of_lookup(rates):
+    assert rates.rate("EUR", "USD", date(2024, 1, 1)) == 1.10
+    assert rates.rate("EUR", "USD", date(2024, 1, 9)) == 1.10
+    assert rates.rate("EUR", "USD", date(2024, 3, 1)) == 1.20
+    assert rates.rate("USD", "USD", date(2000, 1, 1)) == 1.0
+    with pytest.raises(MissingExchangeRate):
+        rates.rate("EUR", "USD", date(2023, 12, 31))
+    with pytest.raises(MissingExchangeRate):
+        rates.rate("EUR", "JPY", date(2024, 1, 10))
+
+
+def test_inverse_and_cross_rates(rates):
+    assert rates.rate("USD", "EUR", date(2024, 1, 10)) == pytest.approx(1 / 1.20)
+    # USD -> EUR -> GBP, known once both legs are
+    assert rates.rate("USD", "GBP", date(2024, 1, 5)) == pytest.approx(0.80 / 1.10)
+    assert rates.rate("USD", "GBP", date(2024, 1, 12)) == pytest.approx(0.80 / 1.20)
+    with pytest.raises(MissingExchangeRate):
+        rates.rate("USD", "GBP", date(2024, 1, 4))
+
+
+def test_vectorized_rates_and_conversion(rates):
+    days = [date(2024, 1, 2), date(2024, 1, 10), date(2024, 2, 1)]
+    assert rates.rates("EUR", "USD", days).tolist() == [1.10, 1.20, 1.20]
+
+    converted = rates.convert(
+        [100, 100, 50, 10], ["EUR", "USD", "GBP", "EUR"],
+        [date(2024, 1, 2), date(2024, 1, 2), date(2024, 1, 10), date(2024, 1, 12)],
+        "USD",
+    )
+    assert converted == pytest.approx([110, 100, 50 / 0.80 * 1.20, 12])
+
+    ordinals = np.array([date(2024, 1, 2).toordinal()])
+    assert rates.convert([1], ["EUR"], ordinals, "EUR").tolist() == [1.0]
+    with pytest.raises(MissingExchangeRate):
+        rates.convert([1, 1], ["EUR", "GBP"], [date(2024, 1, 2)] * 2, "USD")
+
+
+@pytest.mark.django_db
+def test_cache_follows_stored_rates():
+    ExchangeRate.objects.create(
+        base="EUR", quote="USD", date=date(2024, 1, 1), rate=Decimal("1.10"))
+    cache = get_rate_cache()
+    assert get_rate_cache() is cache
+    assert cache.rate("EUR", "USD", date(2024, 2, 1)) == 1.10
+
+    rate = ExchangeRate.objects.create(
+        base="EUR", quote="USD", date=date(2024, 2, 1), rate=Decimal("1.15"))
+    assert get_rate_cache().rate("EUR", "USD", date(2024, 2, 1)) == 1.15
+    rate.delete()
+    assert get_rate_cache().rate("EUR", "USD", date(2024, 2, 1)) == 1.10
+
+
+@pytest.mark.django_db
+def test_load_exchange_rates(tmp_path):
+    csv_file = tmp_path / "rates.csv"
+    csv_file.write_text(
+        "date,base,quote,rate\n2024-01-01,EUR,USD,1.10\n2024-01-02,eur,usd,1.11\n")
+    json_file = tmp_path / "rates.json"
+    json_file.write_text(json.dumps({
+        "base": "EUR",
+        "rates": {"2024-01-02": {"USD": "1.12", "GBP": "0.86"}},
+    }))
+    list_file = tmp_path / "list.json"
+    list_file.write_text(json.dumps([
+        {"date": "2024-01-03", "base": "GBP", "quote": "JPY", "rate": 180.5}]))
+
+    out = StringIO()
+    call_command("load_exchange_rates", str(csv_file), stdout=out)
+    assert "Loaded 2 exchange rates" in out.getvalue()
+    call_command("load_exchange_rates", str(json_file), stdout=out)
+    call_command("load_exchange_rates", str(list_file), stdout=out)
+
+    assert ExchangeRate.objects.count() == 4
+    assert ExchangeRate.objects.get(
+        base="EUR", quote="USD", date=date(2024, 1, 2)).rate == Decimal("1.12")
+    assert get_rate_cache().rate("EUR", "JPY", date(2024, 1, 3)) == pytest.approx(
+        0.86 * 180.5)
+
+    bad_file = tmp_path / "bad.csv"
+    bad_file.write_text("date,base,quote,rate\n2024-01-01,EUR,USD,-1\n")
+    with pytest.raises(CommandError, match="line 2"):
+        call_command("load_exchange_rates", str(bad_file), stdout=out)
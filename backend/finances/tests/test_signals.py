@@ -1,9 +1,20 @@
+from datetime import date
 from decimal import Decimal
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
-from finances.models import Account, AccountBalanceHistory, AccountType, Bank, Currency
+from finances.models import (
+    Account,
+    AccountBalanceHistory,
+    AccountType,
+    Bank,
+    Currency,
+    MonthlyBalanceHistory,
+    WeeklyBalanceHistory,
+)
 from transactions.models import Expense, ExpenseCategory, Income, IncomeCategory
 
 User = get_user_model()
@@ -94,6 +105,33 @@ def test_expense_update_updates_account_balance(user, account):
     assert account.balance == initial_balance + Decimal("50.00")
 
 
+@pytest.mark.django_db
+def test_expense_update_loads_the_stored_expense_once(user, account):
+    category = ExpenseCategory.objects.create(name="Groceries", owner=user)
+    expense = Expense.objects.create(
+        category=category,
+        amount=Decimal("100.00"),
+        account=account,
+        currency=account.currency,
+        date=timezone.now(),
+        owner=user,
+    )
+
+    # Each save compares with the expense as stored right before it
+    for amount in ("50.00", "70.00"):
+        expense.amount = Decimal(amount)
+        with CaptureQueriesContext(connection) as queries:
+            expense.save()
+        loads = [
+            query for query in queries.captured_queries
+            if query["sql"].startswith("SELECT")
+            and f'WHERE "transactions_expense"."id" = {expense.pk}' in query["sql"]
+        ]
+        assert len(loads) == 1
+    account.refresh_from_db()
+    assert account.balance == Decimal("930.00")
+
+
 @pytest.mark.django_db
 def test_expense_deletion_updates_account_balance(user, account):
     category = ExpenseCategory.objects.create(name="Groceries", owner=user)
@@ -204,3 +242,88 @@ def test_income_creation_updates_balance_history(user, account):
 
     assert latest_balance_history.balance == account.balance
     assert latest_balance_history.balance == initial_balance + Decimal("3000.00")
+
+
+# Tests for the weekly and monthly balance rollups
+def rollup_rows(model, account):
+    return list(
+        model.objects.filter(account=account)
+        .order_by("date")
+        .values_list("date", "closing_date", "balance")
+    )
+
+
+@pytest.mark.django_db
+def test_balance_history_rolls_up_into_periods(account):
+    # Wednesday 2024-01-31 and Friday 2024-02-02 share a week, not a month
+    for day, balance in ((date(2024, 1, 30), "10.00"), (date(2024, 1, 31), "20.00"),
+                         (date(2024, 2, 2), "30.00")):
+        AccountBalanceHistory.objects.create(
+            account=account, date=day, balance=Decimal(balance))
+
+    assert rollup_rows(WeeklyBalanceHistory, account) == [
+        (date(2024, 1, 29), date(2024, 2, 2), Decimal("30.00")),
+    ]
+    assert rollup_rows(MonthlyBalanceHistory, account) == [
+        (date(2024, 1, 1), date(2024, 1, 31), Decimal("20.00")),
+        (date(2024, 2, 1), date(2024, 2, 2), Decimal("30.00")),
+    ]
+
+
+@pytest.mark.django_db
+def test_earlier_balance_history_keeps_period_closing(account):
+    AccountBalanceHistory.objects.create(
+        account=account, date=date(2024, 1, 20), balance=Decimal("20.00"))
+    AccountBalanceHistory.objects.create(
+        account=account, date=date(2024, 1, 5), balance=Decimal("5.00"))
+
+    assert rollup_rows(MonthlyBalanceHistory, account) == [
+        (date(2024, 1, 1), date(2024, 1, 20), Decimal("20.00")),
+    ]
+
+
+@pytest.mark.django_db
+def test_balance_history_deletion_refreshes_rollups(account):
+    first = AccountBalanceHistory.objects.create(
+        account=account, date=date(2024, 1, 5), balance=Decimal("5.00"))
+    last = AccountBalanceHistory.objects.create(
+        account=account, date=date(2024, 1, 20), balance=Decimal("20.00"))
+
+    last.delete()
+    assert rollup_rows(MonthlyBalanceHistory, account) == [
+        (date(2024, 1, 1), date(2024, 1, 5), Decimal("5.00")),
+    ]
+    first.delete()
+    assert rollup_rows(MonthlyBalanceHistory, account) == []
+
+
+@pytest.mark.django_db
+def test_transaction_updates_balance_rollups(user, account):
+    category = ExpenseCategory.objects.create(name="Groceries", owner=user)
+    expense = Expense.objects.create(
+        category=category,
+        amount=Decimal("100.00"),
+        account=account,
+        currency=account.currency,
+        date=timezone.now(),
+        description="Grocery shopping",
+        owner=user,
+    )
+
+    rollup = MonthlyBalanceHistory.objects.get(account=account)
+    assert rollup.date == expense.date.date().replace(day=1)
+    assert rollup.balance == Decimal("900.00")
+
+
+@pytest.mark.django_db
+def test_rebuild_balance_rollups(account):
+    AccountBalanceHistory.objects.bulk_create([
+        AccountBalanceHistory(account=account, date=date(2024, month, 10),
+                              balance=Decimal(month))
+        for month in range(1, 13)
+    ])
+    assert MonthlyBalanceHistory.objects.count() == 0
+
+    assert MonthlyBalanceHistory.rebuild() == 12
+    assert rollup_rows(MonthlyBalanceHistory, account)[-1] == (
+        date(2024, 12, 1), date(2024, 12, 10), Decimal("12.00"))
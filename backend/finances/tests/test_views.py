@@ -1,6 +1,9 @@
+from datetime import date, timedelta
 from decimal import Decimal
 
+import orjson
 import pytest
+from api.series import decode_report
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from finances.models import Account, AccountBalanceHistory, AccountType, Bank, Currency
@@ -204,3 +207,194 @@ def test_account_balance_history_view(client, user, account):
     assert len(response.data["results"]) == 2
     assert response.data["results"][0]["balance"] == "1000.00"
     assert response.data["results"][1]["balance"] == "1200.00"
+
+
+@pytest.mark.django_db
+def test_account_balance_history_view_date_range(client, user, account):
+    client.force_authenticate(user=user)
+    for day, balance in ((1, "100.00"), (5, "150.00"), (9, "120.00")):
+        AccountBalanceHistory.objects.create(
+            account=account, balance=Decimal(balance), date=date(2024, 1, day))
+
+    response = client.get(
+        f"/api/v1/accounts/{account.id}/balance-history/",
+        {"start_date": "2024-01-02", "end_date": "2024-01-08"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [entry["balance"] for entry in response.data["results"]] == ["150.00"]
+
+
+@pytest.fixture
+def second_account(user, account):
+    return Account.objects.create(
+        name="Second Account",
+        account_type=account.account_type,
+        bank=account.bank,
+        balance=Decimal("50.00"),
+        currency=account.currency,
+        owner=user
+    )
+
+
+@pytest.mark.django_db
+def test_accounts_balance_history_view(client, user, account, second_account):
+    client.force_authenticate(user=user)
+    AccountBalanceHistory.objects.create(
+        account=account, balance=Decimal("100.00"), date=date(2023, 12, 30))
+    AccountBalanceHistory.objects.create(
+        account=account, balance=Decimal("80.00"), date=date(2024, 1, 3))
+    AccountBalanceHistory.objects.create(
+        account=second_account, balance=Decimal("50.00"), date=date(2024, 1, 2))
+
+    response = client.get("/api/v1/accounts/balance-history/", {
+        "accounts": f"{account.id},{second_account.id}",
+        "start": "2024-01-01",
+        "end": "2024-01-04",
+        "total": "true",
+    })
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["dates"] == [date(2024, 1, day) for day in range(1, 5)]
+    series = {entry["account"]: entry["values"] for entry in response.data["series"]}
+    assert series[account.id] == [100, 100, 80, 80]
+    assert series[second_account.id] == [None, 50, 50, 50]
+    assert response.data["total"] == [100, 150, 130, 130]
+
+
+@pytest.mark.django_db
+def test_accounts_balance_history_view_skips_foreign_accounts(
+        client, user, another_user, account):
+    client.force_authenticate(user=another_user)
+    AccountBalanceHistory.objects.create(
+        account=account, balance=Decimal("100.00"), date=date(2024, 1, 1))
+
+    response = client.get("/api/v1/accounts/balance-history/", {
+        "accounts": str(account.id),
+        "start": "2024-01-01",
+        "end": "2024-01-02",
+    })
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["series"] == []
+    assert "total" not in response.data
+
+
+@pytest.mark.django_db
+def test_accounts_balance_history_view_query_count(
+        client, user, account, second_account, django_assert_num_queries):
+    client.force_authenticate(user=user)
+    for day in range(1, 20, 3):
+        AccountBalanceHistory.objects.create(
+            account=account, balance=Decimal(day), date=date(2024, 1, day))
+        AccountBalanceHistory.objects.create(
+            account=second_account, balance=Decimal(day), date=date(2024, 1, day))
+
+    # One query for the accounts and one for their balance history
+    with django_assert_num_queries(2):
+        response = client.get("/api/v1/accounts/balance-history/", {
+            "start": "2024-01-05",
+            "end": "2024-01-31",
+            "total": "true",
+        })
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["total"]) == 27
+
+
+@pytest.mark.django_db
+def test_accounts_balance_history_view_points(client, user, account, second_account):
+    client.force_authenticate(user=user)
+    start = date(2020, 1, 1)
+    AccountBalanceHistory.objects.bulk_create([
+        AccountBalanceHistory(
+            account=account, balance=Decimal(day % 30), date=start + timedelta(days=day))
+        for day in range(0, 1000, 3)
+    ])
+
+    response = client.get("/api/v1/accounts/balance-history/", {
+        "start": "2020-01-01",
+        "end": "2022-12-31",
+        "total": "true",
+        "points": 100,
+    })
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["dates"]) == 100
+    assert response.data["dates"][0] == start
+    assert response.data["dates"][-1] == date(2022, 12, 31)
+    for entry in response.data["series"]:
+        assert len(entry["values"]) == 100
+    assert len(response.data["total"]) == 100
+
+
+@pytest.mark.django_db
+def test_accounts_balance_history_view_rejects_too_few_points(client, user):
+    client.force_authenticate(user=user)
+    response = client.get("/api/v1/accounts/balance-history/", {"points": 2})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_accounts_balance_history_view_monthly_resolution(
+        client, user, account, django_assert_num_queries):
+    client.force_authenticate(user=user)
+    start = date(2021, 12, 1)
+    for day in range(0, 800, 2):
+        AccountBalanceHistory.objects.create(
+            account=account, balance=Decimal(day), date=start + timedelta(days=day))
+
+    with django_assert_num_queries(2):
+        response = client.get("/api/v1/accounts/balance-history/", {
+            "start": "2022-01-15",
+            "end": "2022-12-31",
+            "resolution": "month",
+        })
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["resolution"] == "month"
+    assert response.data["dates"] == [date(2022, month, 1) for month in range(1, 13)]
+    # Closing balance of each month: the last snapshot on or before its end
+    values = response.data["series"][0]["values"]
+    assert values[0] == (date(2022, 1, 31) - start).days - 1
+    assert values[-1] == (date(2022, 12, 31) - start).days - 1
+
+
+@pytest.mark.django_db
+def test_accounts_balance_history_view_auto_resolution(client, user, account):
+    client.force_authenticate(user=user)
+    params = {"start": "2020-01-01", "end": "2023-12-31", "resolution": "auto"}
+
+    response = client.get(
+        "/api/v1/accounts/balance-history/", {**params, "points": 40})
+    assert response.data["resolution"] == "month"
+    assert len(response.data["dates"]) == 40
+
+    response = client.get(
+        "/api/v1/accounts/balance-history/", {**params, "points": 100})
+    assert response.data["resolution"] == "week"
+
+    response = client.get(
+        "/api/v1/accounts/balance-history/", {**params, "points": 1000})
+    assert response.data["resolution"] == "day"
+    assert len(response.data["dates"]) == 1000
+
+
+@pytest.mark.django_db
+def test_accounts_balance_history_view_series_format(client, user, account):
+    client.force_authenticate(user=user)
+    AccountBalanceHistory.objects.create(
+        account=account, balance=Decimal("100.00"), date=date(2024, 1, 2))
+    params = {"start": "2024-01-01", "end": "2024-01-04", "total": "true"}
+    plain = client.get("/api/v1/accounts/balance-history/", params).data
+
+    response = client.get(
+        "/api/v1/accounts/balance-history/", params,
+        HTTP_ACCEPT="application/vnd.familybudget.series+json",
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"] == "application/vnd.familybudget.series+json"
+    report = orjson.loads(response.content)
+    assert report["dates"] == {"start": "2024-01-01", "count": 4, "step": 1}
+    decoded = decode_report(report)
+    assert decoded["dates"] == plain["dates"]
+    assert decoded["series"][0]["values"] == plain["series"][0]["values"]
+    assert decoded["total"] == plain["total"]
+
+    response = client.get(
+        "/api/v1/accounts/balance-history/", {**params, "format": "series"})
+    assert orjson.loads(response.content) == report
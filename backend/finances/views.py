@@ -1,21 +1,36 @@
 # finances/views.py
 
+from api.reference import CachedListMixin
+from api.renderers import SeriesRenderer
 from rest_framework import viewsets
 from rest_framework.generics import ListAPIView
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated
-
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from .downsampling import lttb_indices
+from .history import (
+    balance_series,
+    choose_resolution,
+    default_date_range,
+    period_range,
+    total_series,
+)
 from .models import Account, AccountBalanceHistory, AccountType, Bank, Currency
 from .serializers import (
     AccountSerializer,
     AccountTypeSerializer,
+    BalanceHistoryQuerySerializer,
     BankSerializer,
     CurrencySerializer,
     AccountBalanceHistorySerializer,
+    DateRangeQuerySerializer,
 )
 
 
-class CurrencyViewSet(viewsets.ModelViewSet):
+class CurrencyViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = Currency.objects.all()
     serializer_class = CurrencySerializer
     permission_classes = [IsAuthenticated]
@@ -39,7 +54,7 @@ class CurrencyViewSet(viewsets.ModelViewSet):
         instance.delete()
 
 
-class AccountTypeViewSet(viewsets.ModelViewSet):
+class AccountTypeViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = AccountType.objects.all()
     serializer_class = AccountTypeSerializer
     permission_classes = [IsAuthenticated]
@@ -64,7 +79,7 @@ class AccountTypeViewSet(viewsets.ModelViewSet):
         instance.delete()
 
 
-class BankViewSet(viewsets.ModelViewSet):
+class BankViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = Bank.objects.all()
     serializer_class = BankSerializer
     permission_classes = [IsAuthenticated]
@@ -87,7 +102,7 @@ class BankViewSet(viewsets.ModelViewSet):
         instance.delete()
 
 
-class AccountViewSet(viewsets.ModelViewSet):
+class AccountViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = Account.objects.all()
     serializer_class = AccountSerializer
     permission_classes = [IsAuthenticated]
@@ -129,7 +144,80 @@ class AccountBalanceHistoryView(ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
+        params = DateRangeQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
         account_id = self.kwargs.get("account_id")
-        return AccountBalanceHistory.objects.filter(
+        queryset = AccountBalanceHistory.objects.filter(
             account__id=account_id, account__owner=self.request.user
-        )
+        ).order_by("-date", "pk")
+        if params.validated_data.get("start_date"):
+            queryset = queryset.filter(date__gte=params.validated_data["start_date"])
+        if params.validated_data.get("end_date"):
+            queryset = queryset.filter(date__lte=params.validated_data["end_date"])
+        return queryset
+
+
+class AccountsBalanceHistoryView(APIView):
+    """
+    Daily balances of several accounts between two dates.
+
+    Every series is dense and aligned with ``dates``: days without a
+    snapshot carry the last known balance forward and days before an
+    account's first snapshot are null. ``total=true`` adds the sum of all
+    series and ``points=N`` downsamples the series to at most N days.
+
+    ``resolution=week`` or ``month`` reads the rollup tables instead, with
+    one closing balance per period; ``auto`` picks the coarsest resolution
+    that still has ``points`` periods.
+
+    ``?format=series`` returns the compact encoding of api.series.
+    """
+
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, SeriesRenderer]
+
+    def get(self, request):
+        params = BalanceHistoryQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        start, end = default_date_range(
+            params.validated_data.get("start"), params.validated_data.get("end"))
+        account_ids = params.validated_data.get("accounts")
+        points = params.validated_data.get("points")
+        resolution = params.validated_data["resolution"]
+        if resolution == "auto":
+            resolution = choose_resolution(start, end, points) if points else "day"
+
+        accounts = Account.objects.filter(owner=request.user).order_by("pk")
+        if account_ids:
+            accounts = accounts.filter(pk__in=account_ids)
+        accounts = list(accounts)
+
+        dates = period_range(start, end, resolution)
+        balances = balance_series(accounts, dates, resolution)
+        total = None
+        if params.validated_data["total"]:
+            total = total_series(balances, len(dates))
+
+        if points and points < len(dates):
+            indices = lttb_indices(balances.values(), len(dates), points)
+            dates = [dates[index] for index in indices]
+            balances = {
+                account: [values[index] for index in indices]
+                for account, values in balances.items()
+            }
+            if total is not None:
+                total = [total[index] for index in indices]
+
+        data = {
+            "start": start,
+            "end": end,
+            "resolution": resolution,
+            "dates": dates,
+            "series": [
+                {"account": account, "values": values}
+                for account, values in balances.items()
+            ],
+        }
+        if total is not None:
+            data["total"] = total
+        return Response(data)
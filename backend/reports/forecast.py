@@ -0,0 +1,206 @@
+# reports/forecast.py
+
+"""
+Monthly balance forecast of an owner's accounts.
+
+Every account's net flow in a future month is the sum of
+
+* its recurring flows: income or expense of a category booked in at least
+  RECURRING_MIN_MONTHS of the last RECURRING_WINDOW months, each time within
+  RECURRING_TOLERANCE of its median, expected again at the median;
+* its seasonal flow: the average of everything else booked in the same
+  calendar month over the history, or over all months of the history when
+  that calendar month has not been seen since the account became active.
+
+The history is the HISTORY_MONTHS complete months before the current one,
+loaded as one grouped query and processed as group × month matrices. The
+rest of the current month is not projected: the forecast starts from the
+current balances and covers the following months.
+
+Forecasts are cached per owner and month with the state of the owner's
+accounts they were computed from. Every transaction write saves its
+account's balance, so a forecast whose state no longer matches is stale,
+even in processes that do not share the cache.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+from finances.history import months_before, period_range
+from finances.models import Account
+
+from .pivot import to_list
+from .queries import grouped_totals
+
+HISTORY_MONTHS = 24
+MAX_FORECAST_MONTHS = 24
+RECURRING_WINDOW = 6
+RECURRING_MIN_MONTHS = 5
+RECURRING_TOLERANCE = 0.2
+
+SIGNS = {"expense": -1, "income": 1}
+
+
+def flow_matrix(rows, periods):
+    """
+    Load grouped_totals() rows grouped by account and category into a
+    matrix of one row per (transaction type, account, category) and one
+    column per period. Returns the group keys as an (n, 3) array of sign,
+    account and category, and the matrix.
+    """
+    rows = list(rows)
+    if not rows:
+        return np.zeros((0, 3), dtype=np.int64), np.zeros((0, len(periods)))
+    groups = np.array([
+        (SIGNS[row["transaction_type"]], row["account"], row["category"])
+        for row in rows
+    ], dtype=np.int64)
+    ordinals = np.array([row["period"].toordinal() for row in rows])
+    totals = np.array([row["total"] for row in rows], dtype=float)
+
+    keys, row_index = np.unique(groups, axis=0, return_inverse=True)
+    column_index = np.searchsorted(
+        np.array([period.toordinal() for period in periods]), ordinals)
+    matrix = np.zeros((len(keys), len(periods)))
+    np.add.at(matrix, (row_index.ravel(), column_index), totals)
+    return keys, matrix
+
+
+def detect_recurring(matrix):
+    """
+    Mask of the matrix rows that recur monthly and their expected amounts,
+    the medians over the recent months they were booked in
+    """
+    recent = matrix[:, -RECURRING_WINDOW:]
+    booked = recent > 0
+    candidates = booked.sum(axis=1) >= RECURRING_MIN_MONTHS
+    medians = np.zeros(len(matrix))
+    if candidates.any():
+        medians[candidates] = np.nanmedian(
+            np.where(booked[candidates], recent[candidates], np.nan), axis=1)
+    deviation = np.abs(recent - medians[:, None])
+    stable = np.all(
+        ~booked | (deviation <= RECURRING_TOLERANCE * medians[:, None]), axis=1)
+    recurring = candidates & stable
+    return recurring, np.where(recurring, medians, 0)
+
+
+def seasonal_averages(residual, history_months):
+    """
+    Average of each row of an account × month matrix per calendar month,
+    counting only months since the account's first flow, with the average
+    over all those months where a calendar month has no sample
+    """
+    columns = np.arange(residual.shape[1])
+    booked = residual != 0
+    first = np.where(booked.any(axis=1), booked.argmax(axis=1), residual.shape[1])
+    active = (columns >= first[:, None]).astype(float)
+    calendar = np.zeros((len(history_months), 12))
+    calendar[columns, np.array(history_months, dtype=int) - 1] = 1
+
+    sums = (residual * active) @ calendar
+    counts = active @ calendar
+    months = active.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        overall = np.where(months > 0, residual.sum(axis=1, keepdims=True) / months, 0)
+        return np.where(counts > 0, sums / counts, overall)
+
+
+def forecast(accounts, rows, history, periods):
+    """
+    Forecast of the balances of ``accounts`` at the end of every month of
+    ``periods`` from grouped_totals() rows of the ``history`` months
+    """
+    account_ids = np.array([account.pk for account in accounts], dtype=np.int64)
+    balances = np.array([account.balance for account in accounts], dtype=float)
+    keys, matrix = flow_matrix(rows, history)
+    recurring, amounts = detect_recurring(matrix)
+    signs, account_index = keys[:, 0], np.searchsorted(account_ids, keys[:, 1])
+
+    recurring_net = np.bincount(
+        account_index, weights=signs * amounts, minlength=len(account_ids))
+    residual = np.zeros((len(account_ids), len(history)))
+    np.add.at(residual, account_index[~recurring],
+              signs[~recurring, None] * matrix[~recurring])
+    seasonal = seasonal_averages(residual, [month.month for month in history])
+    seasonal_net = seasonal[:, np.array([period.month for period in periods]) - 1]
+
+    values = balances[:, None] + np.cumsum(recurring_net[:, None] + seasonal_net, axis=1)
+    return {
+        "periods": periods,
+        "accounts": [
+            {
+                "account": account,
+                "balance": balance,
+                "recurring_net": recurring_flow,
+                "seasonal_net": seasonal_flows,
+                "values": projected,
+            }
+            for account, balance, recurring_flow, seasonal_flows, projected in zip(
+                account_ids.tolist(),
+                to_list(balances),
+                to_list(recurring_net),
+                to_list(seasonal_net),
+                to_list(values),
+            )
+        ],
+        "recurring": [
+            {
+                "transaction_type": "income" if sign > 0 else "expense",
+                "account": account,
+                "category": category,
+                "amount": amount,
+            }
+            for (sign, account, category), amount in zip(
+                keys[recurring].tolist(), to_list(amounts[recurring]))
+        ],
+        "total": to_list(values.sum(axis=0)),
+    }
+
+
+def forecast_cache_key(owner_id, month):
+    return f"reports:forecast:{owner_id}:{month.isoformat()}"
+
+
+def accounts_state(owner):
+    """Number of the owner's accounts and when one of them last changed"""
+    state = Account.objects.filter(owner=owner).aggregate(
+        accounts=Count("pk"), changed=Max("updated_at"))
+    return state["accounts"], state["changed"]
+
+
+def owner_forecast(owner, today=None):
+    """
+    Forecast of the owner's accounts MAX_FORECAST_MONTHS ahead, cached
+    until their transactions or accounts change or the month ends
+    """
+    month = months_before(today or timezone.localdate(), 0)
+    key = forecast_cache_key(owner.pk, month)
+    state = accounts_state(owner)
+    cached = cache.get(key)
+    if cached is not None and cached[0] == state:
+        return cached[1]
+
+    start = months_before(month, HISTORY_MONTHS)
+    end = month - timedelta(days=1)
+    accounts = list(Account.objects.filter(owner=owner).order_by("pk"))
+    rows = grouped_totals(
+        owner, "month", ("account", "category"), start_date=start, end_date=end)
+    result = forecast(
+        accounts,
+        rows,
+        period_range(start, end, "month"),
+        [months_before(month, -offset)
+         for offset in range(1, MAX_FORECAST_MONTHS + 1)],
+    )
+    cache.set(key, (state, result), settings.REPORT_CACHE_TIMEOUT)
+    return result
+
+
+def invalidate_forecast(owner_id):
+    """Drop the owner's cached forecast from this process's cache right away"""
+    cache.delete(forecast_cache_key(owner_id, months_before(timezone.localdate(), 0)))
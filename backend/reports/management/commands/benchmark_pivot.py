@@ -0,0 +1,122 @@
+# reports/management/commands/benchmark_pivot.py
+import random
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from finances.history import period_range
+from reports.pivot import pivot
+
+
+def pivot_python(rows, group_by, periods):
+    """Reference implementation of reports.pivot.pivot() with dicts and loops"""
+    column = {period: index for index, period in enumerate(periods)}
+    matrix = {}
+    for row in rows:
+        values = matrix.setdefault(row[group_by], [0.0] * len(periods))
+        values[column[row["period"]]] += float(row["total"])
+
+    column_totals = [0.0] * len(periods)
+    for values in matrix.values():
+        for index, value in enumerate(values):
+            column_totals[index] += value
+    grand_total = sum(column_totals)
+    count = max(len(periods), 1)
+
+    def running(values):
+        totals, total = [], 0.0
+        for value in values:
+            total += value
+            totals.append(round(total, 2))
+        return totals
+
+    def deltas(values):
+        return [None] + [
+            round(later - earlier, 2) for earlier, later in zip(values, values[1:])]
+
+    pivot_rows = []
+    for key in sorted(matrix):
+        values = matrix[key]
+        total = sum(values)
+        pivot_rows.append({
+            group_by: key,
+            "values": [round(value, 2) for value in values],
+            "running_totals": running(values),
+            "deltas": deltas(values),
+            "shares": [
+                round(value / column_total * 100, 2) if column_total else 0.0
+                for value, column_total in zip(values, column_totals)
+            ],
+            "total": round(total, 2),
+            "average": round(total / count, 2),
+            "share": round(total / grand_total * 100, 2) if grand_total else 0.0,
+        })
+    return {
+        "periods": periods,
+        "rows": pivot_rows,
+        "totals": {
+            "values": [round(value, 2) for value in column_totals],
+            "running_totals": running(column_totals),
+            "deltas": deltas(column_totals),
+            "total": round(grand_total, 2),
+            "average": round(grand_total / count, 2),
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the NumPy pivot report with a pure-Python implementation '
+        'on generated grouped totals'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--years', type=int, default=10,
+            help='Number of years of data'
+        )
+        parser.add_argument(
+            '--categories', type=int, default=30,
+            help='Number of categories'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=10,
+            help='Number of timed runs per implementation'
+        )
+
+    def handle(self, *args, **options):
+        end_date = date.today()
+        start_date = end_date.replace(year=end_date.year - options['years'])
+        self.stdout.write(
+            f'{"granularity":<13}{"rows":>9}{"python ms":>11}{"numpy ms":>10}'
+            f'{"speedup":>9}'
+        )
+        for granularity in ('month', 'week', 'day'):
+            periods = period_range(start_date, end_date, granularity)
+            rows = [
+                {
+                    'period': period,
+                    'category': category,
+                    'total': Decimal(random.uniform(1, 500)).quantize(Decimal('0.01')),
+                }
+                for period in periods
+                for category in range(1, options['categories'] + 1)
+                if random.random() < 0.7
+            ]
+            timings, results = [], []
+            for implementation in (pivot_python, pivot):
+                started = time.perf_counter()
+                for _ in range(options['repeat']):
+                    result = implementation(rows, 'category', periods)
+                timings.append((time.perf_counter() - started) / options['repeat'])
+                results.append(result)
+            self.report(granularity, len(rows), *timings)
+            if results[0]['totals'] != results[1]['totals']:
+                self.stderr.write(f'Totals of the {granularity} pivots differ')
+
+    def report(self, granularity, rows, python_time, numpy_time):
+        self.stdout.write(
+            f'{granularity:<13}{rows:>9}{python_time * 1000:>11.2f}'
+            f'{numpy_time * 1000:>10.2f}{python_time / numpy_time:>8.1f}x'
+        )
@@ -0,0 +1,88 @@
+# reports/net_worth.py
+
+from collections import Counter
+from datetime import timedelta
+
+import numpy as np
+
+
+def to_nullable_list(values):
+    """Values rounded to cents, None where they are NaN"""
+    rounded = (np.round(values, 2) + 0.0).astype(object)
+    rounded[np.isnan(values)] = None
+    return rounded.tolist()
+
+
+def period_ends(dates, end_date):
+    """Last day of each period starting on dates, the last cut at end_date"""
+    return [later - timedelta(days=1) for later in dates[1:]] + [end_date]
+
+
+def main_currency(accounts):
+    """Code of the currency most of the accounts are kept in"""
+    codes = Counter(account.currency.code.upper() for account in accounts)
+    return codes.most_common(1)[0][0] if codes else None
+
+
+def conversion_factors(codes, days, known, currency, rates):
+    """
+    Account × day matrix of the rates converting each account's currency to
+    ``currency`` on each day, looked up once per currency and only for
+    days some account in that currency has a balance
+    """
+    factors = np.ones(known.shape)
+    codes = np.array(codes)
+    for code in set(codes.tolist()) - {currency}:
+        rows = codes == code
+        needed = known[rows].any(axis=0)
+        if needed.any():
+            block = factors[rows]
+            block[:, needed] = rates.rates(code, currency, days[needed])
+            factors[rows] = block
+    return factors
+
+
+def net_worth(accounts, dates, matrix, currency, rates, end_date, today):
+    """
+    Balance series of the accounts converted to ``currency`` at the rates in
+    effect at the end of each period, their total, and the current balances
+    converted at today's rates.
+
+    ``matrix`` holds the balances of the accounts aligned with ``dates`` as
+    returned by balance_matrix(); MissingExchangeRate is raised when a
+    needed rate is not known.
+    """
+    codes = [account.currency.code.upper() for account in accounts]
+    days = np.array([day.toordinal() for day in period_ends(dates, end_date)])
+    known = ~np.isnan(matrix)
+    converted = matrix * conversion_factors(codes, days, known, currency, rates)
+
+    current = np.array([account.balance for account in accounts], dtype=float)
+    current_converted = current * conversion_factors(
+        codes, np.array([today.toordinal()]), np.ones((len(accounts), 1), dtype=bool),
+        currency, rates,
+    )[:, 0]
+
+    return {
+        "series": [
+            {"account": account.pk, "currency": code, "values": values}
+            for account, code, values in zip(
+                accounts, codes, to_nullable_list(converted))
+        ],
+        "total": to_nullable_list(
+            np.where(known.any(axis=0), np.nansum(converted, axis=0), np.nan)),
+        "current": {
+            "total": round(float(current_converted.sum()), 2),
+            "accounts": [
+                {
+                    "account": account.pk,
+                    "currency": code,
+                    "balance": balance,
+                    "converted": value,
+                }
+                for account, code, balance, value in zip(
+                    accounts, codes, current.round(2).tolist(),
+                    to_nullable_list(current_converted))
+            ],
+        },
+    }
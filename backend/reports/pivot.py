@@ -0,0 +1,96 @@
+# reports/pivot.py
+
+import numpy as np
+
+
+def pivot_matrix(rows, group_by, periods):
+    """
+    Load grouped totals into a group × period matrix.
+
+    ``rows`` are grouped_totals() rows and ``periods`` the sorted period
+    starts the columns stand for. Returns the sorted group keys and the
+    matrix, zero where a group has no transactions in a period.
+    """
+    rows = list(rows)
+    if not rows:
+        return [], np.zeros((0, len(periods)))
+    groups = np.array([row[group_by] for row in rows])
+    ordinals = np.array([row["period"].toordinal() for row in rows])
+    totals = np.array([row["total"] for row in rows], dtype=float)
+
+    keys, row_index = np.unique(groups, return_inverse=True)
+    column_index = np.searchsorted(
+        np.array([period.toordinal() for period in periods]), ordinals)
+    matrix = np.zeros((len(keys), len(periods)))
+    np.add.at(matrix, (row_index, column_index), totals)
+    return keys.tolist(), matrix
+
+
+def series_statistics(matrix, column_totals):
+    """
+    Running totals, period-over-period deltas and shares of the column
+    totals, in percent, of each row of a matrix
+    """
+    running_totals = np.cumsum(matrix, axis=1)
+    deltas = np.diff(matrix, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = np.where(column_totals != 0, matrix / column_totals * 100, 0)
+    return running_totals, deltas, shares
+
+
+def to_list(values):
+    # Adding zero turns the -0.0 rounding can produce into 0.0
+    return (np.round(values, 2) + 0.0).tolist()
+
+
+def pivot(rows, group_by, periods):
+    """
+    Pivot report of grouped totals: one row per group with its values per
+    period, running totals, deltas to the previous period (None for the
+    first one) and shares of each period's total, plus the same for the
+    period totals. Totals, averages per period and shares of the grand
+    total summarise each row.
+    """
+    keys, matrix = pivot_matrix(rows, group_by, periods)
+    column_totals = matrix.sum(axis=0)
+    row_totals = matrix.sum(axis=1)
+    grand_total = row_totals.sum()
+    count = max(len(periods), 1)
+
+    running_totals, deltas, shares = series_statistics(matrix, column_totals)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        row_shares = np.where(grand_total != 0, row_totals / grand_total * 100, 0)
+
+    pivot_rows = [
+        {
+            group_by: key,
+            "values": values,
+            "running_totals": running,
+            "deltas": [None, *delta],
+            "shares": share,
+            "total": total,
+            "average": average,
+            "share": row_share,
+        }
+        for key, values, running, delta, share, total, average, row_share in zip(
+            keys,
+            to_list(matrix),
+            to_list(running_totals),
+            to_list(deltas),
+            to_list(shares),
+            to_list(row_totals),
+            to_list(row_totals / count),
+            to_list(row_shares),
+        )
+    ]
+    return {
+        "periods": periods,
+        "rows": pivot_rows,
+        "totals": {
+            "values": to_list(column_totals),
+            "running_totals": to_list(np.cumsum(column_totals)),
+            "deltas": [None, *to_list(np.diff(column_totals))],
+            "total": round(float(grand_total), 2),
+            "average": round(float(grand_total) / count, 2),
+        },
+    }
@@ -0,0 +1,97 @@
+# reports/queries.py
+
+from datetime import datetime, time, timedelta
+
+from django.db.models import CharField, Count, DateField, Sum, Value
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+from transactions.conversion import ACCOUNT_AMOUNT
+from transactions.models import Expense, Income
+
+TRUNC_FUNCTIONS = {
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+TRANSACTION_MODELS = {
+    "expense": Expense,
+    "income": Income,
+}
+
+
+def date_range_filters(start_date=None, end_date=None, field="date"):
+    """
+    Filters selecting the transactions made between two dates, inclusive.
+
+    The dates are turned into datetime bounds in the current time zone, so
+    an index on the datetime field can still be used.
+    """
+    filters = {}
+    if start_date:
+        filters[f"{field}__gte"] = timezone.make_aware(
+            datetime.combine(start_date, time.min))
+    if end_date:
+        filters[f"{field}__lt"] = timezone.make_aware(
+            datetime.combine(end_date + timedelta(days=1), time.min))
+    return filters
+
+
+def transaction_querysets(owner, start_date=None, end_date=None, accounts=None,
+                          categories=None, transaction_type=None):
+    """Filtered Expense and Income querysets keyed by transaction type"""
+    querysets = {}
+    for name, model in TRANSACTION_MODELS.items():
+        if transaction_type and transaction_type != name:
+            continue
+        queryset = model.objects.filter(
+            owner=owner, **date_range_filters(start_date, end_date))
+        if accounts:
+            queryset = queryset.filter(account__in=accounts)
+        if categories:
+            queryset = queryset.filter(category__in=categories)
+        querysets[name] = queryset.order_by()
+    return querysets
+
+
+def grouped_totals(owner, granularity="day", group_by=None, **filters):
+    """
+    Sum transactions per period, transaction type and optionally category or
+    account, or a tuple of both, in no particular order. Amounts are summed
+    in the currency of their accounts, as they changed the balances.
+
+    Every transaction type is grouped in the database and the grouped
+    queries are sent as one UNION ALL, so the cost does not depend on how
+    many transactions fall into a bucket.
+    """
+    trunc = TRUNC_FUNCTIONS[granularity]
+    group_fields = [group_by] if isinstance(group_by, str) else list(group_by or ())
+    grouped = [
+        queryset.annotate(
+            period=trunc("date", output_field=DateField()),
+            transaction_type=Value(name, output_field=CharField()),
+        ).values(
+            "period", "transaction_type", *group_fields
+        ).annotate(
+            total=Sum(ACCOUNT_AMOUNT),
+            count=Count("id"),
+        )
+        for name, queryset in transaction_querysets(owner, **filters).items()
+    ]
+    rows = grouped[0]
+    if len(grouped) > 1:
+        rows = rows.union(*grouped[1:], all=True)
+    return rows
+
+
+def cashflow(owner, granularity="day", group_by=None, **filters):
+    """grouped_totals() sorted by period, transaction type and group"""
+    group_fields = [group_by] if group_by else []
+    return sorted(
+        grouped_totals(owner, granularity, group_by, **filters),
+        key=lambda row: (
+            row["period"],
+            row["transaction_type"],
+            *(row[field] for field in group_fields),
+        ),
+    )
@@ -0,0 +1,64 @@
+# reports/serializers.py
+
+from finances.serializers import DateRangeQuerySerializer, IdListField
+from rest_framework import serializers
+
+from .forecast import MAX_FORECAST_MONTHS
+
+
+class CashflowQuerySerializer(DateRangeQuerySerializer):
+    granularity = serializers.ChoiceField(
+        choices=["day", "week", "month"], default="day")
+    group_by = serializers.ChoiceField(
+        choices=["category", "account"], required=False)
+    transaction_type = serializers.ChoiceField(
+        choices=["expense", "income"], required=False)
+    accounts = IdListField(required=False)
+    categories = IdListField(required=False)
+
+
+class ExpenseBalanceQuerySerializer(DateRangeQuerySerializer):
+    accounts = IdListField(required=False)
+    categories = IdListField(required=False)
+
+
+class PivotQuerySerializer(DateRangeQuerySerializer):
+    granularity = serializers.ChoiceField(
+        choices=["day", "week", "month"], default="month")
+    group_by = serializers.ChoiceField(
+        choices=["category", "account"], default="category")
+    transaction_type = serializers.ChoiceField(
+        choices=["expense", "income"], default="expense")
+    accounts = IdListField(required=False)
+    categories = IdListField(required=False)
+
+
+class ForecastQuerySerializer(serializers.Serializer):
+    months = serializers.IntegerField(
+        min_value=1, max_value=MAX_FORECAST_MONTHS, default=6)
+
+
+class NetWorthQuerySerializer(serializers.Serializer):
+    currency = serializers.RegexField(r"^[A-Za-z]{3}$", required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    resolution = serializers.ChoiceField(
+        choices=["day", "week", "month"], default="day")
+
+    def validate(self, attrs):
+        start = attrs.get("start")
+        end = attrs.get("end")
+        if start and end and start > end:
+            raise serializers.ValidationError(
+                "Start date must be earlier than or equal to end date."
+            )
+        return attrs
+
+
+class CashflowBucketSerializer(serializers.Serializer):
+    period = serializers.DateField()
+    transaction_type = serializers.CharField()
+    category = serializers.IntegerField(required=False)
+    account = serializers.IntegerField(required=False)
+    total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    count = serializers.IntegerField()
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from finances.models import Account
+from transactions.models import Expense, Income
+
+from .forecast import invalidate_forecast
+
+
+@receiver(post_save, sender=Expense)
+@receiver(post_save, sender=Income)
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=Account)
+def invalidate_forecast_on_change(sender, instance, **kwargs):
+    invalidate_forecast(instance.owner_id)
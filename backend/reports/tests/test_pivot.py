@@ -0,0 +1,37 @@
+# reports/tests/test_pivot.py
+
+import random
+from datetime import date
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from finances.history import period_range
+from reports.management.commands.benchmark_pivot import pivot_python
+from reports.pivot import pivot
+
+
+class PivotTest(SimpleTestCase):
+    def test_matches_python_implementation(self):
+        """Test that the NumPy pivot equals the dict and loop version"""
+        rng = random.Random(42)
+        periods = period_range(date(2020, 1, 1), date(2024, 12, 31), 'month')
+        rows = [
+            {
+                'period': period,
+                'category': category,
+                'total': Decimal(rng.randint(100, 50000)) / 100,
+            }
+            for period in periods
+            for category in (3, 1, 7, 12)
+            if rng.random() < 0.6
+        ]
+        self.assertEqual(
+            pivot(rows, 'category', periods),
+            pivot_python(rows, 'category', periods),
+        )
+
+    def test_no_rows(self):
+        periods = period_range(date(2024, 1, 1), date(2024, 2, 29), 'month')
+        result = pivot([], 'category', periods)
+        self.assertEqual(result['rows'], [])
+        self.assertEqual(result['totals']['deltas'], [None, 0.0])
@@ -0,0 +1,484 @@
+# reports/tests/test_views.py
+
+import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from finances.history import months_before
+from api.series import decode_report
+from finances.models import (
+    Account,
+    AccountBalanceHistory,
+    AccountType,
+    Bank,
+    Currency,
+    ExchangeRate,
+)
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from transactions.models import Expense, ExpenseCategory, Income, IncomeCategory
+
+User = get_user_model()
+
+
+class ReportTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', password='password123', email='testuser@test.com'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.currency = Currency.objects.create(
+            code='USD', name='US Dollar', symbol='$', owner=self.user)
+        account_type = AccountType.objects.create(name='Checking', owner=self.user)
+        bank = Bank.objects.create(name='Test Bank', country='Testland', owner=self.user)
+        self.account = Account.objects.create(
+            name='Main', account_type=account_type, bank=bank,
+            currency=self.currency, balance=Decimal('1000.00'), owner=self.user)
+        self.savings = Account.objects.create(
+            name='Savings', account_type=account_type, bank=bank,
+            currency=self.currency, balance=Decimal('5000.00'), owner=self.user)
+        self.food = ExpenseCategory.objects.create(name='Food', owner=self.user)
+        self.rent = ExpenseCategory.objects.create(name='Rent', owner=self.user)
+        self.salary = IncomeCategory.objects.create(name='Salary', owner=self.user)
+
+    def add_expense(self, date, amount, category=None, account=None):
+        return Expense.objects.create(
+            date=datetime.datetime.combine(
+                date, datetime.time(12), tzinfo=datetime.timezone.utc),
+            amount=Decimal(amount),
+            currency=self.currency,
+            account=account or self.account,
+            category=category or self.food,
+            owner=self.user,
+        )
+
+    def add_income(self, date, amount, account=None):
+        return Income.objects.create(
+            date=datetime.datetime.combine(
+                date, datetime.time(9), tzinfo=datetime.timezone.utc),
+            amount=Decimal(amount),
+            currency=self.currency,
+            account=account or self.account,
+            category=self.salary,
+            owner=self.user,
+        )
+
+
+class CashflowReportViewTest(ReportTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('report-cashflow')
+        # 2024-01-01 is a Monday
+        self.add_expense(datetime.date(2024, 1, 1), '10.00')
+        self.add_expense(datetime.date(2024, 1, 3), '15.50')
+        self.add_expense(datetime.date(2024, 1, 3), '700.00', self.rent)
+        self.add_expense(datetime.date(2024, 1, 9), '20.00', account=self.savings)
+        self.add_income(datetime.date(2024, 1, 5), '2000.00')
+        self.add_expense(datetime.date(2024, 2, 1), '5.00')
+
+    def test_weekly_by_category(self):
+        response = self.client.get(self.url, {
+            'granularity': 'week',
+            'group_by': 'category',
+            'start_date': '2024-01-01',
+            'end_date': '2024-01-31',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [
+            (row['period'], row['transaction_type'], row['category'],
+             row['total'], row['count'])
+            for row in response.data['results']
+        ]
+        self.assertEqual(rows, [
+            ('2024-01-01', 'expense', self.food.id, '25.50', 2),
+            ('2024-01-01', 'expense', self.rent.id, '700.00', 1),
+            ('2024-01-01', 'income', self.salary.id, '2000.00', 1),
+            ('2024-01-08', 'expense', self.food.id, '20.00', 1),
+        ])
+
+    def test_monthly_by_account_filtered(self):
+        response = self.client.get(self.url, {
+            'granularity': 'month',
+            'group_by': 'account',
+            'transaction_type': 'expense',
+            'accounts': f'{self.account.id}',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [
+            (row['period'], row['account'], row['total'])
+            for row in response.data['results']
+        ]
+        self.assertEqual(rows, [
+            ('2024-01-01', self.account.id, '725.50'),
+            ('2024-02-01', self.account.id, '5.00'),
+        ])
+
+    def test_daily_totals_with_category_filter(self):
+        response = self.client.get(self.url, {
+            'categories': f'{self.food.id},{self.rent.id}',
+            'end_date': '2024-01-03',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [
+            (row['period'], row['transaction_type'], row['total'])
+            for row in response.data['results']
+        ]
+        self.assertEqual(rows, [
+            ('2024-01-01', 'expense', '10.00'),
+            ('2024-01-03', 'expense', '715.50'),
+        ])
+        self.assertNotIn('category', response.data['results'][0])
+
+    def test_other_users_transactions_are_excluded(self):
+        other_user = User.objects.create_user(
+            username='otheruser', password='password123', email='other@test.com')
+        self.client.force_authenticate(user=other_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [])
+
+    def test_invalid_params(self):
+        response = self.client.get(self.url, {'granularity': 'year'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'accounts': '1,a'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {
+            'start_date': '2024-02-01', 'end_date': '2024-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ExpenseBalanceReportViewTest(ReportTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('report-expense-balance')
+        # Balance history is written by the transaction signals
+        self.add_expense(datetime.date(2023, 12, 30), '10.00')
+        self.add_expense(datetime.date(2024, 1, 3), '15.50')
+        self.add_expense(datetime.date(2024, 1, 3), '100.00', self.rent)
+        self.add_expense(datetime.date(2024, 1, 4), '20.00', account=self.savings)
+
+    def test_aligned_series(self):
+        response = self.client.get(self.url, {
+            'start_date': '2024-01-02',
+            'end_date': '2024-01-05',
+            'accounts': f'{self.account.id}',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(
+            data['dates'],
+            ['2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05'])
+        self.assertEqual(data['expenses'], [
+            {'category': self.food.id, 'values': [0, 15.5, 0, 0]},
+            {'category': self.rent.id, 'values': [0, 100.0, 0, 0]},
+        ])
+        self.assertEqual(data['total_expenses'], [0, 115.5, 0, 0])
+        self.assertEqual(data['balances'], [
+            {'account': self.account.id,
+             'values': [990.0, 874.5, 874.5, 874.5]},
+        ])
+        self.assertEqual(data['total_balance'], [990.0, 874.5, 874.5, 874.5])
+
+    def test_all_accounts_and_category_filter(self):
+        response = self.client.get(self.url, {
+            'start_date': '2024-01-02',
+            'end_date': '2024-01-04',
+            'categories': f'{self.food.id}',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['expenses'], [
+            {'category': self.food.id, 'values': [0, 15.5, 20.0]},
+        ])
+        self.assertEqual(data['balances'], [
+            {'account': self.account.id, 'values': [990.0, 874.5, 874.5]},
+            {'account': self.savings.id, 'values': [None, None, 4980.0]},
+        ])
+        self.assertEqual(data['total_balance'], [990.0, 874.5, 5854.5])
+
+    def test_no_owned_accounts_requested(self):
+        response = self.client.get(self.url, {
+            'start_date': '2024-01-02',
+            'end_date': '2024-01-04',
+            'accounts': f'{self.account.id + self.savings.id + 100}',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['expenses'], [])
+        self.assertEqual(data['total_expenses'], [0, 0, 0])
+        self.assertEqual(data['balances'], [])
+
+    def test_query_count(self):
+        # accounts + grouped expenses + balance history
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {
+                'start_date': '2023-01-01', 'end_date': '2024-12-31'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()['dates']), 731)
+
+
+class PivotReportViewTest(ReportTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('report-pivot')
+        self.add_expense(datetime.date(2024, 1, 3), '30.00')
+        self.add_expense(datetime.date(2024, 1, 20), '10.00')
+        self.add_expense(datetime.date(2024, 1, 5), '60.00', self.rent)
+        self.add_expense(datetime.date(2024, 3, 8), '25.00')
+        self.add_expense(datetime.date(2024, 3, 9), '75.00', self.rent)
+        self.add_income(datetime.date(2024, 1, 5), '2000.00')
+
+    def test_category_by_month(self):
+        response = self.client.get(self.url, {
+            'start_date': '2024-01-01',
+            'end_date': '2024-03-31',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['periods'], ['2024-01-01', '2024-02-01', '2024-03-01'])
+        self.assertEqual(data['rows'], [
+            {
+                'category': self.food.id,
+                'values': [40.0, 0.0, 25.0],
+                'running_totals': [40.0, 40.0, 65.0],
+                'deltas': [None, -40.0, 25.0],
+                'shares': [40.0, 0.0, 25.0],
+                'total': 65.0,
+                'average': 21.67,
+                'share': 32.5,
+            },
+            {
+                'category': self.rent.id,
+                'values': [60.0, 0.0, 75.0],
+                'running_totals': [60.0, 60.0, 135.0],
+                'deltas': [None, -60.0, 75.0],
+                'shares': [60.0, 0.0, 75.0],
+                'total': 135.0,
+                'average': 45.0,
+                'share': 67.5,
+            },
+        ])
+        self.assertEqual(data['totals'], {
+            'values': [100.0, 0.0, 100.0],
+            'running_totals': [100.0, 100.0, 200.0],
+            'deltas': [None, -100.0, 100.0],
+            'total': 200.0,
+            'average': 66.67,
+        })
+
+    def test_income_by_account_per_week(self):
+        response = self.client.get(self.url, {
+            'start_date': '2024-01-01',
+            'end_date': '2024-01-14',
+            'granularity': 'week',
+            'group_by': 'account',
+            'transaction_type': 'income',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['periods'], ['2024-01-01', '2024-01-08'])
+        self.assertEqual(len(data['rows']), 1)
+        self.assertEqual(data['rows'][0]['account'], self.account.id)
+        self.assertEqual(data['rows'][0]['values'], [2000.0, 0.0])
+
+    def test_empty_range(self):
+        response = self.client.get(self.url, {
+            'start_date': '2023-01-01', 'end_date': '2023-02-28'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['rows'], [])
+        self.assertEqual(data['totals']['values'], [0.0, 0.0])
+
+    def test_query_count(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {
+                'start_date': '2015-01-01', 'end_date': '2024-12-31'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()['periods']), 120)
+
+
+class ForecastReportViewTest(ReportTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.url = reverse('report-forecast')
+        self.month = months_before(timezone.localdate(), 0)
+
+    def month_day(self, offset, day=5):
+        return months_before(self.month, -offset).replace(day=day)
+
+    def test_recurring_and_seasonal_flows(self):
+        for offset in range(-6, 0):
+            self.add_income(self.month_day(offset, 1), '3000.00')
+            self.add_expense(self.month_day(offset), '1000.00', self.rent)
+        for offset in range(-3, 0):
+            self.add_expense(self.month_day(offset, 10), '100.00')
+        # Booked once in the calendar month of next month, a year ago
+        self.add_expense(self.month_day(-11), '600.00', account=self.savings)
+        self.account.refresh_from_db()
+        self.savings.refresh_from_db()
+
+        response = self.client.get(self.url, {'months': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['months'], 3)
+        self.assertEqual(data['periods'], [
+            self.month_day(offset, 1).isoformat() for offset in range(1, 4)])
+
+        main, savings = data['accounts']
+        balance = float(self.account.balance)
+        self.assertEqual(main['account'], self.account.id)
+        self.assertEqual(main['balance'], balance)
+        self.assertEqual(main['recurring_net'], 2000.0)
+        # Food was only booked in 3 of the last 6 months: its average over
+        # the months since the account's first other flow is used instead
+        self.assertEqual(main['seasonal_net'], [-100.0, -100.0, -100.0])
+        self.assertEqual(main['values'], [
+            balance + 1900, balance + 3800, balance + 5700])
+
+        self.assertEqual(savings['recurring_net'], 0.0)
+        self.assertEqual(savings['seasonal_net'], [-600.0, 0.0, 0.0])
+        self.assertEqual(savings['values'], [3800.0, 3800.0, 3800.0])
+        self.assertEqual(data['total'], [
+            value + other for value, other in zip(main['values'], savings['values'])])
+
+        self.assertEqual(data['recurring'], [
+            {'transaction_type': 'expense', 'account': self.account.id,
+             'category': self.rent.id, 'amount': 1000.0},
+            {'transaction_type': 'income', 'account': self.account.id,
+             'category': self.salary.id, 'amount': 3000.0},
+        ])
+
+    def test_irregular_amounts_are_not_recurring(self):
+        for offset, amount in zip(range(-6, 0), [800, 1000, 1200, 900, 1500, 1000]):
+            self.add_expense(self.month_day(offset), str(amount), self.rent)
+
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['months'], 6)
+        self.assertEqual(data['recurring'], [])
+        self.assertEqual(data['accounts'][0]['recurring_net'], 0.0)
+
+    def test_cached_until_transactions_change(self):
+        self.add_income(self.month_day(-1), '3000.00')
+        with self.assertNumQueries(3):
+            first = self.client.get(self.url).json()
+        # Only the state of the accounts is checked
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url).json(), first)
+
+        self.add_expense(self.month_day(-1), '500.00')
+        second = self.client.get(self.url).json()
+        self.assertEqual(second['accounts'][0]['balance'], 3500.0)
+        self.assertEqual(second['accounts'][0]['seasonal_net'], [2500.0] * 6)
+
+    def test_stale_forecasts_of_other_processes_are_recomputed(self):
+        self.add_income(self.month_day(-1), '3000.00')
+        first = self.client.get(self.url).json()
+        # Another process wrote the transaction and only dropped the
+        # forecast from its own cache
+        with patch('reports.signals.invalidate_forecast'):
+            self.add_expense(self.month_day(-1), '500.00')
+        second = self.client.get(self.url).json()
+        self.assertNotEqual(second, first)
+        self.assertEqual(second['accounts'][0]['seasonal_net'], [2500.0] * 6)
+
+    def test_other_users_are_excluded(self):
+        other = User.objects.create_user(
+            username='other', password='password123', email='other@test.com')
+        self.client.force_authenticate(user=other)
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['accounts'], [])
+        self.assertEqual(data['total'], [0.0] * 6)
+
+    def test_invalid_months(self):
+        for months in (0, 25, 'x'):
+            response = self.client.get(self.url, {'months': months})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class NetWorthReportViewTest(ReportTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('report-net-worth')
+        euro = Currency.objects.create(
+            code='EUR', name='Euro', symbol='€', owner=self.user)
+        self.travel = Account.objects.create(
+            name='Travel', account_type=self.account.account_type,
+            bank=self.account.bank, currency=euro, balance=Decimal('100.00'),
+            owner=self.user)
+        for account, day, balance in [
+                (self.account, 1, '1000.00'),
+                (self.account, 3, '900.00'),
+                (self.travel, 1, '100.00')]:
+            AccountBalanceHistory.objects.create(
+                account=account, date=datetime.date(2024, 1, day),
+                balance=Decimal(balance))
+        for day, rate in [(1, '1.10'), (3, '1.20')]:
+            ExchangeRate.objects.create(
+                base='EUR', quote='USD', date=datetime.date(2024, 1, day),
+                rate=Decimal(rate))
+        self.params = {'start': '2024-01-01', 'end': '2024-01-04'}
+
+    def test_converted_series_and_current_net_worth(self):
+        response = self.client.get(self.url, {**self.params, 'currency': 'usd'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['currency'], 'USD')
+        self.assertEqual(data['dates'], [
+            '2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04'])
+        self.assertEqual(data['series'], [
+            {'account': self.account.id, 'currency': 'USD',
+             'values': [1000.0, 1000.0, 900.0, 900.0]},
+            {'account': self.savings.id, 'currency': 'USD',
+             'values': [None, None, None, None]},
+            {'account': self.travel.id, 'currency': 'EUR',
+             'values': [110.0, 110.0, 120.0, 120.0]},
+        ])
+        self.assertEqual(data['total'], [1110.0, 1110.0, 1020.0, 1020.0])
+        self.assertEqual(data['current']['total'], 6120.0)
+        self.assertEqual(data['current']['accounts'][2], {
+            'account': self.travel.id, 'currency': 'EUR',
+            'balance': 100.0, 'converted': 120.0})
+
+    def test_inverse_rates_and_default_currency(self):
+        data = self.client.get(self.url, {**self.params, 'currency': 'EUR'}).json()
+        self.assertEqual(data['total'][0], round(1000 / 1.1 + 100, 2))
+        self.assertEqual(data['total'][3], 850.0)
+
+        # Most accounts are kept in dollars
+        data = self.client.get(self.url, self.params).json()
+        self.assertEqual(data['currency'], 'USD')
+
+    def test_weekly_resolution_uses_period_end_rates(self):
+        data = self.client.get(self.url, {
+            'start': '2024-01-01', 'end': '2024-01-14', 'resolution': 'week',
+            'currency': 'USD'}).json()
+        self.assertEqual(data['dates'], ['2024-01-01', '2024-01-08'])
+        self.assertEqual(data['series'][2]['values'], [120.0, 120.0])
+
+    def test_missing_rate(self):
+        response = self.client.get(self.url, {**self.params, 'currency': 'GBP'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('currency', response.json())
+
+        response = self.client.get(self.url, {
+            'start': '2023-12-30', 'end': '2024-01-02', 'currency': 'USD'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        AccountBalanceHistory.objects.create(
+            account=self.travel, date=datetime.date(2023, 12, 30), balance=50)
+        response = self.client.get(self.url, {
+            'start': '2023-12-30', 'end': '2024-01-02', 'currency': 'USD'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_series_format_and_query_count(self):
+        self.client.get(self.url, self.params)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {**self.params, 'format': 'series'})
+        data = decode_report(response.json())
+        self.assertEqual(data['total'], [1110.0, 1110.0, 1020.0, 1020.0])
+        self.assertEqual(data['series'][1]['values'], [None] * 4)
@@ -0,0 +1,249 @@
+# reports/views.py
+
+from decimal import Decimal
+
+from api.renderers import SeriesRenderer
+from django.utils import timezone
+from finances.history import (
+    balance_matrix,
+    daily_balances,
+    date_range,
+    default_date_range,
+    months_before,
+    period_range,
+    total_series,
+)
+from finances.models import Account
+from finances.rates import MissingExchangeRate, get_rate_cache
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from .forecast import owner_forecast
+from .net_worth import main_currency, net_worth
+from .pivot import pivot
+from .queries import cashflow, grouped_totals
+from .serializers import (
+    CashflowBucketSerializer,
+    CashflowQuerySerializer,
+    ExpenseBalanceQuerySerializer,
+    ForecastQuerySerializer,
+    NetWorthQuerySerializer,
+    PivotQuerySerializer,
+)
+
+DEFAULT_PIVOT_MONTHS = 12
+
+
+def resolve_date_range(validated_data):
+    """Requested date range, defaulting to the last DEFAULT_PERIOD_DAYS days"""
+    return default_date_range(
+        validated_data.get("start_date"), validated_data.get("end_date"))
+
+
+class CashflowReportView(APIView):
+    """
+    Transaction totals bucketed by day, week or month.
+
+    Optionally split by category or account and filtered by date range,
+    accounts, categories and transaction type.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = CashflowQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = dict(params.validated_data)
+        granularity = filters.pop("granularity")
+        group_by = filters.pop("group_by", None)
+
+        rows = cashflow(request.user, granularity, group_by, **filters)
+        return Response({
+            "granularity": granularity,
+            "group_by": group_by,
+            "results": CashflowBucketSerializer(rows, many=True).data,
+        })
+
+
+class ExpenseBalanceReportView(APIView):
+    """
+    Daily expense totals per category next to daily balances per account.
+
+    Every series is dense and aligned with ``dates``: expenses are zero on
+    days without spending and balances carry the last known value forward.
+    ``?format=series`` returns the compact encoding of api.series.
+    """
+
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, SeriesRenderer]
+
+    def get(self, request):
+        params = ExpenseBalanceQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        start_date, end_date = resolve_date_range(params.validated_data)
+        account_ids = params.validated_data.get("accounts")
+        categories = params.validated_data.get("categories")
+
+        accounts = Account.objects.filter(owner=request.user).order_by("pk")
+        if account_ids:
+            accounts = accounts.filter(pk__in=account_ids)
+        accounts = list(accounts)
+
+        dates = date_range(start_date, end_date)
+        total_expenses = [Decimal("0")] * len(dates)
+        expenses = {}
+        rows = []
+        # cashflow() reads no accounts as every account, so requested
+        # accounts none of which are the user's are not queried
+        if accounts:
+            rows = cashflow(
+                request.user,
+                "day",
+                "category",
+                start_date=start_date,
+                end_date=end_date,
+                accounts=accounts,
+                categories=categories,
+                transaction_type="expense",
+            )
+        for row in rows:
+            values = expenses.setdefault(row["category"], [Decimal("0")] * len(dates))
+            offset = (row["period"] - start_date).days
+            values[offset] = row["total"]
+            total_expenses[offset] += row["total"]
+
+        balances = daily_balances(accounts, start_date, end_date)
+        total_balance = total_series(balances, len(dates))
+
+        return Response({
+            "start_date": start_date,
+            "end_date": end_date,
+            "dates": dates,
+            "expenses": [
+                {"category": category, "values": values}
+                for category, values in sorted(expenses.items())
+            ],
+            "balances": [
+                {"account": account, "values": values}
+                for account, values in balances.items()
+            ],
+            "total_expenses": total_expenses,
+            "total_balance": total_balance,
+        })
+
+
+class PivotReportView(APIView):
+    """
+    Transaction totals as a category (or account) × period matrix with
+    running totals, period-over-period deltas and percent shares.
+
+    Defaults to the expenses per category and month of the last
+    DEFAULT_PIVOT_MONTHS months.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = PivotQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = dict(params.validated_data)
+        granularity = filters.pop("granularity")
+        group_by = filters.pop("group_by")
+        filters["end_date"] = filters.get("end_date") or timezone.localdate()
+        filters["start_date"] = filters.get("start_date") or months_before(
+            filters["end_date"], DEFAULT_PIVOT_MONTHS - 1)
+
+        rows = grouped_totals(request.user, granularity, group_by, **filters)
+        periods = period_range(
+            filters["start_date"], filters["end_date"], granularity)
+        return Response({
+            "granularity": granularity,
+            "group_by": group_by,
+            "transaction_type": filters["transaction_type"],
+            "start_date": filters["start_date"],
+            "end_date": filters["end_date"],
+            **pivot(rows, group_by, periods),
+        })
+
+
+class ForecastReportView(APIView):
+    """
+    Projected end of month balances of every account for the next months,
+    from their recurring incomes and expenses and seasonal averages of the
+    rest. The forecast is cached per owner until a transaction or account
+    changes.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = ForecastQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        months = params.validated_data["months"]
+
+        result = owner_forecast(request.user)
+        return Response({
+            "months": months,
+            "periods": result["periods"][:months],
+            "accounts": [
+                {
+                    **account,
+                    "seasonal_net": account["seasonal_net"][:months],
+                    "values": account["values"][:months],
+                }
+                for account in result["accounts"]
+            ],
+            "recurring": result["recurring"],
+            "total": result["total"][:months],
+        })
+
+
+class NetWorthReportView(APIView):
+    """
+    Net worth in one currency: the balance series of every account converted
+    at the exchange rates in effect at the end of each day (or week, or
+    month) and their total, plus the current balances at today's rates.
+
+    Defaults to the currency most accounts are kept in and to the last
+    DEFAULT_PERIOD_DAYS days. ``?format=series`` returns the compact
+    encoding of api.series.
+    """
+
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, SeriesRenderer]
+
+    def get(self, request):
+        params = NetWorthQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        start, end = default_date_range(
+            params.validated_data.get("start"), params.validated_data.get("end"))
+        resolution = params.validated_data["resolution"]
+
+        accounts = list(Account.objects.filter(
+            owner=request.user).select_related("currency").order_by("pk"))
+        currency = (params.validated_data.get("currency", "").upper()
+                    or main_currency(accounts))
+        dates = period_range(start, end, resolution)
+        try:
+            data = net_worth(
+                accounts,
+                dates,
+                balance_matrix(accounts, dates, resolution),
+                currency,
+                get_rate_cache(),
+                end,
+                timezone.localdate(),
+            )
+        except MissingExchangeRate as error:
+            raise ValidationError({"currency": [str(error)]})
+        return Response({
+            "currency": currency,
+            "start": start,
+            "end": end,
+            "resolution": resolution,
+            "dates": dates,
+            **data,
+        })
@@ -1,6 +1,14 @@
 from django.contrib import admin
 
-from .models import Expense, ExpenseCategory, Income, IncomeCategory
+from .models import (
+    Expense,
+    ExpenseCategory,
+    ExpenseStatistics,
+    Income,
+    IncomeCategory,
+    RecurringExpense,
+    RecurringIncome,
+)
 
 
 @admin.register(ExpenseCategory)
@@ -15,16 +23,18 @@ class ExpenseCategoryAdmin(admin.ModelAdmin):
 class ExpenseAdmin(admin.ModelAdmin):
     list_display = [
         "amount",
+        "amount_in_account_currency",
         "account",
         "currency",
         "date",
         "description",
         "category",
         "owner",
+        "anomaly",
         "created_at",
         "updated_at",
     ]
-    list_filter = ["account", "currency", "category", "owner"]
+    list_filter = ["anomaly", "account", "currency", "category", "owner"]
     search_fields = [
         "amount",
         "account",
@@ -50,6 +60,7 @@ class IncomeCategoryAdmin(admin.ModelAdmin):
 class IncomeAdmin(admin.ModelAdmin):
     list_display = [
         "amount",
+        "amount_in_account_currency",
         "account",
         "currency",
         "date",
@@ -71,3 +82,41 @@ class IncomeAdmin(admin.ModelAdmin):
     ]
     ordering = ["-date", "amount", "account", "currency", "category", "owner"]
     list_per_page = 10
+
+
+@admin.register(RecurringExpense)
+@admin.register(RecurringIncome)
+class RecurringTransactionAdmin(admin.ModelAdmin):
+    list_display = [
+        "description",
+        "period",
+        "amount",
+        "account",
+        "category",
+        "occurrences",
+        "last_date",
+        "next_date",
+        "owner",
+    ]
+    list_filter = ["period", "account", "category", "owner"]
+    search_fields = ["description"]
+    ordering = ["next_date", "description"]
+    list_per_page = 10
+
+
+@admin.register(ExpenseStatistics)
+class ExpenseStatisticsAdmin(admin.ModelAdmin):
+    list_display = [
+        "category",
+        "samples",
+        "amount_median",
+        "amount_scale",
+        "days",
+        "daily_median",
+        "daily_scale",
+        "window_start",
+        "owner",
+    ]
+    list_filter = ["owner"]
+    ordering = ["category"]
+    list_per_page = 10
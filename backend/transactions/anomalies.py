@@ -0,0 +1,196 @@
+# transactions/anomalies.py
+
+"""
+Detection of unusual expenses.
+
+Every expense category gets robust statistics over the last WINDOW_DAYS
+days: the median and scale of single amounts and of the category's total
+on days it had expenses. The scale is the median absolute deviation
+(MAD) times 1.4826, or the mean absolute deviation times 1.2533 when
+more than half of the values are equal and the MAD is zero. Both are
+estimates of the standard deviation of normally distributed values.
+
+An expense is flagged when its amount's robust z-score, (amount - median) /
+scale, exceeds THRESHOLD ("amount"). It is also flagged when its day's total
+for the category does ("spike"). Only categories with at least MIN_SAMPLES
+expenses and MIN_SAMPLES days in the window are scored.
+
+detect_anomalies() recomputes the statistics and the flags of the expenses
+in the window in one pass, clearing the flags of older expenses, which
+the statistics do not cover; new expenses are scored against the stored
+statistics as they are saved.
+"""
+
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Expense, ExpenseStatistics
+
+WINDOW_DAYS = 365
+THRESHOLD = 3.5
+MIN_SAMPLES = 5
+
+MAD_FACTOR = 1.4826
+MEAN_DEVIATION_FACTOR = 1.2533
+
+
+def grouped_medians(groups, values, count):
+    """Median of the values of each of ``count`` groups, NaN for empty ones"""
+    sizes = np.bincount(groups, minlength=count)
+    starts = np.cumsum(sizes) - sizes
+    ordered = values[np.lexsort((values, groups))]
+    medians = np.full(count, np.nan)
+    filled = sizes > 0
+    medians[filled] = (
+        ordered[(starts + (sizes - 1) // 2)[filled]]
+        + ordered[(starts + sizes // 2)[filled]]
+    ) / 2
+    return medians
+
+
+def robust_statistics(groups, values, count):
+    """Number of values, median and scale of each group"""
+    sizes = np.bincount(groups, minlength=count)
+    medians = grouped_medians(groups, values, count)
+    deviations = np.abs(values - medians[groups])
+    mads = grouped_medians(groups, deviations, count)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_deviations = np.bincount(groups, deviations, minlength=count) / sizes
+    scales = np.where(mads > 0, mads * MAD_FACTOR, mean_deviations * MEAN_DEVIATION_FACTOR)
+    return sizes, medians, np.nan_to_num(scales)
+
+
+def robust_scores(values, medians, scales, samples):
+    """Robust z-scores, zero where there is too little data to tell"""
+    scored = (samples >= MIN_SAMPLES) & (scales > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(scored, (values - medians) / scales, 0)
+
+
+def classify(amount_scores, daily_scores):
+    """Anomaly kinds and scores of expenses from both of their z-scores"""
+    unusual = amount_scores > THRESHOLD
+    spike = ~unusual & (daily_scores > THRESHOLD)
+    kinds = np.where(unusual, "amount", np.where(spike, "spike", ""))
+    scores = np.where(unusual, amount_scores, np.where(spike, daily_scores, np.nan))
+    return kinds, scores
+
+
+def detect_anomalies(owner=None, window_days=WINDOW_DAYS, today=None):
+    """
+    Recompute the statistics of the expense categories of one owner, or of
+    everyone, and the flags of their expenses in the window; older ones are
+    cleared. Returns the number of categories with statistics and of
+    flagged expenses.
+    """
+    today = today or timezone.localdate()
+    window_start = today - timedelta(days=window_days - 1)
+    expenses = Expense.objects.all()
+    statistics = ExpenseStatistics.objects.all()
+    if owner is not None:
+        expenses = expenses.filter(owner=owner)
+        statistics = statistics.filter(owner=owner)
+    rows = list(expenses.order_by().annotate(day=TruncDate("date")).values_list(
+        "pk", "owner_id", "category_id", "day", "amount", "anomaly"))
+    if not rows:
+        statistics.delete()
+        return 0, 0
+
+    pks, owners, categories, days, amounts, previous = zip(*rows)
+    categories, group = np.unique(np.array(categories, dtype=np.int64), return_inverse=True)
+    count = len(categories)
+    days = np.fromiter(map(date.toordinal, days), dtype=np.int64, count=len(rows))
+    amounts = np.array(amounts, dtype=float)
+    in_window = days >= window_start.toordinal()
+
+    # Category totals per day, identified by group and day
+    stride = days.max() + 1
+    day_keys, day_index = np.unique(group * stride + days, return_inverse=True)
+    day_totals = np.bincount(day_index, amounts)
+    day_group = day_keys // stride
+    day_in_window = day_keys % stride >= window_start.toordinal()
+
+    samples, medians, scales = robust_statistics(
+        group[in_window], amounts[in_window], count)
+    day_samples, daily_medians, daily_scales = robust_statistics(
+        day_group[day_in_window], day_totals[day_in_window], count)
+
+    kinds, scores = classify(
+        robust_scores(amounts, medians[group], scales[group], samples[group]),
+        robust_scores(day_totals, daily_medians[day_group], daily_scales[day_group],
+                      day_samples[day_group])[day_index],
+    )
+    # Older expenses are not judged by statistics they are not part of
+    kinds[~in_window] = ""
+    scores[~in_window] = np.nan
+    owner_of = dict(zip(categories[group].tolist(), owners))
+
+    changed = np.flatnonzero((kinds != "") | (np.array(previous) != ""))
+    with transaction.atomic():
+        statistics.delete()
+        ExpenseStatistics.objects.bulk_create([
+            ExpenseStatistics(
+                category_id=category,
+                owner_id=owner_of[category],
+                samples=samples[index],
+                days=day_samples[index],
+                amount_median=medians[index],
+                amount_scale=scales[index],
+                daily_median=daily_medians[index],
+                daily_scale=daily_scales[index],
+                window_start=window_start,
+            )
+            for index, category in enumerate(categories.tolist())
+            if samples[index]
+        ], batch_size=1000)
+        Expense.objects.bulk_update([
+            Expense(
+                pk=pks[index],
+                anomaly=str(kinds[index]),
+                anomaly_score=None if np.isnan(scores[index]) else float(scores[index]),
+            )
+            for index in changed.tolist()
+        ], ["anomaly", "anomaly_score"], batch_size=1000)
+    return int((samples > 0).sum()), int((kinds != "").sum())
+
+
+def score_expense(expense):
+    """
+    Flag a saved expense against its category's stored statistics and
+    return the anomaly kind, "" when it is not unusual or is older than the
+    window the statistics cover
+    """
+    statistics = ExpenseStatistics.objects.filter(
+        category_id=expense.category_id).first()
+    day = (expense.date if timezone.is_naive(expense.date)
+           else timezone.localtime(expense.date)).date()
+    kind, score = "", None
+    if statistics is not None and day >= statistics.window_start:
+        daily_score = np.zeros(1)
+        amount_score = robust_scores(
+            float(expense.amount), statistics.amount_median,
+            statistics.amount_scale, statistics.samples)
+        if amount_score <= THRESHOLD:
+            start = timezone.make_aware(datetime.combine(day, time.min))
+            total = Expense.objects.filter(
+                owner_id=expense.owner_id,
+                category_id=expense.category_id,
+                date__gte=start,
+                date__lt=start + timedelta(days=1),
+            ).aggregate(total=Sum("amount"))["total"] or 0
+            daily_score = robust_scores(
+                float(total), statistics.daily_median,
+                statistics.daily_scale, statistics.days)
+        kinds, scores = classify(np.atleast_1d(amount_score), np.atleast_1d(daily_score))
+        kind = str(kinds[0])
+        score = None if np.isnan(scores[0]) else float(scores[0])
+
+    if (kind, score) != (expense.anomaly, expense.anomaly_score):
+        Expense.objects.filter(pk=expense.pk).update(anomaly=kind, anomaly_score=score)
+        expense.anomaly, expense.anomaly_score = kind, score
+    return kind
@@ -0,0 +1,174 @@
+# transactions/conversion.py
+
+"""
+Amounts of transactions in the currency of their account.
+
+A transaction may be kept in another currency than its account. Its
+amount is converted at the exchange rate in effect on its date when it is
+saved, and balances and reports sum the stored amounts. Transactions
+saved before the amounts were stored, or without a known rate, count
+as-is until backfill_account_amounts() fills them in and corrects the
+balances they went into. The API rejects transactions without a rate
+instead (see validate_conversion() in transactions.serializers).
+"""
+
+from decimal import Decimal
+
+import numpy as np
+from api.reference import invalidate_reference
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Value, When
+from django.db.models.functions import Coalesce, Upper
+from django.utils import timezone
+from finances.models import (
+    Account,
+    AccountBalanceHistory,
+    MonthlyBalanceHistory,
+    WeeklyBalanceHistory,
+)
+from finances.rates import get_rate_cache
+
+from .models import Expense
+
+CENT = Decimal("0.01")
+
+# Amount in the account currency, the stored one or the amount itself
+ACCOUNT_AMOUNT = Coalesce("amount_in_account_currency", "amount")
+
+
+def transaction_day(moment):
+    """Local date of a transaction's date"""
+    return (moment if timezone.is_naive(moment) else timezone.localtime(moment)).date()
+
+
+def convert_amount(amount, currency, target, day, rates=None):
+    """
+    Amount in the currency with code ``currency`` converted to ``target`` at
+    the rate in effect on day, rounded to cents. Raises MissingExchangeRate
+    when no rate is known.
+    """
+    currency, target = currency.upper(), target.upper()
+    if currency == target:
+        return amount
+    rate = (rates or get_rate_cache()).rate(currency, target, day)
+    return (Decimal(amount) * Decimal(repr(rate))).quantize(CENT)
+
+
+def account_amount(instance, rates=None):
+    """Amount of a transaction in the currency of its account"""
+    account = instance.account
+    if instance.currency_id == account.currency_id:
+        return instance.amount
+    return convert_amount(
+        instance.amount, instance.currency.code, account.currency.code,
+        transaction_day(instance.date), rates)
+
+
+def shift_balances(corrections):
+    """
+    Add to the balances of accounts the changes of the amounts of their
+    transactions, given as {account_id: {day: change}}: the total to the
+    balance and the changes up to its day to each snapshot of the balance
+    history and its rollups. One update per table and account.
+
+    The updates send no signals, so the owners' cached account lists and
+    forecasts are dropped here and the accounts marked as changed.
+    """
+    if not corrections:
+        return
+    changed = timezone.now()
+    for account_id, changes in corrections.items():
+        Account.objects.filter(pk=account_id).update(
+            balance=F("balance") + sum(changes.values()), updated_at=changed)
+        shifts, total = [], Decimal("0.00")
+        for day in sorted(changes):
+            total += changes[day]
+            shifts.append((day, total))
+        for model, field in [
+            (AccountBalanceHistory, "date"),
+            (WeeklyBalanceHistory, "closing_date"),
+            (MonthlyBalanceHistory, "closing_date"),
+        ]:
+            # Latest day first, so each snapshot takes the total up to it
+            shift = Case(
+                *(When(**{f"{field}__gte": day}, then=Value(total))
+                  for day, total in reversed(shifts)),
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            )
+            model.objects.filter(**{
+                "account_id": account_id, f"{field}__gte": shifts[0][0],
+            }).update(balance=F("balance") + shift)
+
+    # reports.forecast imports the balance history, which imports this module
+    from reports.forecast import invalidate_forecast
+
+    owners = Account.objects.filter(pk__in=corrections).order_by().values_list(
+        "owner_id", flat=True).distinct()
+    for owner_id in owners:
+        invalidate_reference(Account, owner_id)
+        invalidate_forecast(owner_id)
+
+
+def backfill_account_amounts(model, owner=None, chunk_size=1000):
+    """
+    Store the account currency amounts of the transactions of ``model`` that
+    have none, ``chunk_size`` at a time in primary key order. Returns the
+    number of transactions filled in and of those skipped because a rate
+    is missing; the skipped ones keep counting as-is.
+
+    The balances and balance history the transactions went into as-is are
+    corrected by the difference in the same transaction, so that later
+    changes, which take back the converted amounts, leave them right.
+    """
+    rates = get_rate_cache()
+    sign = -1 if issubclass(model, Expense) else 1
+    queryset = model.objects.filter(amount_in_account_currency__isnull=True)
+    if owner is not None:
+        queryset = queryset.filter(owner=owner)
+    queryset = queryset.order_by("pk").annotate(
+        currency_code=Upper("currency__code"),
+        target_code=Upper("account__currency__code"),
+    ).values_list("pk", "account", "amount", "currency_code", "target_code", "date")
+
+    filled = skipped = 0
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+        if not rows:
+            return filled, skipped
+        last_pk = rows[-1][0]
+        pks, accounts, amounts, currencies, targets, dates = zip(*rows)
+        currencies, targets = np.array(currencies), np.array(targets)
+        days = np.fromiter(
+            (transaction_day(moment).toordinal() for moment in dates),
+            dtype=np.int64, count=len(rows))
+
+        # One lookup per pair of currencies in the chunk, NaN where no rate
+        # is known
+        factors = np.ones(len(rows))
+        foreign = currencies != targets
+        for currency, target in set(zip(currencies[foreign].tolist(),
+                                        targets[foreign].tolist())):
+            selected = (currencies == currency) & (targets == target)
+            factors[selected] = rates.rates(
+                currency, target, days[selected], strict=False)
+
+        updates, corrections = [], {}
+        for pk, account_id, amount, moment, factor, convert in zip(
+                pks, accounts, amounts, dates, factors.tolist(), foreign.tolist()):
+            if np.isnan(factor):
+                continue
+            converted = amount
+            if convert:
+                converted = (amount * Decimal(repr(factor))).quantize(CENT)
+                # Balance history is dated like the balance signals date it
+                changes = corrections.setdefault(account_id, {})
+                changes[moment.date()] = (
+                    changes.get(moment.date(), 0) + sign * (converted - amount))
+            updates.append(model(pk=pk, amount_in_account_currency=converted))
+        with transaction.atomic():
+            model.objects.bulk_update(
+                updates, ["amount_in_account_currency"], batch_size=chunk_size)
+            shift_balances(corrections)
+        filled += len(updates)
+        skipped += len(rows) - len(updates)
@@ -0,0 +1,32 @@
+# transactions/management/commands/backfill_account_amounts.py
+from django.core.management.base import BaseCommand
+from transactions.conversion import backfill_account_amounts
+from transactions.models import Expense, Income
+
+
+class Command(BaseCommand):
+    help = (
+        'Store the amounts in the account currency of transactions saved '
+        'before they were kept, converted at the rates of their dates'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int,
+            help='Only process the transactions of the user with this ID'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Transactions read and updated at a time (default 1000)'
+        )
+
+    def handle(self, *args, **options):
+        for model in (Expense, Income):
+            filled, skipped = backfill_account_amounts(
+                model, options['user'], options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.verbose_name}: filled in {filled} amounts'))
+            if skipped:
+                self.stdout.write(self.style.WARNING(
+                    f'{model._meta.verbose_name}: skipped {skipped} without an '
+                    'exchange rate, load the rates and run again'))
@@ -0,0 +1,55 @@
+# transactions/management/commands/benchmark_recurring.py
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from transactions.recurring import detect_recurring
+
+
+class Command(BaseCommand):
+    help = 'Time recurring transaction detection over generated transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--transactions', type=int, default=1_000_000,
+            help='Number of transactions to generate'
+        )
+        parser.add_argument(
+            '--owners', type=int, default=1000,
+            help='Number of owners the transactions belong to'
+        )
+
+    def handle(self, *args, **options):
+        columns = self.generate_data(options['transactions'], options['owners'])
+        started = time.perf_counter()
+        results = detect_recurring(*columns, today=date(2024, 12, 31))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{options["transactions"]} transactions: {len(results)} recurring '
+            f'found in {elapsed:.2f} s'
+        )
+
+    def generate_data(self, count, owners):
+        # Every owner gets a salary, rent and a subscription; everything else
+        # is irregular spending with ever changing descriptions
+        start = date(2020, 1, 1)
+        columns = [[] for _ in range(6)]
+
+        def add(owner, category, description, day, amount):
+            for column, value in zip(
+                    columns, (owner, category, description, day, amount, owner)):
+                column.append(value)
+
+        for owner in range(owners):
+            for month in range(60):
+                day = date(2020 + month // 12, month % 12 + 1, 1)
+                add(owner, 1, 'Salary ACME Corp', day, 3000)
+                add(owner, 2, f'Rent {day:%m/%Y}', day + timedelta(days=2), 1200)
+                add(owner, 3, f'Netflix #{month}', day + timedelta(days=14), 15.99)
+        while len(columns[0]) < count:
+            add(random.randrange(owners), random.randrange(4, 20),
+                f'Shop {random.randrange(100000)}',
+                start + timedelta(days=random.randrange(1826)),
+                round(random.uniform(1, 200), 2))
+        return columns
@@ -0,0 +1,21 @@
+# transactions/management/commands/detect_recurring_transactions.py
+from django.core.management.base import BaseCommand
+from transactions.recurring import rebuild_recurring
+
+
+class Command(BaseCommand):
+    help = (
+        'Detect recurring expenses and incomes from scratch, e.g. to drop the '
+        'ones that stopped without any new transaction being written'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int,
+            help='Only detect the transactions of the user with this ID'
+        )
+
+    def handle(self, *args, **options):
+        found = rebuild_recurring(options['user'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Found {found} recurring transactions'))
@@ -0,0 +1,27 @@
+# transactions/management/commands/detect_spending_anomalies.py
+from django.core.management.base import BaseCommand
+from transactions.anomalies import WINDOW_DAYS, detect_anomalies
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the robust statistics of every expense category and flag '
+        'unusual expenses over the whole history'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int,
+            help='Only process the expenses of the user with this ID'
+        )
+        parser.add_argument(
+            '--window-days', type=int, default=WINDOW_DAYS,
+            help=f'Days of expenses the statistics cover (default {WINDOW_DAYS})'
+        )
+
+    def handle(self, *args, **options):
+        categories, flagged = detect_anomalies(
+            options['user'], window_days=options['window_days'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Computed statistics of {categories} categories, '
+            f'flagged {flagged} expenses'))
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.2 on 2026-10-19 11:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0011_alter_account_options_and_more"),
+        ("transactions", "0007_alter_expense_options_alter_income_options"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="expense",
+            index=models.Index(fields=["owner", "date"], name="transaction_owner_i_d6d6d4_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="income",
+            index=models.Index(fields=["owner", "date"], name="transaction_owner_i_701fd9_idx"),
+        ),
+    ]
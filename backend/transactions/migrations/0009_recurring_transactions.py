@@ -0,0 +1,63 @@
+# Generated by Django 5.1.2 on 2026-10-19 12:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0014_account_history_compacted_until"),
+        ("transactions", "0008_transaction_owner_date_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecurringExpense",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("description", models.CharField(blank=True, help_text="Normalized description of the transactions", max_length=255, verbose_name="Description")),
+                ("period", models.CharField(choices=[("weekly", "Weekly"), ("monthly", "Monthly"), ("yearly", "Yearly")], help_text="How often the transaction repeats", max_length=7, verbose_name="Period")),
+                ("amount", models.DecimalField(decimal_places=2, help_text="Median amount of the transactions", max_digits=10, verbose_name="Amount")),
+                ("occurrences", models.PositiveIntegerField(help_text="Number of transactions", verbose_name="Occurrences")),
+                ("first_date", models.DateField(help_text="Date of the first transaction", verbose_name="First date")),
+                ("last_date", models.DateField(help_text="Date of the latest transaction", verbose_name="Last date")),
+                ("next_date", models.DateField(help_text="Expected date of the next transaction", verbose_name="Next date")),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("account", models.ForeignKey(help_text="Account of the latest transaction", on_delete=django.db.models.deletion.CASCADE, to="finances.account", verbose_name="Account")),
+                ("category", models.ForeignKey(help_text="Expense category", on_delete=django.db.models.deletion.CASCADE, related_name="recurring_expenses", to="transactions.expensecategory", verbose_name="Category")),
+                ("owner", models.ForeignKey(help_text="Transaction owner", on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name="Owner")),
+            ],
+            options={
+                "verbose_name": "Recurring Expense",
+                "ordering": ["next_date", "description"],
+                "abstract": False,
+                "unique_together": {("owner", "category", "description")},
+            },
+        ),
+        migrations.CreateModel(
+            name="RecurringIncome",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("description", models.CharField(blank=True, help_text="Normalized description of the transactions", max_length=255, verbose_name="Description")),
+                ("period", models.CharField(choices=[("weekly", "Weekly"), ("monthly", "Monthly"), ("yearly", "Yearly")], help_text="How often the transaction repeats", max_length=7, verbose_name="Period")),
+                ("amount", models.DecimalField(decimal_places=2, help_text="Median amount of the transactions", max_digits=10, verbose_name="Amount")),
+                ("occurrences", models.PositiveIntegerField(help_text="Number of transactions", verbose_name="Occurrences")),
+                ("first_date", models.DateField(help_text="Date of the first transaction", verbose_name="First date")),
+                ("last_date", models.DateField(help_text="Date of the latest transaction", verbose_name="Last date")),
+                ("next_date", models.DateField(help_text="Expected date of the next transaction", verbose_name="Next date")),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("account", models.ForeignKey(help_text="Account of the latest transaction", on_delete=django.db.models.deletion.CASCADE, to="finances.account", verbose_name="Account")),
+                ("category", models.ForeignKey(help_text="Income category", on_delete=django.db.models.deletion.CASCADE, related_name="recurring_incomes", to="transactions.incomecategory", verbose_name="Category")),
+                ("owner", models.ForeignKey(help_text="Transaction owner", on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name="Owner")),
+            ],
+            options={
+                "verbose_name": "Recurring Income",
+                "ordering": ["next_date", "description"],
+                "abstract": False,
+                "unique_together": {("owner", "category", "description")},
+            },
+        ),
+    ]
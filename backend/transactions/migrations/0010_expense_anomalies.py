@@ -0,0 +1,46 @@
+# Generated by Django 5.1.2 on 2026-10-19 12:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0009_recurring_transactions"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="expense",
+            name="anomaly",
+            field=models.CharField(blank=True, choices=[("", "None"), ("amount", "Unusual amount"), ("spike", "Daily spending spike")], default="", editable=False, help_text="Why the expense is unusual for its category, if it is", max_length=6, verbose_name="Anomaly"),
+        ),
+        migrations.AddField(
+            model_name="expense",
+            name="anomaly_score",
+            field=models.FloatField(blank=True, editable=False, help_text="Robust z-score of the unusual amount or daily total", null=True, verbose_name="Anomaly score"),
+        ),
+        migrations.CreateModel(
+            name="ExpenseStatistics",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("samples", models.PositiveIntegerField(help_text="Number of expenses in the window", verbose_name="Samples")),
+                ("days", models.PositiveIntegerField(help_text="Number of days with expenses in the window", verbose_name="Days")),
+                ("amount_median", models.FloatField(verbose_name="Median amount")),
+                ("amount_scale", models.FloatField(help_text="Robust standard deviation of the amounts", verbose_name="Amount scale")),
+                ("daily_median", models.FloatField(verbose_name="Median daily total")),
+                ("daily_scale", models.FloatField(help_text="Robust standard deviation of the daily totals", verbose_name="Daily scale")),
+                ("window_start", models.DateField(help_text="First day of the window", verbose_name="Window start")),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("category", models.OneToOneField(help_text="Expense category", on_delete=django.db.models.deletion.CASCADE, related_name="statistics", to="transactions.expensecategory", verbose_name="Category")),
+                ("owner", models.ForeignKey(help_text="Category owner", on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name="Owner")),
+            ],
+            options={
+                "verbose_name": "Expense Statistics",
+                "verbose_name_plural": "Expense Statistics",
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-19 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0010_expense_anomalies"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="expense",
+            name="amount_in_account_currency",
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, help_text="Amount converted to the account currency at the rate of its date", max_digits=12, null=True, verbose_name="Amount in account currency"),
+        ),
+        migrations.AddField(
+            model_name="income",
+            name="amount_in_account_currency",
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, help_text="Amount converted to the account currency at the rate of its date", max_digits=12, null=True, verbose_name="Amount in account currency"),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.2 on 2026-10-19 13:13
+
+import re
+
+from django.conf import settings
+from django.db import migrations, models
+
+# As transactions.recurring.normalize_description() at the time of writing
+NOISE = re.compile(r"[\W\d_]+")
+
+
+def populate_normalized_descriptions(apps, schema_editor):
+    for name in ("Expense", "Income"):
+        model = apps.get_model("transactions", name)
+        descriptions = model.objects.filter(
+            normalized_description__isnull=True,
+        ).order_by().values_list("description", flat=True).distinct()
+        for description in list(descriptions):
+            normalized = NOISE.sub(" ", (description or "").lower()).strip()
+            model.objects.filter(
+                normalized_description__isnull=True, description=description,
+            ).update(normalized_description=normalized)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0011_amount_in_account_currency"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="expense",
+            name="normalized_description",
+            field=models.CharField(blank=True, editable=False, help_text="Description the transaction is grouped by for recurring detection", max_length=255, null=True, verbose_name="Normalized description"),
+        ),
+        migrations.AddField(
+            model_name="income",
+            name="normalized_description",
+            field=models.CharField(blank=True, editable=False, help_text="Description the transaction is grouped by for recurring detection", max_length=255, null=True, verbose_name="Normalized description"),
+        ),
+        migrations.AddIndex(
+            model_name="expense",
+            index=models.Index(fields=["owner", "category", "normalized_description"], name="transaction_owner_i_37abf9_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="income",
+            index=models.Index(fields=["owner", "category", "normalized_description"], name="transaction_owner_i_03380a_idx"),
+        ),
+        migrations.RunPython(populate_normalized_descriptions, migrations.RunPython.noop),
+    ]
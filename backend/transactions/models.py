@@ -1,12 +1,16 @@
 # transactions/models.py
 
 from django.db import models
+from django.utils.functional import cached_property
 from finances.models import Account, Currency
 
 
 def get_default_currency():
-    """Get the default currency"""
-    return Account.objects.first().currency if Account.objects.exists() else 1
+    """
+    No currency until the transaction is saved, when it gets the default
+    currency of its owner (see finances.currencies)
+    """
+    return None
 
 
 class BaseCategory(models.Model):
@@ -67,6 +71,15 @@ class BaseTransaction(models.Model):
         verbose_name="Amount",
         help_text="Transaction amount",
     )
+    amount_in_account_currency = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Amount in account currency",
+        help_text="Amount converted to the account currency at the rate of its date",
+    )
     account = models.ForeignKey(
         Account,
         on_delete=models.CASCADE,
@@ -88,6 +101,14 @@ class BaseTransaction(models.Model):
         verbose_name="Description",
         help_text="Transaction description",
     )
+    normalized_description = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Normalized description",
+        help_text="Description the transaction is grouped by for recurring detection",
+    )
     owner = models.ForeignKey(
         "users.User",
         on_delete=models.CASCADE,
@@ -100,14 +121,47 @@ class BaseTransaction(models.Model):
     class Meta:
         abstract = True
         ordering = ["-date", "category", "account"]
+        indexes = [
+            models.Index(fields=["owner", "date"]),
+            models.Index(fields=["owner", "category", "normalized_description"]),
+        ]
 
     def __str__(self):
         return self.description if self.description else "No description"
 
+    def save(self, *args, **kwargs):
+        # The state before this save is loaded anew by the first receiver
+        self.__dict__.pop("previous", None)
+        super().save(*args, **kwargs)
+
+    @cached_property
+    def previous(self):
+        """
+        The transaction as stored before the save in progress, None for a
+        new one. Loaded once per save for all the signal receivers that
+        compare with it.
+        """
+        if self.pk is None:
+            return None
+        return type(self).objects.filter(pk=self.pk).order_by().first()
+
+    @property
+    def account_amount(self):
+        """Amount the transaction changes its account's balance by"""
+        if self.amount_in_account_currency is None:
+            return self.amount
+        return self.amount_in_account_currency
+
 
 class Expense(BaseTransaction):
     """Expense model"""
 
+    ANOMALY_CHOICES = [
+        ("", "None"),
+        ("amount", "Unusual amount"),
+        ("spike", "Daily spending spike"),
+    ]
+
     category = models.ForeignKey(
         ExpenseCategory,
         related_name="expenses",
@@ -115,6 +169,22 @@ class Expense(BaseTransaction):
         verbose_name="Category",
         help_text="Expense category",
     )
+    anomaly = models.CharField(
+        max_length=6,
+        choices=ANOMALY_CHOICES,
+        blank=True,
+        default="",
+        editable=False,
+        verbose_name="Anomaly",
+        help_text="Why the expense is unusual for its category, if it is",
+    )
+    anomaly_score = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Anomaly score",
+        help_text="Robust z-score of the unusual amount or daily total",
+    )
 
     class Meta(BaseTransaction.Meta):
         verbose_name = "Expense"
@@ -133,3 +203,148 @@ class Income(BaseTransaction):
 
     class Meta(BaseTransaction.Meta):
         verbose_name = "Income"
+
+
+class RecurringTransaction(models.Model):
+    """
+    Abstract base model for transactions detected to repeat weekly, monthly
+    or yearly: the owner's transactions of one category whose descriptions
+    normalize to the same text
+    """
+
+    PERIOD_CHOICES = [
+        ("weekly", "Weekly"),
+        ("monthly", "Monthly"),
+        ("yearly", "Yearly"),
+    ]
+
+    description = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name="Description",
+        help_text="Normalized description of the transactions",
+    )
+    period = models.CharField(
+        max_length=7,
+        choices=PERIOD_CHOICES,
+        verbose_name="Period",
+        help_text="How often the transaction repeats",
+    )
+    amount = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name="Amount",
+        help_text="Median amount of the transactions",
+    )
+    account = models.ForeignKey(
+        Account,
+        on_delete=models.CASCADE,
+        verbose_name="Account",
+        help_text="Account of the latest transaction",
+    )
+    occurrences = models.PositiveIntegerField(
+        verbose_name="Occurrences", help_text="Number of transactions"
+    )
+    first_date = models.DateField(
+        verbose_name="First date", help_text="Date of the first transaction"
+    )
+    last_date = models.DateField(
+        verbose_name="Last date", help_text="Date of the latest transaction"
+    )
+    next_date = models.DateField(
+        verbose_name="Next date", help_text="Expected date of the next transaction"
+    )
+    owner = models.ForeignKey(
+        "users.User",
+        on_delete=models.CASCADE,
+        verbose_name="Owner",
+        help_text="Transaction owner",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+        ordering = ["next_date", "description"]
+        unique_together = ["owner", "category", "description"]
+
+    def __str__(self):
+        return f"{self.description or 'No description'} ({self.period})"
+
+
+class RecurringExpense(RecurringTransaction):
+    """Recurring expense model"""
+
+    category = models.ForeignKey(
+        ExpenseCategory,
+        related_name="recurring_expenses",
+        on_delete=models.CASCADE,
+        verbose_name="Category",
+        help_text="Expense category",
+    )
+
+    class Meta(RecurringTransaction.Meta):
+        verbose_name = "Recurring Expense"
+
+
+class RecurringIncome(RecurringTransaction):
+    """Recurring income model"""
+
+    category = models.ForeignKey(
+        IncomeCategory,
+        related_name="recurring_incomes",
+        on_delete=models.CASCADE,
+        verbose_name="Category",
+        help_text="Income category",
+    )
+
+    class Meta(RecurringTransaction.Meta):
+        verbose_name = "Recurring Income"
+
+
+class ExpenseStatistics(models.Model):
+    """
+    Robust statistics of an expense category that new expenses are scored
+    against: median and scale of single amounts and of the category's total
+    on days with spending, over a trailing window
+    """
+
+    category = models.OneToOneField(
+        ExpenseCategory,
+        related_name="statistics",
+        on_delete=models.CASCADE,
+        verbose_name="Category",
+        help_text="Expense category",
+    )
+    samples = models.PositiveIntegerField(
+        verbose_name="Samples", help_text="Number of expenses in the window"
+    )
+    days = models.PositiveIntegerField(
+        verbose_name="Days", help_text="Number of days with expenses in the window"
+    )
+    amount_median = models.FloatField(verbose_name="Median amount")
+    amount_scale = models.FloatField(
+        verbose_name="Amount scale",
+        help_text="Robust standard deviation of the amounts",
+    )
+    daily_median = models.FloatField(verbose_name="Median daily total")
+    daily_scale = models.FloatField(
+        verbose_name="Daily scale",
+        help_text="Robust standard deviation of the daily totals",
+    )
+    window_start = models.DateField(
+        verbose_name="Window start", help_text="First day of the window"
+    )
+    owner = models.ForeignKey(
+        "users.User",
+        on_delete=models.CASCADE,
+        verbose_name="Owner",
+        help_text="Category owner",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Expense Statistics"
+        verbose_name_plural = "Expense Statistics"
+
+    def __str__(self):
+        return f"{self.category} statistics"
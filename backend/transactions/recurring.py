@@ -0,0 +1,246 @@
+# transactions/recurring.py
+
+"""
+Detection of recurring transactions such as salary, rent and subscriptions.
+
+Transactions are grouped by owner, category and normalized description by
+sorting, never by comparing them pairwise. The normalized description is
+stored with each transaction, so that a write re-detects its group from
+that group's transactions alone. A group recurs with the period
+that most of the gaps between its consecutive dates match, within the
+period's tolerance in days, when
+
+* it has at least the period's minimum number of transactions;
+* at least MATCH_SHARE of its gaps match the period and at least
+  MATCH_SHARE of its amounts are within AMOUNT_TOLERANCE of the median;
+* its latest transaction is no more than STALE_PERIODS periods old.
+"""
+
+import re
+from calendar import monthrange
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Expense, Income, RecurringExpense, RecurringIncome
+
+# Nominal length, tolerance in days and minimum number of transactions
+PERIODS = {
+    "weekly": (7, 1, 4),
+    "monthly": (30, 4, 3),
+    "yearly": (365, 10, 2),
+}
+MATCH_SHARE = 0.75
+AMOUNT_TOLERANCE = 0.2
+STALE_PERIODS = 2
+
+RECURRING_MODELS = {
+    Expense: RecurringExpense,
+    Income: RecurringIncome,
+}
+
+NOISE = re.compile(r"[\W\d_]+")
+
+
+def normalize_description(description):
+    """
+    Lowercase description without digits and punctuation, so that e.g.
+    "Netflix 03/2024" and "NETFLIX #0424" fall into the same group
+    """
+    return NOISE.sub(" ", (description or "").lower()).strip()
+
+
+def fill_normalized_descriptions(queryset):
+    """
+    Store the normalized description of the transactions of a queryset that
+    have none, such as ones created in bulk. One update per description.
+    """
+    descriptions = queryset.filter(normalized_description__isnull=True).order_by(
+        ).values_list("description", flat=True).distinct()
+    for description in list(descriptions):
+        queryset.filter(
+            normalized_description__isnull=True, description=description,
+        ).update(normalized_description=normalize_description(description))
+
+
+def next_occurrence(day, period):
+    if period == "weekly":
+        return day + timedelta(days=7)
+    year, month = (day.year + 1, day.month) if period == "yearly" else (
+        day.year + day.month // 12, day.month % 12 + 1)
+    return date(year, month, min(day.day, monthrange(year, month)[1]))
+
+
+def description_codes(descriptions):
+    """
+    Integer code of every description's normalized text and the texts.
+    Each distinct raw description is only normalized once.
+    """
+    raw_codes = {
+        raw: code for code, raw in enumerate(dict.fromkeys(descriptions))}
+    codes = np.fromiter(
+        map(raw_codes.__getitem__, descriptions), dtype=np.int64,
+        count=len(descriptions))
+    normalized = {}
+    raw_to_normalized = np.array(
+        [normalized.setdefault(normalize_description(raw), len(normalized))
+         for raw in raw_codes],
+        dtype=np.int64,
+    )
+    return raw_to_normalized[codes], list(normalized)
+
+
+def detect_recurring(owners, categories, descriptions, dates, amounts,
+                     accounts, today=None):
+    """
+    Recurring groups among transactions given as parallel sequences.
+
+    Returns a dict per recurring group with owner, category, description
+    (normalized), period, amount (the median), account (of the latest
+    transaction), occurrences, first_date, last_date and next_date.
+    """
+    count = len(dates)
+    if not count:
+        return []
+    today = today or timezone.localdate()
+    texts, names = description_codes(descriptions)
+    owners = np.asarray(owners, dtype=np.int64)
+    categories = np.asarray(categories, dtype=np.int64)
+    days = np.fromiter(map(date.toordinal, dates), dtype=np.int64, count=count)
+    amounts = np.array(amounts, dtype=float)
+    accounts = np.asarray(accounts, dtype=np.int64)
+
+    order = np.lexsort((days, texts, categories, owners))
+    owners, categories, texts, days, amounts, accounts = (
+        values[order] for values in (owners, categories, texts, days, amounts, accounts))
+    boundaries = (
+        (owners[1:] != owners[:-1])
+        | (categories[1:] != categories[:-1])
+        | (texts[1:] != texts[:-1])
+    )
+    starts = np.flatnonzero(np.concatenate([[True], boundaries]))
+    group = np.cumsum(np.concatenate([[0], boundaries]))
+    sizes = np.diff(np.append(starts, count))
+    lasts = starts + sizes - 1
+
+    # Gaps between consecutive transactions of the same group
+    within = ~boundaries
+    gaps = np.diff(days)[within]
+    gap_group = group[1:][within]
+    matches = np.array([
+        np.bincount(gap_group[np.abs(gaps - length) <= tolerance],
+                    minlength=len(starts))
+        for length, tolerance, _ in PERIODS.values()
+    ])
+    best = matches.argmax(axis=0)
+    lengths, tolerances, minimums = (
+        np.array(values)[best] for values in zip(*PERIODS.values()))
+    gap_share = matches[best, np.arange(len(starts))] / np.maximum(sizes - 1, 1)
+
+    # Median amounts: sorting by amount keeps the groups contiguous
+    sorted_amounts = amounts[np.lexsort((amounts, group))]
+    medians = (sorted_amounts[starts + (sizes - 1) // 2]
+               + sorted_amounts[starts + sizes // 2]) / 2
+    close = np.abs(amounts - medians[group]) <= AMOUNT_TOLERANCE * np.abs(medians[group])
+    amount_share = np.bincount(group, weights=close) / sizes
+
+    age = today.toordinal() - days[lasts]
+    recurring = np.flatnonzero(
+        (sizes >= minimums)
+        & (gap_share >= MATCH_SHARE)
+        & (amount_share >= MATCH_SHARE)
+        & (age <= STALE_PERIODS * lengths + tolerances)
+    )
+
+    periods = list(PERIODS)
+    results = []
+    for index in recurring.tolist():
+        period = periods[best[index]]
+        last_date = date.fromordinal(int(days[lasts[index]]))
+        results.append({
+            "owner": int(owners[starts[index]]),
+            "category": int(categories[starts[index]]),
+            "description": names[texts[starts[index]]],
+            "period": period,
+            "amount": Decimal(str(round(medians[index], 2))),
+            "account": int(accounts[lasts[index]]),
+            "occurrences": int(sizes[index]),
+            "first_date": date.fromordinal(int(days[starts[index]])),
+            "last_date": last_date,
+            "next_date": next_occurrence(last_date, period),
+        })
+    return results
+
+
+def transaction_columns(queryset):
+    """detect_recurring() arguments for the transactions of a queryset"""
+    rows = queryset.order_by().annotate(day=TruncDate("date")).values_list(
+        "owner_id", "category_id", "description", "day", "amount", "account_id")
+    columns = list(zip(*rows))
+    return columns or [[] for _ in range(6)]
+
+
+def recurring_instances(model, results):
+    return [
+        model(
+            owner_id=result["owner"],
+            category_id=result["category"],
+            account_id=result["account"],
+            **{key: value for key, value in result.items()
+               if key not in ("owner", "category", "account")},
+        )
+        for result in results
+    ]
+
+
+def rebuild_recurring(owner=None, today=None):
+    """
+    Detect the recurring transactions of one owner, or of everyone, from
+    scratch and replace the stored ones. Returns how many were found.
+    """
+    found = 0
+    for model, recurring_model in RECURRING_MODELS.items():
+        queryset = model.objects.all()
+        stored = recurring_model.objects.all()
+        if owner is not None:
+            queryset = queryset.filter(owner=owner)
+            stored = stored.filter(owner=owner)
+        fill_normalized_descriptions(queryset)
+        results = detect_recurring(*transaction_columns(queryset), today=today)
+        with transaction.atomic():
+            stored.delete()
+            recurring_model.objects.bulk_create(
+                recurring_instances(recurring_model, results), batch_size=1000)
+        found += len(results)
+    return found
+
+
+def refresh_recurring(model, owner_id, category_id, description, today=None):
+    """
+    Re-detect the one group a transaction belongs to after it was written,
+    keeping the stored recurring transactions up to date
+    """
+    recurring_model = RECURRING_MODELS[model]
+    text = normalize_description(description)
+    results = detect_recurring(*transaction_columns(model.objects.filter(
+        owner_id=owner_id, category_id=category_id, normalized_description=text,
+    )), today=today)
+    stored = recurring_model.objects.filter(
+        owner_id=owner_id, category_id=category_id, description=text)
+    if not results:
+        stored.delete()
+        return None
+    instance = recurring_instances(recurring_model, results)[0]
+    fields = {
+        field: getattr(instance, field)
+        for field in ("period", "amount", "account_id", "occurrences",
+                      "first_date", "last_date", "next_date")
+    }
+    recurring, _ = recurring_model.objects.update_or_create(
+        owner_id=owner_id, category_id=category_id, description=text,
+        defaults=fields)
+    return recurring
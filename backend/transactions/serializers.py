@@ -1,9 +1,47 @@
 # transactions/serializers.py
 
+from finances.currencies import default_currency_id
+from finances.models import Currency
+from finances.rates import MissingExchangeRate
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
-from .models import Expense, ExpenseCategory, Income, IncomeCategory
+from .conversion import convert_amount, transaction_day
+from .models import (
+    Expense,
+    ExpenseCategory,
+    Income,
+    IncomeCategory,
+    RecurringExpense,
+)
+
+
+def validate_conversion(attrs, instance=None, owner=None):
+    """
+    Make sure the amount can be converted to the account's currency, which
+    takes no query when the currencies match
+    """
+    values = {
+        field: attrs[field] if field in attrs else getattr(instance, field, None)
+        for field in ("amount", "account", "date")
+    }
+    if None in values.values():
+        return
+    if "currency" in attrs:
+        currency_id = attrs["currency"].pk
+    elif instance is not None:
+        currency_id = instance.currency_id
+    else:
+        currency_id = default_currency_id(owner.pk)
+    if currency_id is None or currency_id == values["account"].currency_id:
+        return
+    currency = attrs.get("currency") or Currency.objects.get(pk=currency_id)
+    try:
+        convert_amount(
+            values["amount"], currency.code, values["account"].currency.code,
+            transaction_day(values["date"]))
+    except MissingExchangeRate as error:
+        raise ValidationError({"currency": [str(error)]})
 
 
 class ExpenseCategorySerializer(serializers.ModelSerializer):
@@ -44,16 +82,20 @@ class ExpenseSerializer(serializers.ModelSerializer):
             "id",
             "date",
             "amount",
+            "amount_in_account_currency",
             "currency",
             "account",
             "description",
             "category",
+            "anomaly",
+            "anomaly_score",
         )
 
     def validate(self, attrs):
         user = self.context['request'].user
         if attrs['category'].owner != user:
             raise ValidationError("You do not have permission to set this category.")
+        validate_conversion(attrs, self.instance, user)
         return attrs
 
 
@@ -64,6 +106,7 @@ class IncomeSerializer(serializers.ModelSerializer):
             "id",
             "date",
             "amount",
+            "amount_in_account_currency",
             "currency",
             "account",
             "description",
@@ -74,6 +117,7 @@ class IncomeSerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         if attrs['category'].owner != user:
             raise ValidationError("You do not have permission to set this category.")
+        validate_conversion(attrs, self.instance, user)
         return attrs
 
 
@@ -81,11 +125,16 @@ class TransactionSerializer(serializers.Serializer):
     id = serializers.IntegerField()
     date = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
     amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    amount_in_account_currency = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True)
     currency = serializers.PrimaryKeyRelatedField(read_only=True)
     account = serializers.PrimaryKeyRelatedField(read_only=True)
     description = serializers.CharField(allow_null=True, allow_blank=True)
     category = serializers.PrimaryKeyRelatedField(read_only=True)
     owner = serializers.PrimaryKeyRelatedField(read_only=True)
+    # Only expenses are scored, incomes get the defaults
+    anomaly = serializers.CharField(read_only=True, default="")
+    anomaly_score = serializers.FloatField(read_only=True, default=None)
     transaction_type = serializers.SerializerMethodField()
 
     def get_date(self, obj):
@@ -111,3 +160,20 @@ class TransactionSerializer(serializers.Serializer):
             representation['transaction_type'] = 'income'
             # Дополнительная обработка для Income, если нужно
         return representation
+
+
+class RecurringTransactionSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    description = serializers.CharField(allow_blank=True)
+    period = serializers.CharField()
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    account = serializers.PrimaryKeyRelatedField(read_only=True)
+    category = serializers.PrimaryKeyRelatedField(read_only=True)
+    occurrences = serializers.IntegerField()
+    first_date = serializers.DateField()
+    last_date = serializers.DateField()
+    next_date = serializers.DateField()
+    transaction_type = serializers.SerializerMethodField()
+
+    def get_transaction_type(self, obj):
+        return 'expense' if isinstance(obj, RecurringExpense) else 'income'
@@ -0,0 +1,76 @@
+import logging
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from finances.currencies import default_currency_id
+from finances.rates import MissingExchangeRate
+
+from .anomalies import score_expense
+from .conversion import account_amount
+from .models import Expense, Income
+from .recurring import normalize_description, refresh_recurring
+
+logger = logging.getLogger(__name__)
+
+
+def transaction_group(instance):
+    return instance.owner_id, instance.category_id, instance.description
+
+
+@receiver(pre_save, sender=Expense)
+@receiver(pre_save, sender=Income)
+def set_default_currency(sender, instance, **kwargs):
+    if instance.currency_id is None:
+        instance.currency_id = default_currency_id(instance.owner_id)
+
+
+@receiver(pre_save, sender=Expense)
+@receiver(pre_save, sender=Income)
+def set_normalized_description(sender, instance, **kwargs):
+    instance.normalized_description = normalize_description(instance.description)
+
+
+@receiver(pre_save, sender=Expense)
+@receiver(pre_save, sender=Income)
+def convert_to_account_currency(sender, instance, raw=False, **kwargs):
+    # Fixtures are loaded with the amounts they were saved with
+    if raw:
+        return
+    try:
+        instance.amount_in_account_currency = account_amount(instance)
+    except MissingExchangeRate as error:
+        # As in backfill_account_amounts(), the transaction counts as-is
+        # until its rate is loaded and the backfill converts it
+        instance.amount_in_account_currency = None
+        logger.warning("%s kept unconverted: %s", sender.__name__, error)
+
+
+@receiver(pre_save, sender=Expense)
+@receiver(pre_save, sender=Income)
+def load_previous_transaction(sender, instance, **kwargs):
+    # Loaded before the row changes, for every post_save receiver comparing
+    # with it: balances, budget spending and recurring groups
+    instance.previous
+
+
+@receiver(post_save, sender=Expense)
+@receiver(post_save, sender=Income)
+def refresh_recurring_on_save(sender, instance, **kwargs):
+    group = transaction_group(instance)
+    refresh_recurring(sender, *group)
+    # A transaction moved to another category or description also
+    # changes the group it left
+    previous = instance.previous
+    if previous and transaction_group(previous) != group:
+        refresh_recurring(sender, *transaction_group(previous))
+
+
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=Income)
+def refresh_recurring_on_delete(sender, instance, **kwargs):
+    refresh_recurring(sender, *transaction_group(instance))
+
+
+@receiver(post_save, sender=Expense)
+def score_expense_on_save(sender, instance, **kwargs):
+    score_expense(instance)
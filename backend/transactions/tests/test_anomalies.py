@@ -0,0 +1,176 @@
+import datetime
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from finances.models import Account, AccountType, Bank, Currency
+from rest_framework.test import APIClient
+from transactions.anomalies import detect_anomalies, robust_statistics
+from transactions.models import (
+    Expense,
+    ExpenseCategory,
+    ExpenseStatistics,
+    Income,
+    IncomeCategory,
+)
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        username="testuser", password="password", email="testuser@test.com")
+
+
+@pytest.fixture
+def account(user):
+    currency = Currency.objects.create(
+        name="Dollar", code="USD", symbol="$", owner=user)
+    account_type = AccountType.objects.create(name="Savings", owner=user)
+    bank = Bank.objects.create(name="Test Bank", country="Test Country", owner=user)
+    return Account.objects.create(
+        name="Main Account",
+        account_type=account_type,
+        bank=bank,
+        balance=1000.00,
+        currency=currency,
+        owner=user
+    )
+
+
+@pytest.fixture
+def food(user):
+    return ExpenseCategory.objects.create(name="Food", owner=user)
+
+
+def add_expense(account, category, days_ago, amount):
+    day = timezone.localdate() - datetime.timedelta(days=days_ago)
+    return Expense.objects.create(
+        date=timezone.make_aware(datetime.datetime.combine(day, datetime.time(12))),
+        amount=Decimal(amount),
+        currency=account.currency,
+        account=account,
+        category=category,
+        owner=account.owner,
+    )
+
+
+@pytest.fixture
+def history(account, food):
+    """
+    One ordinary expense a day for 20 days, six of them on a single day and
+    one very large one
+    """
+    for days_ago in range(1, 21):
+        add_expense(account, food, days_ago, str(20 + days_ago % 10))
+    spike = [add_expense(account, food, 30, "25.00") for _ in range(6)]
+    large = add_expense(account, food, 40, "500.00")
+    return spike, large
+
+
+def test_robust_statistics():
+    groups = np.array([0, 0, 0, 0, 0, 1, 1, 1, 1, 2])
+    values = np.array([10, 12, 11, 13, 100, 5, 5, 5, 9, 7], dtype=float)
+    sizes, medians, scales = robust_statistics(groups, values, 4)
+    assert sizes.tolist() == [5, 4, 1, 0]
+    assert medians[:3].tolist() == [12.0, 5.0, 7.0]
+    assert np.isnan(medians[3])
+    # MAD of the first group is 1; in the second most values are equal, so
+    # the mean absolute deviation stands in for the zero MAD
+    assert scales[0] == pytest.approx(1.4826)
+    assert scales[1] == pytest.approx(1.2533)
+    assert scales[2:].tolist() == [0.0, 0.0]
+
+
+@pytest.mark.django_db
+def test_detect_anomalies(user, food, history):
+    spike, large = history
+    assert detect_anomalies(user) == (1, 7)
+
+    statistics = ExpenseStatistics.objects.get()
+    assert statistics.category == food
+    assert statistics.owner == user
+    assert (statistics.samples, statistics.days) == (27, 22)
+    assert statistics.amount_median == 25.0
+
+    large.refresh_from_db()
+    assert large.anomaly == "amount"
+    assert large.anomaly_score > 100
+    for expense in spike:
+        expense.refresh_from_db()
+        assert expense.anomaly == "spike"
+    assert Expense.objects.filter(anomaly="").count() == 20
+    assert Expense.objects.filter(anomaly="", anomaly_score__isnull=False).count() == 0
+
+    # Only the expenses the statistics cover are flagged
+    assert detect_anomalies(user, window_days=35) == (1, 6)
+    large.refresh_from_db()
+    assert (large.anomaly, large.anomaly_score) == ("", None)
+    detect_anomalies(user)
+
+    # Flags disappear once the expenses no longer stand out
+    large.delete()
+    Expense.objects.filter(pk__in=[expense.pk for expense in spike[1:]]).delete()
+    assert detect_anomalies(user, window_days=25) == (1, 0)
+    spike[0].refresh_from_db()
+    assert (spike[0].anomaly, spike[0].anomaly_score) == ("", None)
+
+
+@pytest.mark.django_db
+def test_new_expenses_are_scored_on_save(user, account, food, history):
+    detect_anomalies(user)
+
+    unusual = add_expense(account, food, 0, "400.00")
+    assert unusual.anomaly == "amount"
+    unusual.refresh_from_db()
+    assert unusual.anomaly == "amount"
+
+    ordinary = add_expense(account, food, 50, "23.00")
+    assert (ordinary.anomaly, ordinary.anomaly_score) == ("", None)
+
+    unusual.amount = Decimal("24.00")
+    unusual.save()
+    unusual.refresh_from_db()
+    assert (unusual.anomaly, unusual.anomaly_score) == ("", None)
+
+    # Nor are expenses older than the window of the statistics
+    assert add_expense(account, food, 400, "9000.00").anomaly == ""
+    unusual.amount = Decimal("400.00")
+    unusual.save()
+    assert unusual.anomaly == "amount"
+    unusual.date -= datetime.timedelta(days=400)
+    unusual.save()
+    unusual.refresh_from_db()
+    assert (unusual.anomaly, unusual.anomaly_score) == ("", None)
+
+    # Categories without statistics are never flagged
+    other = ExpenseCategory.objects.create(name="Travel", owner=user)
+    assert add_expense(account, other, 0, "9000.00").anomaly == ""
+
+
+@pytest.mark.django_db
+def test_flags_on_transaction_apis(user, account, history):
+    detect_anomalies(user)
+    spike, large = history
+    large.refresh_from_db()
+    salary = IncomeCategory.objects.create(name="Salary", owner=user)
+    Income.objects.create(
+        date=timezone.now(), amount=Decimal("3000.00"), currency=account.currency,
+        account=account, category=salary, owner=user)
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    data = client.get(reverse("expense-detail", args=[large.id])).json()
+    assert data["anomaly"] == "amount"
+    assert data["anomaly_score"] == pytest.approx(large.anomaly_score)
+
+    transactions = client.get(
+        reverse("combined-transactions"), {"limit": 100}).json()["results"]
+    flags = {
+        (item["transaction_type"], item["anomaly"]) for item in transactions}
+    assert flags == {
+        ("income", ""), ("expense", ""), ("expense", "spike"), ("expense", "amount")}
@@ -0,0 +1,209 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+from finances.models import (
+    Account,
+    AccountBalanceHistory,
+    AccountType,
+    Bank,
+    Currency,
+    ExchangeRate,
+    MonthlyBalanceHistory,
+    WeeklyBalanceHistory,
+)
+from rest_framework.test import APIClient
+from transactions.conversion import backfill_account_amounts
+from transactions.models import Expense, ExpenseCategory, Income, IncomeCategory
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        username="testuser", password="password", email="testuser@test.com")
+
+
+@pytest.fixture
+def account(user):
+    currency = Currency.objects.create(
+        name="Dollar", code="USD", symbol="$", owner=user)
+    account_type = AccountType.objects.create(name="Savings", owner=user)
+    bank = Bank.objects.create(name="Test Bank", country="Test Country", owner=user)
+    return Account.objects.create(
+        name="Main Account",
+        account_type=account_type,
+        bank=bank,
+        balance=Decimal("1000.00"),
+        currency=currency,
+        owner=user
+    )
+
+
+@pytest.fixture
+def euro(user):
+    for day, rate in [(2, "1.10"), (10, "1.20")]:
+        ExchangeRate.objects.create(
+            base="EUR", quote="USD", date=datetime.date(2024, 1, day),
+            rate=Decimal(rate))
+    return Currency.objects.create(name="Euro", code="eur", symbol="€", owner=user)
+
+
+@pytest.fixture
+def food(user):
+    return ExpenseCategory.objects.create(name="Food", owner=user)
+
+
+def moment(day):
+    return timezone.make_aware(datetime.datetime(2024, 1, day, 12))
+
+
+def add_expense(account, category, currency, day, amount):
+    return Expense.objects.create(
+        date=moment(day), amount=Decimal(amount), currency=currency,
+        account=account, category=category, owner=account.owner)
+
+
+@pytest.mark.django_db
+def test_amounts_are_converted_on_save(account, euro, food):
+    expense = add_expense(account, food, account.currency, 2, "10.00")
+    assert expense.amount_in_account_currency == Decimal("10.00")
+
+    expense = add_expense(account, food, euro, 5, "100.00")
+    assert expense.amount_in_account_currency == Decimal("110.00")
+    account.refresh_from_db()
+    assert account.balance == Decimal("880.00")
+
+    # Changes are converted at the rate of the new date
+    expense.amount = Decimal("50.00")
+    expense.date = moment(12)
+    expense.save()
+    expense.refresh_from_db()
+    assert expense.amount_in_account_currency == Decimal("60.00")
+    account.refresh_from_db()
+    assert account.balance == Decimal("930.00")
+
+    expense.delete()
+    account.refresh_from_db()
+    assert account.balance == Decimal("990.00")
+
+
+@pytest.mark.django_db
+def test_amounts_without_rate_count_as_is(account, euro, food, caplog):
+    # Before the first rate and without any rate at all
+    pound = Currency.objects.create(
+        name="Pound", code="GBP", symbol="£", owner=account.owner)
+    for currency, day in [(euro, 1), (pound, 5)]:
+        expense = add_expense(account, food, currency, day, "1.00")
+        assert expense.amount_in_account_currency is None
+    assert "Expense kept unconverted" in caplog.text
+    account.refresh_from_db()
+    assert account.balance == Decimal("998.00")
+
+    # Converted and corrected once the rate is known
+    ExchangeRate.objects.create(
+        base="GBP", quote="USD", date=datetime.date(2024, 1, 1), rate=Decimal("1.50"))
+    assert backfill_account_amounts(Expense) == (1, 1)
+    account.refresh_from_db()
+    assert account.balance == Decimal("997.50")
+
+
+@pytest.mark.django_db
+def test_missing_rate_is_a_validation_error(user, account, euro, food):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    data = {
+        "date": "2024-01-05T12:00:00Z",
+        "amount": "100.00",
+        "currency": euro.id,
+        "account": account.id,
+        "category": food.id,
+    }
+    response = client.post(reverse("expense-list"), data)
+    assert response.status_code == 201
+    assert response.json()["amount_in_account_currency"] == "110.00"
+
+    response = client.post(reverse("expense-list"), {
+        **data, "date": "2023-12-31T12:00:00Z"})
+    assert response.status_code == 400
+    assert "currency" in response.json()
+
+
+@pytest.mark.django_db
+def test_backfill_account_amounts(user, account, euro, food):
+    salary = IncomeCategory.objects.create(name="Salary", owner=user)
+    Income.objects.create(
+        date=moment(3), amount=Decimal("500.00"), currency=account.currency,
+        account=account, category=salary, owner=user)
+    expenses = [add_expense(account, food, euro, day, "10.00") for day in (2, 11, 12)]
+    Expense.objects.update(amount_in_account_currency=None)
+    Income.objects.update(amount_in_account_currency=None)
+    # Saved before the first rate was known
+    ExchangeRate.objects.filter(date=datetime.date(2024, 1, 2)).delete()
+
+    out = StringIO()
+    call_command("backfill_account_amounts", chunk_size=2, stdout=out)
+    assert "Expense: filled in 2 amounts" in out.getvalue()
+    assert "Expense: skipped 1 without an exchange rate" in out.getvalue()
+    assert "Income: filled in 1 amounts" in out.getvalue()
+
+    amounts = dict(Expense.objects.values_list("pk", "amount_in_account_currency"))
+    assert [amounts[expense.pk] for expense in expenses] == [
+        None, Decimal("12.00"), Decimal("12.00")]
+    assert Income.objects.get().amount_in_account_currency == Decimal("500.00")
+
+
+@pytest.mark.django_db
+def test_backfill_corrects_balances(account, euro, food):
+    legacy = add_expense(account, food, euro, 5, "10.00")
+    add_expense(account, food, account.currency, 6, "5.00")
+    # Saved before the amounts were converted: 10.00 went into the balances
+    # instead of 11.00
+    Expense.objects.filter(pk=legacy.pk).update(amount_in_account_currency=None)
+    for model in (Account, AccountBalanceHistory, WeeklyBalanceHistory,
+                  MonthlyBalanceHistory):
+        model.objects.update(balance=F("balance") + 1)
+
+    assert backfill_account_amounts(Expense) == (1, 0)
+    account.refresh_from_db()
+    assert account.balance == Decimal("984.00")
+    assert dict(AccountBalanceHistory.objects.values_list("date", "balance")) == {
+        datetime.date(2024, 1, 5): Decimal("989.00"),
+        datetime.date(2024, 1, 6): Decimal("984.00"),
+    }
+    assert MonthlyBalanceHistory.objects.get().balance == Decimal("984.00")
+
+    # Changes take back the converted amount
+    legacy.refresh_from_db()
+    legacy.amount = Decimal("20.00")
+    legacy.save()
+    account.refresh_from_db()
+    assert account.balance == Decimal("973.00")
+    legacy.delete()
+    account.refresh_from_db()
+    assert account.balance == Decimal("995.00")
+
+
+@pytest.mark.django_db
+def test_backfill_refreshes_cached_accounts(user, account, euro, food):
+    caches["reference"].clear()
+    legacy = add_expense(account, food, euro, 5, "10.00")
+    Expense.objects.filter(pk=legacy.pk).update(amount_in_account_currency=None)
+    Account.objects.update(balance=Decimal("990.00"))
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("account-list")
+    assert client.get(url).json()["results"][0]["balance"] == "990.00"
+    changed = Account.objects.get().updated_at
+
+    assert backfill_account_amounts(Expense) == (1, 0)
+    assert client.get(url).json()["results"][0]["balance"] == "989.00"
+    assert Account.objects.get().updated_at > changed
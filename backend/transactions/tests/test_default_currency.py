@@ -0,0 +1,104 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from finances.currencies import default_currency_id
+from finances.models import Account, AccountType, Bank, Currency
+from rest_framework.test import APIClient
+from transactions.models import Expense, ExpenseCategory
+
+User = get_user_model()
+
+
+def make_account(owner, code, name="Main Account"):
+    currency = Currency.objects.create(
+        name=code, code=code, symbol="$", owner=owner)
+    account_type = AccountType.objects.create(name=f"{name} type", owner=owner)
+    bank = Bank.objects.create(name=f"{name} bank", country="Test Country", owner=owner)
+    return Account.objects.create(
+        name=name,
+        account_type=account_type,
+        bank=bank,
+        balance=Decimal("1000.00"),
+        currency=currency,
+        owner=owner
+    )
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        username="testuser", password="password", email="testuser@test.com")
+
+
+@pytest.fixture
+def other_user():
+    return User.objects.create_user(
+        username="otheruser", password="password", email="otheruser@test.com")
+
+
+@pytest.mark.django_db
+def test_default_currency_is_cached_per_owner(
+        user, other_user, django_assert_num_queries):
+    # Another user's account comes first, it must not be picked
+    make_account(other_user, "GBP")
+    assert default_currency_id(user.pk) is None
+
+    euro = Currency.objects.create(name="Euro", code="EUR", symbol="€", owner=user)
+    assert default_currency_id(user.pk) == euro.pk
+
+    account = make_account(user, "USD")
+    assert default_currency_id(user.pk) == account.currency_id
+    with django_assert_num_queries(0):
+        assert default_currency_id(user.pk) == account.currency_id
+
+    account.currency = euro
+    account.save()
+    assert default_currency_id(user.pk) == euro.pk
+    account.delete()
+    assert default_currency_id(user.pk) == euro.pk
+
+
+@pytest.mark.django_db
+def test_transactions_get_their_owners_default_currency(
+        user, other_user, django_assert_num_queries):
+    make_account(other_user, "GBP")
+    account = make_account(user, "USD")
+    category = ExpenseCategory.objects.create(name="Food", owner=user)
+
+    with django_assert_num_queries(0):
+        expense = Expense(
+            date=timezone.now(), amount=Decimal("10.00"), account=account,
+            category=category, owner=user)
+    expense.save()
+    assert expense.currency_id == account.currency_id
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    response = client.post(reverse("expense-list"), {
+        "date": datetime.datetime(2024, 1, 5, 12, tzinfo=datetime.timezone.utc),
+        "amount": "5.00",
+        "account": account.id,
+        "category": category.id,
+    })
+    assert response.status_code == 201
+    assert response.json()["currency"] == account.currency_id
+
+
+@pytest.mark.django_db
+def test_transaction_writes_keep_the_default_currency_cached(
+        user, django_assert_num_queries):
+    account = make_account(user, "USD")
+    category = ExpenseCategory.objects.create(name="Food", owner=user)
+    assert default_currency_id(user.pk) == account.currency_id
+
+    # Each write saves the account's new balance
+    for amount in ("10.00", "5.00"):
+        Expense.objects.create(
+            date=timezone.now(), amount=Decimal(amount), account=account,
+            category=category, owner=user)
+        with django_assert_num_queries(0):
+            assert default_currency_id(user.pk) == account.currency_id
@@ -0,0 +1,246 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from finances.history import months_before
+from finances.models import Account, AccountType, Bank, Currency
+from rest_framework.test import APIClient
+from transactions.models import (
+    Expense,
+    ExpenseCategory,
+    Income,
+    IncomeCategory,
+    RecurringExpense,
+    RecurringIncome,
+)
+from transactions.recurring import (
+    detect_recurring,
+    next_occurrence,
+    normalize_description,
+    rebuild_recurring,
+    refresh_recurring,
+)
+
+User = get_user_model()
+
+TODAY = datetime.date(2024, 7, 10)
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        username="testuser", password="password", email="testuser@test.com")
+
+
+@pytest.fixture
+def account(user):
+    currency = Currency.objects.create(
+        name="Dollar", code="USD", symbol="$", owner=user)
+    account_type = AccountType.objects.create(name="Savings", owner=user)
+    bank = Bank.objects.create(name="Test Bank", country="Test Country", owner=user)
+    return Account.objects.create(
+        name="Main Account",
+        account_type=account_type,
+        bank=bank,
+        balance=1000.00,
+        currency=currency,
+        owner=user
+    )
+
+
+@pytest.fixture
+def category(user):
+    return ExpenseCategory.objects.create(name="Subscriptions", owner=user)
+
+
+def columns(*transactions):
+    """detect_recurring() arguments for (category, description, date, amount)"""
+    return [
+        [1] * len(transactions),
+        [category for category, _, _, _ in transactions],
+        [description for _, description, _, _ in transactions],
+        [day for _, _, day, _ in transactions],
+        [amount for _, _, _, amount in transactions],
+        [7] * len(transactions),
+    ]
+
+
+def add_expense(account, category, day, amount, description):
+    return Expense.objects.create(
+        date=timezone.make_aware(datetime.datetime.combine(day, datetime.time(12))),
+        amount=Decimal(amount),
+        currency=account.currency,
+        account=account,
+        category=category,
+        description=description,
+        owner=account.owner,
+    )
+
+
+def test_normalize_description():
+    assert normalize_description("Netflix 03/2024") == "netflix"
+    assert normalize_description("NETFLIX #0424") == "netflix"
+    assert normalize_description("  Rent - Flat 12B ") == "rent flat b"
+    assert normalize_description(None) == ""
+
+
+def test_next_occurrence():
+    day = datetime.date
+    assert next_occurrence(day(2024, 1, 31), "monthly") == day(2024, 2, 29)
+    assert next_occurrence(day(2024, 12, 5), "monthly") == day(2025, 1, 5)
+    assert next_occurrence(day(2024, 2, 29), "yearly") == day(2025, 2, 28)
+    assert next_occurrence(day(2024, 7, 1), "weekly") == day(2024, 7, 8)
+
+
+def test_detects_weekly_monthly_and_yearly_periods():
+    rent = [
+        (1, f"Rent {month:02}/2024", datetime.date(2024, month, day), 1200)
+        for month, day in zip(range(1, 8), [1, 2, 1, 3, 1, 1, 2])
+    ]
+    gym = [
+        (2, "Gym", datetime.date(2024, 6, 3) + datetime.timedelta(weeks=week), 20)
+        for week in range(5)
+    ]
+    insurance = [
+        (1, "Car insurance", datetime.date(year, 3, 15), amount)
+        for year, amount in [(2022, 400), (2023, 420), (2024, 450)]
+    ]
+    shopping = [
+        (1, "Shop", datetime.date(2024, 5, day), 30) for day in [2, 9, 27, 30]
+    ]
+    results = detect_recurring(
+        *columns(*rent, *gym, *insurance, *shopping), today=TODAY)
+
+    assert [
+        (result["category"], result["description"], result["period"],
+         result["amount"], result["occurrences"])
+        for result in results
+    ] == [
+        (1, "rent", "monthly", Decimal("1200.00"), 7),
+        (1, "car insurance", "yearly", Decimal("420.00"), 3),
+        (2, "gym", "weekly", Decimal("20.00"), 5),
+    ]
+    rent_result = results[0]
+    assert rent_result["owner"] == 1
+    assert rent_result["account"] == 7
+    assert rent_result["first_date"] == datetime.date(2024, 1, 1)
+    assert rent_result["last_date"] == datetime.date(2024, 7, 2)
+    assert rent_result["next_date"] == datetime.date(2024, 8, 2)
+
+
+def test_groups_by_owner():
+    data = columns(*[
+        (category, "Transfer", datetime.date(2024, month, 1), 100)
+        for month in range(1, 7) for category in (1, 2)
+    ])
+    # Alternate owners, so that neither owner has a monthly pattern alone
+    data[0] = [1, 1, 2, 2] * 3
+    results = detect_recurring(*data, today=TODAY)
+    assert results == []
+
+
+def test_irregular_amounts_few_transactions_and_stale_groups_are_ignored():
+    varying = [
+        (1, "Electricity", datetime.date(2024, month, 5), amount)
+        for month, amount in zip(range(1, 7), [50, 150, 40, 200, 90, 60])
+    ]
+    too_few = [(2, "Phone", datetime.date(2024, month, 5), 30) for month in (5, 6)]
+    stopped = [
+        (3, "Magazine", datetime.date(2023, month, 5), 10) for month in range(1, 7)]
+    assert detect_recurring(*columns(*varying, *too_few, *stopped), today=TODAY) == []
+    assert detect_recurring(*columns(), today=TODAY) == []
+
+
+@pytest.mark.django_db
+def test_refreshed_on_write(account, category):
+    days = [
+        months_before(timezone.localdate(), offset).replace(day=3)
+        for offset in (2, 1, 0)
+    ]
+    first = add_expense(account, category, days[0], "9.99", "Spotify 1")
+    add_expense(account, category, days[1], "9.99", "Spotify 2")
+    assert not RecurringExpense.objects.exists()
+
+    add_expense(account, category, days[2], "9.99", "SPOTIFY 3")
+    recurring = RecurringExpense.objects.get()
+    assert (recurring.description, recurring.period, recurring.amount,
+            recurring.occurrences) == ("spotify", "monthly", Decimal("9.99"), 3)
+    assert recurring.owner == account.owner
+    assert recurring.category == category
+    assert recurring.last_date == days[2]
+
+    # Groups are read by their stored normalized description alone
+    assert first.normalized_description == "spotify"
+    Expense.objects.filter(pk=first.pk).update(normalized_description="other")
+    assert refresh_recurring(Expense, account.owner_id, category.pk, "Spotify") is None
+    Expense.objects.filter(pk=first.pk).update(normalized_description="spotify")
+
+    # Moving a transaction out of the group refreshes the group it left
+    first.description = "Something else"
+    first.save()
+    assert first.normalized_description == "something else"
+    assert not RecurringExpense.objects.exists()
+
+    first.description = "Spotify"
+    first.save()
+    assert RecurringExpense.objects.get().occurrences == 3
+
+    first.delete()
+    assert not RecurringExpense.objects.exists()
+
+
+@pytest.mark.django_db
+def test_rebuild_recurring(user, account):
+    salary = IncomeCategory.objects.create(name="Salary", owner=user)
+    Income.objects.bulk_create([
+        Income(
+            date=timezone.make_aware(datetime.datetime.combine(
+                months_before(timezone.localdate(), offset), datetime.time(9))),
+            amount=Decimal("3000.00"),
+            currency=account.currency,
+            account=account,
+            category=salary,
+            description="Salary",
+            owner=user,
+        )
+        for offset in range(4)
+    ])
+    # bulk_create skips the signals
+    assert not RecurringIncome.objects.exists()
+
+    assert rebuild_recurring(user) == 1
+    assert set(Income.objects.values_list("normalized_description", flat=True)) == {
+        "salary"}
+    assert RecurringIncome.objects.get().period == "monthly"
+    assert rebuild_recurring() == 1
+    assert RecurringIncome.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_recurring_transactions_view(user, account, category):
+    for offset in (2, 1, 0):
+        add_expense(account, category,
+                    months_before(timezone.localdate(), offset).replace(day=3),
+                    "12.00", "Cloud storage")
+    other = User.objects.create_user(
+        username="other", password="password", email="other@test.com")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("recurring-transactions")
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert [
+        (item["description"], item["period"], item["amount"],
+         item["category"], item["transaction_type"])
+        for item in response.json()
+    ] == [("cloud storage", "monthly", "12.00", category.id, "expense")]
+
+    assert client.get(url, {"transaction_type": "income"}).json() == []
+    assert client.get(url, {"transaction_type": "other"}).status_code == 400
+
+    client.force_authenticate(user=other)
+    assert client.get(url).json() == []
@@ -2,6 +2,7 @@
 
 from itertools import chain
 
+from api.reference import CachedListMixin
 from django.utils import timezone
 
 # from datetime import datetime
@@ -13,17 +14,25 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Expense, ExpenseCategory, Income, IncomeCategory
+from .models import (
+    Expense,
+    ExpenseCategory,
+    Income,
+    IncomeCategory,
+    RecurringExpense,
+    RecurringIncome,
+)
 from .serializers import (
     ExpenseCategorySerializer,
     ExpenseSerializer,
     IncomeCategorySerializer,
     IncomeSerializer,
+    RecurringTransactionSerializer,
     TransactionSerializer,
 )
 
 
-class ExpenseCategoryViewSet(viewsets.ModelViewSet):
+class ExpenseCategoryViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = ExpenseCategory.objects.all()
     serializer_class = ExpenseCategorySerializer
     permission_classes = [IsAuthenticated]
@@ -48,7 +57,7 @@ class ExpenseCategoryViewSet(viewsets.ModelViewSet):
         instance.delete()
 
 
-class IncomeCategoryViewSet(viewsets.ModelViewSet):
+class IncomeCategoryViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = IncomeCategory.objects.all()
     serializer_class = IncomeCategorySerializer
     permission_classes = [IsAuthenticated]
@@ -207,3 +216,29 @@ class CombinedTransactionView(APIView, LimitOffsetPagination):
         results = self.paginate_queryset(combined_transactions, request, view=self)
         serializer = TransactionSerializer(results, many=True)
         return self.get_paginated_response(serializer.data)
+
+
+class RecurringTransactionView(APIView):
+    """
+    Recurring expenses and incomes detected in the user's transactions,
+    soonest expected first. Optionally filtered by transaction_type.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        transaction_type = request.query_params.get('transaction_type')
+        models = {'expense': RecurringExpense, 'income': RecurringIncome}
+        if transaction_type and transaction_type not in models:
+            return Response({'error': 'Invalid transaction_type.'}, status=400)
+
+        recurring = sorted(
+            chain.from_iterable(
+                model.objects.filter(owner=request.user)
+                for name, model in models.items()
+                if not transaction_type or name == transaction_type
+            ),
+            key=lambda instance: (instance.next_date, instance.description),
+        )
+        serializer = RecurringTransactionSerializer(recurring, many=True)
+        return Response(serializer.data)
@@ -1,14 +1,87 @@
-from finances.models import Account
+from decimal import Decimal
+
+from api.reference import invalidate_reference
+from django.contrib.auth import authenticate
+from django.db import transaction
+from django.utils import timezone
+from finances.currencies import invalidate_default_currency
+from finances.models import Account, AccountType, Bank, Currency
 from finances.serializers import AccountSerializer
-from rest_framework import serializers
+from rest_framework import exceptions, serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from reports.forecast import invalidate_forecast
 
 from .models import User
 
 
+def ids_text(ids):
+    return ", ".join(map(str, sorted(ids)))
+
+
+class OwnedRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Account type, bank or currency of a nested account, resolved from the
+    objects of the account's owner loaded in bulk by UserAccountListSerializer
+    instead of one query per item.
+    """
+
+    def to_internal_value(self, data):
+        related = getattr(self.parent, "related", None)
+        if related is None:
+            return super().to_internal_value(data)
+        try:
+            return related[self.field_name][int(data)]
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+
+class UserAccountListSerializer(serializers.ListSerializer):
+    related_fields = ("account_type", "bank", "currency")
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            # Only the user being updated owns what their accounts refer to
+            owner = self.parent.instance
+            related = {}
+            for name in self.related_fields:
+                ids = set()
+                for item in data:
+                    try:
+                        ids.add(int(item.get(name)))
+                    except (AttributeError, TypeError, ValueError):
+                        continue
+                model = Account._meta.get_field(name).related_model
+                related[name] = (
+                    model.objects.filter(owner=owner).in_bulk(ids) if owner else {})
+            self.child.related = related
+        return super().to_internal_value(data)
+
+
+class UserAccountSerializer(AccountSerializer):
+    """An account sent with its owner, identified by its ID if it exists"""
+
+    id = serializers.IntegerField(required=False, allow_null=True)
+    account_type = OwnedRelatedField(queryset=AccountType.objects.all())
+    bank = OwnedRelatedField(queryset=Bank.objects.all())
+    currency = OwnedRelatedField(queryset=Currency.objects.all())
+
+    class Meta(AccountSerializer.Meta):
+        list_serializer_class = UserAccountListSerializer
+
+    def validate(self, attrs):
+        # Names are checked against the other accounts sent along instead
+        return attrs
+
+
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for user model"""
 
-    accounts = AccountSerializer(many=True, read_only=True)
+    accounts = UserAccountSerializer(many=True, required=False)
+    deleted_accounts = serializers.ListField(
+        child=serializers.IntegerField(), write_only=True, required=False)
 
     class Meta:
         model = User
@@ -19,6 +92,7 @@ class UserSerializer(serializers.ModelSerializer):
             "telegram_id",
             "password",
             "accounts",
+            "deleted_accounts",
             "locale",
         ]
         extra_kwargs = {
@@ -31,9 +105,59 @@ class UserSerializer(serializers.ModelSerializer):
     def validate(self, data):
         if not self.instance and not data.get("password"):
             raise serializers.ValidationError({"password": "This field is required."})
+        if "accounts" in data or "deleted_accounts" in data:
+            self.check_accounts_owner()
+        if "accounts" in data:
+            self.validate_account_changes(data["accounts"], data.get("deleted_accounts", []))
+        elif data.get("deleted_accounts"):
+            raise serializers.ValidationError({
+                "deleted_accounts": "Send the accounts to keep along with the ones to delete."})
         return data
 
+    def check_accounts_owner(self):
+        """Only the user themselves may change their accounts"""
+        request = self.context.get("request")
+        if self.instance and (request is None or request.user.pk != self.instance.pk):
+            raise exceptions.PermissionDenied("You can only change your own accounts.")
+
+    def validate_account_changes(self, accounts, deleted):
+        """
+        The sent accounts replace the user's accounts. Every existing
+        account must either be sent with its ID or listed in
+        deleted_accounts, so that none is deleted by leaving it out.
+        """
+        existing = set()
+        if self.instance:
+            existing = set(Account.objects.filter(
+                owner=self.instance).values_list("pk", flat=True))
+        kept = [account["id"] for account in accounts if account.get("id") is not None]
+
+        errors = {}
+        unknown = (set(kept) | set(deleted)) - existing
+        names = [account["name"] for account in accounts if "name" in account]
+        incomplete = [
+            account for account in accounts
+            if account.get("id") is None
+            and not {"name", "account_type", "bank", "currency", "balance"} <= set(account)
+        ]
+        if unknown:
+            errors["accounts"] = f"Unknown accounts: {ids_text(unknown)}."
+        elif len(set(kept)) != len(kept) or set(kept) & set(deleted):
+            errors["accounts"] = "Each account can be sent or deleted only once."
+        elif len(set(names)) != len(names):
+            errors["accounts"] = "You already have an account with this name."
+        elif incomplete:
+            errors["accounts"] = "New accounts need all of their fields."
+        missing = existing - set(kept) - set(deleted)
+        if missing:
+            errors["deleted_accounts"] = (
+                f"Accounts {ids_text(missing)} were not sent; "
+                "list them here to delete them.")
+        if errors:
+            raise serializers.ValidationError(errors)
+
     def create(self, validated_data):
+        validated_data.pop("deleted_accounts", None)
         if "accounts" not in self.initial_data:
             user = User.objects.create_user(**validated_data)
             return user
@@ -47,27 +171,82 @@ class UserSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         """Update user and accounts"""
+        deleted = validated_data.pop("deleted_accounts", [])
         if "accounts" in validated_data:
-            accounts_data = validated_data.pop("accounts")
-            existing_account_ids = [account.id for account in instance.accounts.all()]
+            self.sync_accounts(instance, validated_data.pop("accounts"), deleted)
+
+        return super().update(instance, validated_data)
+
+    @staticmethod
+    def sync_accounts(owner, accounts_data, deleted=()):
+        """
+        Update the owner's accounts sent with their IDs, create the ones sent
+        without and delete the ones with IDs in deleted.
 
-            # Update or create accounts
+        The existing accounts are fetched once and written back in bulk, so
+        the post_save signals of Account do not fire; the owner's caches
+        they would have invalidated are invalidated here.
+        """
+        updated_at = timezone.now()
+        with transaction.atomic():
+            existing = {
+                account.pk: account for account in Account.objects.filter(owner=owner)}
+            to_update, to_create, fields = [], [], {"updated_at"}
             for account_data in accounts_data:
-                account_id = account_data.get("id")
-                if account_id and account_id in existing_account_ids:
-                    account = Account.objects.get(id=account_id, owner=instance)
-                    for attr, value in account_data.items():
-                        setattr(account, attr, value)
-                    account.save()
-                    existing_account_ids.remove(account_id)
-                else:
-                    account_data.pop("owner", None)
-                    Account.objects.create(owner=instance, **account_data)
-            # Delete accounts that were not included in the request
-            for account_id in existing_account_ids:
-                Account.objects.get(id=account_id, owner=instance).delete()
+                account_data = dict(account_data)
+                account_data.pop("owner", None)
+                account = existing.get(account_data.pop("id", None))
+                if account is None:
+                    to_create.append(Account(owner=owner, **account_data))
+                    continue
+                for attr, value in account_data.items():
+                    setattr(account, attr, value)
+                account.updated_at = updated_at
+                fields.update(account_data)
+                to_update.append(account)
 
-        return super().update(instance, validated_data)
+            # Deleted first, so the sent accounts may take their names
+            if deleted:
+                Account.objects.filter(owner=owner, pk__in=deleted).delete()
+            if to_update:
+                Account.objects.bulk_update(to_update, sorted(fields))
+            if to_create:
+                Account.objects.bulk_create(to_create)
+
+        if to_update or to_create:
+            invalidate_reference(Account, owner.pk)
+            invalidate_default_currency(owner.pk)
+            invalidate_forecast(owner.pk)
+        # The prefetched accounts, if any, are out of date
+        getattr(owner, "_prefetched_objects_cache", {}).pop("accounts", None)
+
+
+class CurrentUserSerializer(UserSerializer):
+    """
+    The requesting user with the total balance of their accounts in each
+    currency, computed from the accounts serialized alongside
+    """
+
+    balance_summary = serializers.SerializerMethodField()
+
+    class Meta(UserSerializer.Meta):
+        fields = [*UserSerializer.Meta.fields, "balance_summary"]
+
+    def get_balance_summary(self, obj):
+        totals = {}
+        for account in obj.accounts.all():
+            total = totals.setdefault(account.currency_id, {
+                "currency": account.currency_id,
+                "code": account.currency.code,
+                "balance": Decimal("0.00"),
+                "accounts": 0,
+            })
+            total["balance"] += Decimal(account.balance)
+            total["accounts"] += 1
+        return [
+            {**total, "balance": f"{total['balance']:.2f}"}
+            for total in totals.values()
+        ]
 
 
 class ChangePasswordSerializer(serializers.Serializer):
@@ -88,3 +267,22 @@ class ChangePasswordSerializer(serializers.Serializer):
         user.set_password(new_password)
         user.save()
         return user
+
+
+class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """JWT access and refresh tokens for an email and password"""
+
+    username_field = "email"
+
+    def validate(self, attrs):
+        user = User.objects.filter(email=attrs["email"]).first()
+        self.user = user and authenticate(
+            request=self.context.get("request"),
+            username=getattr(user, User.USERNAME_FIELD),
+            password=attrs["password"],
+        )
+        if not jwt_settings.USER_AUTHENTICATION_RULE(self.user):
+            raise exceptions.AuthenticationFailed(
+                self.error_messages["no_active_account"], "no_active_account")
+        refresh = self.get_token(self.user)
+        return {"refresh": str(refresh), "access": str(refresh.access_token)}
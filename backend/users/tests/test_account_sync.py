@@ -0,0 +1,175 @@
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from finances.currencies import default_currency_id
+from finances.models import (
+    Account,
+    AccountBalanceHistory,
+    AccountType,
+    Bank,
+    Currency,
+    WeeklyBalanceHistory,
+)
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.models import User
+
+
+class AccountSyncTests(APITestCase):
+
+    def setUp(self):
+        caches["reference"].clear()
+        self.url = reverse("user-me")
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="Testpass123")
+        self.client.force_authenticate(user=self.user)
+        self.account_type = AccountType.objects.create(name="Savings", owner=self.user)
+        self.bank = Bank.objects.create(name="Bank", country="USA", owner=self.user)
+        self.usd = Currency.objects.create(
+            name="Dollar", code="USD", symbol="$", owner=self.user)
+        self.eur = Currency.objects.create(
+            name="Euro", code="EUR", symbol="€", owner=self.user)
+        self.main = self.create_account("Main", "100.00")
+        self.cash = self.create_account("Cash", "20.00")
+        self.old = self.create_account("Old", "5.00")
+        AccountBalanceHistory.objects.create(
+            account=self.old, date=date(2024, 1, 3), balance=Decimal("5.00"))
+
+    def create_account(self, name, balance):
+        return Account.objects.create(
+            name=name, balance=Decimal(balance), owner=self.user,
+            account_type=self.account_type, bank=self.bank, currency=self.usd)
+
+    def account_data(self, name, balance, currency=None, **extra):
+        return {
+            "name": name, "balance": balance, "currency": (currency or self.usd).pk,
+            "account_type": self.account_type.pk, "bank": self.bank.pk, **extra,
+        }
+
+    def put(self, accounts, **extra):
+        return self.client.put(self.url, {
+            "username": "testuser", "email": "test@example.com",
+            "accounts": accounts, **extra,
+        }, format="json")
+
+    def names(self):
+        return set(Account.objects.filter(owner=self.user).values_list("name", flat=True))
+
+    def test_updates_creates_and_deletes(self):
+        response = self.put([
+            self.account_data("Main", "150.00", self.eur, id=self.main.pk),
+            self.account_data("Cash", "20.00", id=self.cash.pk),
+            # Takes the name of an account deleted in the same request
+            self.account_data("Old", "1.00"),
+        ], deleted_accounts=[self.old.pk])
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.json())
+        self.assertEqual(
+            {account["name"]: account["balance"] for account in response.json()["accounts"]},
+            {"Main": "150.00", "Cash": "20.00", "Old": "1.00"})
+        self.assertNotIn("deleted_accounts", response.json())
+
+        main = Account.objects.get(pk=self.main.pk)
+        self.assertEqual((main.balance, main.currency), (Decimal("150.00"), self.eur))
+        self.assertGreater(main.updated_at, self.main.updated_at)
+        self.assertNotEqual(Account.objects.get(name="Old").pk, self.old.pk)
+        self.assertFalse(AccountBalanceHistory.objects.filter(account=self.old.pk).exists())
+        self.assertFalse(WeeklyBalanceHistory.objects.filter(account=self.old.pk).exists())
+
+    def test_accounts_left_out_are_not_deleted(self):
+        # Without IDs every account would be replaced
+        response = self.put([
+            self.account_data("Main", "100.00"),
+            self.account_data("Cash", "20.00"),
+        ])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(
+            f"{self.main.pk}, {self.cash.pk}, {self.old.pk}",
+            response.json()["deleted_accounts"][0])
+        self.assertEqual(self.names(), {"Main", "Cash", "Old"})
+
+        response = self.client.patch(
+            self.url, {"deleted_accounts": [self.old.pk]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.names(), {"Main", "Cash", "Old"})
+
+    def test_rejects_other_owners_accounts_and_references(self):
+        other = User.objects.create_user(
+            username="otheruser", email="other@example.com", password="Testpass123")
+        other_bank = Bank.objects.create(name="Bank", country="USA", owner=other)
+        other_account = Account.objects.create(
+            name="Other", balance=Decimal("1.00"), owner=other, bank=other_bank,
+            account_type=AccountType.objects.create(name="Card", owner=other),
+            currency=Currency.objects.create(
+                name="Dollar", code="USD", symbol="$", owner=other))
+        kept = [
+            self.account_data(account.name, "1.00", id=account.pk)
+            for account in (self.main, self.cash, self.old)
+        ]
+
+        response = self.put(
+            [*kept, self.account_data("Other", "1.00", id=other_account.pk)])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("accounts", response.json())
+
+        response = self.put([*kept, {**self.account_data("New", "1.00"), "bank": other_bank.pk}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("bank", response.json()["accounts"][3])
+
+        response = self.put([*kept, self.account_data("Main", "1.00")])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Account.objects.get(pk=other_account.pk).owner, other)
+        self.assertEqual(self.names(), {"Main", "Cash", "Old"})
+
+    def test_queries_do_not_grow_with_accounts(self):
+        def count_queries(new_accounts):
+            kept = [
+                self.account_data(account.name, "1.00", id=account.pk)
+                for account in Account.objects.filter(owner=self.user)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.put(kept + [
+                    self.account_data(f"New {len(kept) + i}", "1.00")
+                    for i in range(new_accounts)
+                ])
+            self.assertEqual(response.status_code, status.HTTP_200_OK, response.json())
+            return len(queries)
+
+        self.assertEqual(count_queries(1), count_queries(10))
+        self.assertEqual(Account.objects.filter(owner=self.user).count(), 14)
+
+    def test_invalidates_owner_caches(self):
+        Account.objects.filter(owner=self.user).delete()
+        self.assertEqual(default_currency_id(self.user.pk), self.usd.pk)
+        self.assertEqual(self.client.get(reverse("account-list")).json()["results"], [])
+
+        response = self.put([self.account_data("Euro", "10.00", self.eur)])
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.json())
+
+        self.assertEqual(default_currency_id(self.user.pk), self.eur.pk)
+        names = [
+            account["name"]
+            for account in self.client.get(reverse("account-list")).json()["results"]
+        ]
+        self.assertEqual(names, ["Euro"])
+
+    def test_other_users_accounts_cannot_be_changed(self):
+        other = User.objects.create_user(
+            username="otheruser", email="other@example.com", password="Testpass123")
+        self.client.force_authenticate(user=other)
+        url = reverse("user-detail", args=[self.user.pk])
+
+        response = self.client.patch(url, {
+            "accounts": [self.account_data("Main", "0.00", id=self.main.pk)],
+            "deleted_accounts": [self.cash.pk, self.old.pk],
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.patch(
+            url, {"deleted_accounts": [self.old.pk]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.assertEqual(self.names(), {"Main", "Cash", "Old"})
+        self.assertEqual(Account.objects.get(pk=self.main.pk).balance, Decimal("100.00"))
@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+from django.urls import reverse
+from finances.models import Account, AccountType, Bank, Currency
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.models import User
+
+
+class CurrentUserTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="Testpass123")
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("user-me")
+        account_type = AccountType.objects.create(name="Savings", owner=self.user)
+        bank = Bank.objects.create(name="Bank", country="USA", owner=self.user)
+        usd = Currency.objects.create(name="Dollar", code="USD", symbol="$", owner=self.user)
+        eur = Currency.objects.create(name="Euro", code="EUR", symbol="€", owner=self.user)
+        for name, balance, currency in [
+            ("Main", "1000.00", usd),
+            ("Cash", "250.50", usd),
+            ("Travel", "80.00", eur),
+        ]:
+            Account.objects.create(
+                name=name, balance=Decimal(balance), owner=self.user,
+                account_type=account_type, bank=bank, currency=currency)
+        self.usd, self.eur = usd, eur
+
+    def test_balance_summary(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(len(data["accounts"]), 3)
+        self.assertEqual(
+            sorted(data["balance_summary"], key=lambda total: total["code"]), [
+                {"currency": self.eur.pk, "code": "EUR", "balance": "80.00", "accounts": 1},
+                {"currency": self.usd.pk, "code": "USD", "balance": "1250.50", "accounts": 2},
+            ])
+
+    def test_accounts_and_summary_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_update_returns_fresh_summary(self):
+        response = self.client.patch(self.url, {"locale": "en_GB"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["locale"], "en_GB")
+        self.assertEqual(len(response.json()["balance_summary"]), 2)
+
+    def test_list_prefetches_accounts(self):
+        other = User.objects.create_user(
+            username="otheruser", email="other@example.com", password="Testpass123")
+        Account.objects.create(
+            name="Other", balance=Decimal("5.00"), owner=other,
+            account_type=AccountType.objects.create(name="Card", owner=other),
+            bank=Bank.objects.create(name="Bank", country="USA", owner=other),
+            currency=Currency.objects.create(
+                name="Dollar", code="USD", symbol="$", owner=other))
+        # Count, users and all their accounts, whatever the number of users
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("user-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("balance_summary", response.json()["results"][0])
@@ -1,4 +1,5 @@
-from django.shortcuts import get_object_or_404
+from django.db.models import Prefetch, prefetch_related_objects
+from finances.models import Account
 from rest_framework import status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -6,14 +7,23 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .models import User
-from .serializers import ChangePasswordSerializer, UserSerializer
+from .serializers import ChangePasswordSerializer, CurrentUserSerializer, UserSerializer
+
+# Accounts serialized with users, with the currencies the summary needs
+ACCOUNTS_PREFETCH = Prefetch(
+    "accounts", queryset=Account.objects.select_related("currency"))
 
 
 # TODO: Add post ability for /me endpoint
 class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all()
+    queryset = User.objects.prefetch_related(ACCOUNTS_PREFETCH)
     serializer_class = UserSerializer
 
+    def get_serializer_class(self):
+        if self.action == "me":
+            return CurrentUserSerializer
+        return super().get_serializer_class()
+
     @action(
         detail=False,
         methods=["get", "put", "patch"],
@@ -22,16 +32,20 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated],
     )
     def me(self, request):
-        user = get_object_or_404(User, pk=request.user.pk)
+        # The authenticated user is already loaded (or loads lazily) and
+        # only needs its accounts, fetched with their currencies in one query
+        user = request.user
 
         if request.method in ["PUT", "PATCH"]:
             serializer = self.get_serializer(
                 user, data=request.data, partial=(request.method == "PATCH"))
             if serializer.is_valid():
                 serializer.save()
+                prefetch_related_objects([user], ACCOUNTS_PREFETCH)
                 return Response(serializer.data, status=status.HTTP_200_OK)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+        prefetch_related_objects([user], ACCOUNTS_PREFETCH)
         serializer = self.get_serializer(user)
         return Response(serializer.data)
 
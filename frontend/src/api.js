@@ -1,12 +1,13 @@
 import axios from 'axios';
-import { fetchAccountTypes, addAccountType, updateAccountType, deleteAccountType, fetchAccounts, addAccount, updateAccount, deleteAccount, fetchAccountBalanceHistory } from './api/account';
+import { fetchAccountTypes, addAccountType, updateAccountType, deleteAccountType, fetchAccounts, addAccount, updateAccount, deleteAccount, fetchAccountBalanceHistory, fetchAccountsBalanceHistory } from './api/account';
 import { fetchLocales, fetchAllPaginatedData } from './api/utils';
 import { fetchBanks, addBank, updateBank, deleteBank } from './api/bank';
 import { fetchCurrencies, addCurrency, updateCurrency, deleteCurrency } from './api/currency';
 import { fetchBudgets, updateBudget, deleteBudget } from './api/budget';
 import { fetchExpenseCategories, fetchIncomeCategories, addCategory, updateCategory, deleteCategory } from './api/category';
-import { fetchExpenses, fetchIncomes, fetchTransactions } from './api/transaction';
-import { loginUser, fetchUserData, changePassword, updateUserData } from './api/user';
+import { fetchExpenses, fetchIncomes, fetchTransactions, fetchRecurringTransactions } from './api/transaction';
+import { loginUser, fetchUserData, fetchBootstrapData, changePassword, updateUserData } from './api/user';
+import { fetchCashflowReport, fetchExpenseBalanceReport, fetchForecastReport, fetchNetWorthReport, fetchPivotReport } from './api/report';
 
 // Base URL for all requests
 const API_BASE_URL = process.env.REACT_APP_API_BASE_URL;
@@ -28,6 +29,7 @@ export {
     updateAccount,
     deleteAccount,
     fetchAccountBalanceHistory,
+    fetchAccountsBalanceHistory,
     fetchLocales,
     fetchAllPaginatedData,
     fetchBanks,
@@ -49,8 +51,15 @@ export {
     fetchExpenses,
     fetchIncomes,
     fetchTransactions,
+    fetchRecurringTransactions,
     loginUser,
     fetchUserData,
+    fetchBootstrapData,
     changePassword,
     updateUserData,
+    fetchCashflowReport,
+    fetchExpenseBalanceReport,
+    fetchForecastReport,
+    fetchNetWorthReport,
+    fetchPivotReport,
 };
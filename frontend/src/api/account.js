@@ -1,4 +1,5 @@
 import api from '../api';
+import { SERIES_MEDIA_TYPE, decodeSeriesReport } from './series';
 import { fetchAllPaginatedData } from './utils';
 
 /**
@@ -144,3 +145,42 @@ export const fetchAccountBalanceHistory = async (accountId, authToken, startDate
     const initialUrl = `${process.env.REACT_APP_API_BASE_URL}/accounts/${accountId}/balance-history/?limit=50&start_date=${startDate}&end_date=${endDate}`;
     return await fetchAllPaginatedData(initialUrl, authToken);
 };
+
+/**
+ * Fetches dense balance series of several accounts from the API.
+ *
+ * @param {Array<number>} accountIds - The account IDs; all accounts when empty.
+ * @param {string} authToken - The authentication token.
+ * @param {string} startDate - The start date.
+ * @param {string} endDate - The end date.
+ * @param {Object} [options] - total (include the summed series), points
+ *     (downsample to at most this many dates) and resolution (day, week,
+ *     month, or auto for the coarsest one that still has `points` dates).
+ * @returns {Promise<Object>} The report: resolution, dates, series
+ *     ({account, values}) aligned with dates and, if requested, the total values.
+ * @throws {Error} If the request fails.
+ */
+export const fetchAccountsBalanceHistory = async (accountIds, authToken, startDate, endDate, options = {}) => {
+    const { total = false, points, resolution } = options;
+    const params = { start: startDate, end: endDate };
+    if (accountIds.length > 0) {
+        params.accounts = accountIds.join(',');
+    }
+    if (total) {
+        params.total = 'true';
+    }
+    if (points) {
+        params.points = points;
+    }
+    if (resolution) {
+        params.resolution = resolution;
+    }
+    const response = await api.get('/accounts/balance-history/', {
+        params,
+        headers: {
+            'Authorization': `Token ${authToken}`,
+            'Accept': SERIES_MEDIA_TYPE,
+        },
+    });
+    return decodeSeriesReport(response.data);
+};
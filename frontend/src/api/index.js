@@ -5,4 +5,4 @@ export * from './bank';
 export * from './account';
 export * from './category';
 export * from './budget';
-export * from './transaction';
\ No newline at end of file
+export * from './transaction';export * from './report';
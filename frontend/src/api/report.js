@@ -0,0 +1,125 @@
+import api from '../api';
+import { SERIES_MEDIA_TYPE, decodeSeriesReport } from './series';
+
+/**
+ * Drops empty report parameters and joins ID arrays with commas.
+ *
+ * @param {Object} params - The report parameters.
+ * @returns {Object} The query parameters.
+ */
+const buildReportParams = (params) => {
+    const query = {};
+    Object.keys(params).forEach((key) => {
+        const value = params[key];
+        if (value === undefined || value === null || value === '') {
+            return;
+        }
+        query[key] = Array.isArray(value) ? value.join(',') : value;
+    });
+    return query;
+};
+
+/**
+ * Fetches transaction totals bucketed by period from the API.
+ *
+ * @param {string} authToken - The authentication token.
+ * @param {Object} params - Report parameters: granularity (day, week or month),
+ *     group_by (category or account), transaction_type, start_date, end_date,
+ *     accounts and categories (arrays of IDs).
+ * @returns {Promise<Array>} The buckets: period, transaction_type, total, count
+ *     and the grouping ID.
+ * @throws {Error} If the request fails.
+ */
+export const fetchCashflowReport = async (authToken, params = {}) => {
+    const response = await api.get('/reports/cashflow/', {
+        params: buildReportParams(params),
+        headers: {
+            'Authorization': `Token ${authToken}`,
+        },
+    });
+    return response.data.results;
+};
+
+/**
+ * Fetches daily expenses per category aligned with daily account balances.
+ *
+ * @param {string} authToken - The authentication token.
+ * @param {Object} params - Report parameters: start_date, end_date, accounts
+ *     and categories (arrays of IDs).
+ * @returns {Promise<Object>} The report: dates, expenses and balances series
+ *     aligned with dates, total_expenses and total_balance.
+ * @throws {Error} If the request fails.
+ */
+export const fetchExpenseBalanceReport = async (authToken, params = {}) => {
+    const response = await api.get('/reports/expense-balance/', {
+        params: buildReportParams(params),
+        headers: {
+            'Authorization': `Token ${authToken}`,
+            'Accept': SERIES_MEDIA_TYPE,
+        },
+    });
+    return decodeSeriesReport(response.data);
+};
+
+/**
+ * Fetches transaction totals as a category (or account) by period matrix.
+ *
+ * @param {string} authToken - The authentication token.
+ * @param {Object} params - Report parameters: granularity (day, week or month),
+ *     group_by (category or account), transaction_type (expense or income),
+ *     start_date, end_date, accounts and categories (arrays of IDs).
+ * @returns {Promise<Object>} The report: periods, rows with values, running
+ *     totals, deltas, shares, total, average and share, and the same totals.
+ * @throws {Error} If the request fails.
+ */
+export const fetchPivotReport = async (authToken, params = {}) => {
+    const response = await api.get('/reports/pivot/', {
+        params: buildReportParams(params),
+        headers: {
+            'Authorization': `Token ${authToken}`,
+        },
+    });
+    return response.data;
+};
+
+/**
+ * Fetches the projected end of month balances of every account.
+ *
+ * @param {string} authToken - The authentication token.
+ * @param {number} months - How many months ahead to project, 1 to 24.
+ * @returns {Promise<Object>} The forecast: periods, accounts with their
+ *     balance, recurring_net, seasonal_net and values, the detected
+ *     recurring incomes and expenses, and the total per period.
+ * @throws {Error} If the request fails.
+ */
+export const fetchForecastReport = async (authToken, months = 6) => {
+    const response = await api.get('/reports/forecast/', {
+        params: { months },
+        headers: {
+            'Authorization': `Token ${authToken}`,
+        },
+    });
+    return response.data;
+};
+
+/**
+ * Fetches the net worth of every account converted to one currency.
+ *
+ * @param {string} authToken - The authentication token.
+ * @param {Object} params - Report parameters: currency (a code, defaults to
+ *     the one most accounts use), start, end and resolution (day, week or month).
+ * @returns {Promise<Object>} The report: currency, dates, series of each
+ *     account with its converted values, the total per date and the current
+ *     total and account balances at today's rates.
+ * @throws {Error} If the request fails.
+ */
+export const fetchNetWorthReport = async (authToken, params = {}) => {
+    const response = await api.get('/reports/net-worth/', {
+        params: buildReportParams(params),
+        headers: {
+            'Authorization': `Token ${authToken}`,
+            'Accept': SERIES_MEDIA_TYPE,
+        },
+    });
+    return decodeSeriesReport(response.data);
+};
@@ -0,0 +1,112 @@
+/**
+ * Media type of the compact series encoding of report responses.
+ */
+export const SERIES_MEDIA_TYPE = 'application/vnd.familybudget.series+json';
+
+/**
+ * Unpacks base64 encoded unsigned LEB128 varints, calling back with each.
+ *
+ * @param {string} encoded - The base64 string.
+ * @param {Function} callback - Called with every number.
+ */
+const forEachVarint = (encoded, callback) => {
+    const binary = atob(encoded);
+    let number = 0;
+    let factor = 1;
+    for (let i = 0; i < binary.length; i++) {
+        const byte = binary.charCodeAt(i);
+        // Multiplication instead of shifts keeps values above 2^31 exact
+        number += (byte & 0x7f) * factor;
+        if (byte & 0x80) {
+            factor *= 128;
+        } else {
+            callback(number);
+            number = 0;
+            factor = 1;
+        }
+    }
+};
+
+/**
+ * Decodes a series of delta encoded minor units.
+ *
+ * @param {string} encoded - The base64 string.
+ * @param {number} scale - The number of decimal places of the amounts.
+ * @returns {Array<number|null>} The values.
+ */
+export const decodeSeriesValues = (encoded, scale) => {
+    const divisor = 10 ** scale;
+    const values = [];
+    let previous = 0;
+    forEachVarint(encoded, (token) => {
+        if (token === 0) {
+            values.push(null);
+            return;
+        }
+        const zigzag = token - 1;
+        previous += zigzag % 2 ? -(zigzag + 1) / 2 : zigzag / 2;
+        values.push(previous / divisor);
+    });
+    return values;
+};
+
+const pad = number => (number < 10 ? `0${number}` : `${number}`);
+
+const daysInMonth = (year, month) => new Date(Date.UTC(year, month, 0)).getUTCDate();
+
+/**
+ * Expands the encoded dates of a report into ISO date strings.
+ *
+ * Counts days on the calendar directly: formatting thousands of Date
+ * objects costs more than decoding all the values.
+ *
+ * @param {Object} dates - start, count and either step or offsets.
+ * @returns {Array<string>} The dates.
+ */
+const decodeSeriesDates = ({ start, count, step, offsets }) => {
+    if (count === 0) {
+        return [];
+    }
+    let [year, month, day] = start.split('-').map(Number);
+    let monthDays = daysInMonth(year, month);
+    const dates = [start];
+    const addDays = (gap) => {
+        day += gap;
+        while (day > monthDays) {
+            day -= monthDays;
+            month += 1;
+            if (month > 12) {
+                month = 1;
+                year += 1;
+            }
+            monthDays = daysInMonth(year, month);
+        }
+        dates.push(`${year}-${pad(month)}-${pad(day)}`);
+    };
+    if (offsets === undefined) {
+        for (let i = 1; i < count; i++) {
+            addDays(step);
+        }
+    } else {
+        forEachVarint(offsets, addDays);
+    }
+    return dates;
+};
+
+/**
+ * Decodes a report returned in the series encoding into the same shape as
+ * the plain JSON response.
+ *
+ * @param {Object} report - The parsed response body.
+ * @returns {Object} The report with dates and series expanded.
+ */
+export const decodeSeriesReport = (report) => {
+    const { scale, encoded, ...data } = report;
+    data.dates = decodeSeriesDates(report.dates);
+    encoded.forEach((key) => {
+        data[key] = Array.isArray(report[key])
+            ? report[key].map(item => ({ ...item, values: decodeSeriesValues(item.values, scale) }))
+            : decodeSeriesValues(report[key], scale);
+    });
+    return data;
+};
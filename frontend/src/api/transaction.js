@@ -95,4 +95,23 @@ export async function updateTransaction(authToken, transactionData) {
     },
   });
   return response.data;
-}
\ No newline at end of file
+}
+
+/**
+ * Fetches the recurring expenses and incomes detected in the user's transactions.
+ *
+ * @param {string} authToken - The authentication token.
+ * @param {string} [transactionType] - Only 'expense' or only 'income'.
+ * @returns {Promise<Array>} Recurring transactions with description, period,
+ *     amount, account, category, occurrences, first_date, last_date and next_date.
+ * @throws {Error} If the request fails.
+ */
+export async function fetchRecurringTransactions(authToken, transactionType) {
+    const response = await api.get('/transactions/recurring/', {
+        params: transactionType ? { transaction_type: transactionType } : {},
+        headers: {
+            Authorization: `Token ${authToken}`,
+        },
+    });
+    return response.data;
+}
@@ -4,7 +4,8 @@ import api from '../api';
  * Fetches user data from the API.
  *
  * @param {string} token - The authentication token.
- * @returns {Promise<Object>} The user data.
+ * @returns {Promise<Object>} The user data, with their accounts and a balance
+ *   summary: the total balance of the accounts in each currency.
  * @throws {Error} If the request fails.
  */
 export const fetchUserData = async (token) => {
@@ -16,6 +17,23 @@ export const fetchUserData = async (token) => {
     return response.data;
 };
 
+/**
+ * Fetches everything the app loads after login in one request.
+ *
+ * @param {string} token - The authentication token.
+ * @returns {Promise<Object>} The user, currencies, account_types, banks,
+ *     accounts, income_categories, expense_categories and budgets.
+ * @throws {Error} If the request fails.
+ */
+export const fetchBootstrapData = async (token) => {
+    const response = await api.get('/bootstrap/', {
+        headers: {
+            'Authorization': `Token ${token}`,
+        },
+    });
+    return response.data;
+};
+
 /**
  * Logs in a user.
  *
@@ -60,7 +78,9 @@ export const changePassword = async (currentPassword, newPassword) => {
 /**
  * Updates the user's data.
  *
- * @param {Object} data - The data to update.
+ * @param {Object} data - The data to update. `accounts`, if given, replaces
+ *   the user's accounts: existing ones are sent with their `id`, and the
+ *   IDs of the ones to delete must be listed in `deleted_accounts`.
  * @returns {Promise<Object>} The updated user data.
  * @throws {Error} If the request fails.
  */
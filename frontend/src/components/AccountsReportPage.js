@@ -1,7 +1,7 @@
 // src/components/AccountsReportPage.js
 import React, { useState, useEffect, useCallback } from 'react';
 import { Form, Button, Row, Col } from 'react-bootstrap';
-import { fetchAccounts, fetchAccountBalanceHistory } from '../api';
+import { fetchAccounts, fetchAccountsBalanceHistory } from '../api';
 import { Line } from 'react-chartjs-2';
 import { useTranslation } from 'react-i18next';
 import {
@@ -26,11 +26,14 @@ ChartJS.register(
     Legend
 );
 
+// More points than this cannot be told apart on the chart
+const CHART_POINTS = 500;
+
 function AccountsReportPage() {
     const { t } = useTranslation();
     const [accounts, setAccounts] = useState([]);
     const [selectedAccounts, setSelectedAccounts] = useState([]);
-    const [balanceHistory, setBalanceHistory] = useState([]);
+    const [report, setReport] = useState(null);
     const [startDate, setStartDate] = useState('');
     const [endDate, setEndDate] = useState('');
     const [showCombinedChart, setShowCombinedChart] = useState(false);
@@ -59,21 +62,11 @@ function AccountsReportPage() {
     const handleFetchBalanceHistory = useCallback(async () => {
         if (selectedAccounts.length > 0 && startDate && endDate) {
             try {
-                const promises = selectedAccounts.map(accountId =>
-                    fetchAccountBalanceHistory(accountId, authToken)
-                        .then(data => ({
-                            accountId,
-                            data: data.filter(entry => {
-                                const entryDate = new Date(entry.date);
-                                const startDateTime = new Date(startDate);
-                                const endDateTime = new Date(new Date(endDate).setHours(23, 59, 59, 999)); // Устанавливаем конец дня для корректной фильтрации
-                                return entryDate >= startDateTime && entryDate <= endDateTime;
-                            })
-                        }))
-                        .catch(() => ({ accountId, data: [] }))
+                const data = await fetchAccountsBalanceHistory(
+                    selectedAccounts, authToken, startDate, endDate,
+                    { total: true, points: CHART_POINTS, resolution: 'auto' }
                 );
-                const results = await Promise.all(promises);
-                setBalanceHistory(results);
+                setReport(data);
             } catch (error) {
                 console.error('Failed to fetch balance history:', error);
             }
@@ -85,23 +78,25 @@ function AccountsReportPage() {
         handleFetchBalanceHistory();
     }, [handleFetchBalanceHistory]);
 
-    const accountsWithData = balanceHistory.filter(history => history.data.length > 0);
-    const accountsWithoutData = balanceHistory.filter(history => history.data.length === 0);
+    // The series are dense and aligned with report.dates; an account without
+    // any known balance in the range only has nulls.
+    const series = report ? report.series : [];
+    const accountsWithData = series.filter(history => history.values.some(value => value !== null));
+    const accountsWithoutData = series.filter(history => history.values.every(value => value === null));
+    const accountName = accountId => accounts.find(acc => acc.id === accountId)?.name || `Account ${accountId}`;
 
     const chartData = {
-        labels: accountsWithData.length > 0 ? accountsWithData[0].data.map(entry => entry.date) : [],
+        labels: report ? report.dates : [],
         datasets: showCombinedChart
             ? [{
                 label: t('combinedBalance'),
-                data: accountsWithData[0].data.map((_, idx) =>
-                    accountsWithData.reduce((sum, history) => sum + (history.data[idx]?.balance || 0), 0)
-                ),
+                data: report.total,
                 borderColor: 'hsl(0, 70%, 50%)',
                 fill: false
             }]
             : accountsWithData.map((history, index) => ({
-                label: accounts.find(acc => acc.id === history.accountId)?.name || `Account ${history.accountId}`,
-                data: history.data.map(entry => entry.balance),
+                label: accountName(history.account),
+                data: history.values,
                 borderColor: `hsl(${index * 60}, 70%, 50%)`,
                 fill: false
             }))
@@ -145,7 +140,7 @@ function AccountsReportPage() {
             )}
             {accountsWithoutData.length > 0 && (
                 <div className="mt-3">
-                    <p>{t('noDataForAccounts')}: {accountsWithoutData.map(history => accounts.find(acc => acc.id === history.accountId)?.name || `Account ${history.accountId}`).join(', ')}</p>
+                    <p>{t('noDataForAccounts')}: {accountsWithoutData.map(history => accountName(history.account)).join(', ')}</p>
                 </div>
             )}
         </div>
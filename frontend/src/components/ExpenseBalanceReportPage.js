@@ -1,7 +1,7 @@
 // src/components/ExpenseBalanceReportPage.js
 import React, { useState, useEffect, useCallback } from 'react';
 import { Form, Button, Row, Col } from 'react-bootstrap';
-import { fetchExpenses, fetchExpenseCategories, fetchAccounts, fetchAccountBalanceHistory } from '../api';
+import { fetchExpenseBalanceReport, fetchExpenseCategories, fetchAccounts } from '../api';
 import { Line } from 'react-chartjs-2';
 import { useTranslation } from 'react-i18next';
 import {
@@ -23,8 +23,7 @@ function ExpenseBalanceReportPage() {
     const [accounts, setAccounts] = useState([]);
     const [selectedExpenseCategories, setSelectedExpenseCategories] = useState([]);
     const [selectedAccounts, setSelectedAccounts] = useState([]);
-    const [expenseData, setExpenseData] = useState([]);
-    const [balanceData, setBalanceData] = useState([]);
+    const [report, setReport] = useState(null);
     const [startDate, setStartDate] = useState('');
     const [endDate, setEndDate] = useState('');
     const [showCombinedChart, setShowCombinedChart] = useState(false);
@@ -54,82 +53,52 @@ function ExpenseBalanceReportPage() {
 
     const handleFetchData = useCallback(async () => {
         try {
-            const [expensesResponse, accountBalances] = await Promise.all([
-                fetchExpenses(authToken),
-                Promise.all(selectedAccounts.map(accountId =>
-                    fetchAccountBalanceHistory(accountId, authToken, startDate, endDate)
-                )),
-            ]);
-    
-            // Извлекаем массив расходов из ответа
-            const expenses = expensesResponse.results || [];
-    
-            // Преобразуем `endDate` к концу дня для корректной фильтрации
-            const endDateTime = new Date(new Date(endDate).setHours(23, 59, 59, 999));
-    
-            // Фильтрация по выбранным категориям и скорректированным датам
-            const filteredExpenses = expenses.filter(expense => {
-                const expenseDate = new Date(expense.date);
-                return selectedExpenseCategories.includes(expense.category) &&
-                    expenseDate >= new Date(startDate) && expenseDate <= endDateTime;
+            // Series come back aligned by date, one per category and account
+            const data = await fetchExpenseBalanceReport(authToken, {
+                start_date: startDate,
+                end_date: endDate,
+                accounts: selectedAccounts,
+                categories: selectedExpenseCategories,
             });
-    
-            const filteredBalances = accountBalances.flat().filter(balance => {
-                const balanceDate = new Date(balance.date);
-                return balanceDate >= new Date(startDate) && balanceDate <= endDateTime;
-            });
-    
-            setExpenseData(filteredExpenses);
-            setBalanceData(filteredBalances);
+            setReport(data);
         } catch (error) {
             console.error('Failed to fetch transactions or balances:', error);
         }
     }, [selectedExpenseCategories, selectedAccounts, startDate, endDate, authToken]);
-    
-    
 
-    const uniqueDates = Array.from(new Set([...expenseData, ...balanceData].map(entry => entry.date.split('T')[0]))).sort();
+    const uniqueDates = report ? report.dates : [];
+    const expenseSeries = report ? report.expenses : [];
+    const balanceSeries = report ? report.balances : [];
 
     const chartData = {
         labels: uniqueDates,
         datasets: [
-            ...selectedExpenseCategories.map((categoryId, index) => ({
-                label: expenseCategories.find(cat => cat.id === categoryId)?.name || `Expense Category ${categoryId}`,
-                data: uniqueDates.map(date => expenseData
-                    .filter(exp => exp.date.startsWith(date) && exp.category === categoryId)
-                    .reduce((sum, exp) => sum + parseFloat(exp.amount || 0), 0)),
+            ...expenseSeries.map((series, index) => ({
+                label: expenseCategories.find(cat => cat.id === series.category)?.name || `Expense Category ${series.category}`,
+                data: series.values,
                 borderColor: `hsl(${index * 60}, 70%, 50%)`,
                 fill: false,
             })),
-            ...selectedAccounts.map((accountId, index) => ({
-                label: accounts.find(acc => acc.id === accountId)?.name || `Account ${accountId}`,
-                data: uniqueDates.map(date => balanceData
-                    .filter(bal => bal.date.startsWith(date) && bal.account === accountId)
-                    .reduce((sum, bal) => sum + parseFloat(bal.balance || 0), 0)),
+            ...balanceSeries.map((series, index) => ({
+                label: accounts.find(acc => acc.id === series.account)?.name || `Account ${series.account}`,
+                data: series.values,
                 borderColor: `hsl(${index * 60 + 120}, 70%, 50%)`,
                 fill: false,
             }))
         ]
     };
 
-    if (showCombinedChart) {
-        const combinedExpenses = uniqueDates.map(date => expenseData
-            .filter(exp => exp.date.startsWith(date))
-            .reduce((sum, exp) => sum + parseFloat(exp.amount || 0), 0));
-        const combinedBalances = uniqueDates.map(date => balanceData
-            .filter(bal => bal.date.startsWith(date))
-            .reduce((sum, bal) => sum + parseFloat(bal.balance || 0), 0));
-
+    if (showCombinedChart && report) {
         chartData.datasets = [
             {
                 label: t('combinedExpenses'),
-                data: combinedExpenses,
+                data: report.total_expenses,
                 borderColor: 'hsl(0, 70%, 50%)',
                 fill: false,
             },
             {
                 label: t('combinedBalances'),
-                data: combinedBalances,
+                data: report.total_balance,
                 borderColor: 'hsl(120, 70%, 50%)',
                 fill: false,
             }
@@ -181,7 +150,7 @@ function ExpenseBalanceReportPage() {
                 </Form.Group>
                 <Button onClick={handleFetchData}>{t('showReport')}</Button>
             </Form>
-            {(expenseData.length > 0 || balanceData.length > 0) ? (
+            {(expenseSeries.length > 0 || balanceSeries.length > 0) ? (
                 <Line data={chartData} />
             ) : (
                 <p>{t('noDataForSelectedCategories')}</p>
@@ -1,7 +1,7 @@
 // src/components/TransactionsReportPage.js
 import React, { useState, useEffect, useCallback } from 'react';
 import { Form, Button, Row, Col } from 'react-bootstrap';
-import { fetchExpenses, fetchIncomes, fetchExpenseCategories, fetchIncomeCategories } from '../api';
+import { fetchCashflowReport, fetchExpenseCategories, fetchIncomeCategories } from '../api';
 import { Line } from 'react-chartjs-2';
 import { useTranslation } from 'react-i18next';
 import {
@@ -55,36 +55,35 @@ function TransactionsReportPage() {
 
     const handleFetchTransactions = useCallback(async () => {
         try {
-            const [expensesResponse, incomesResponse] = await Promise.all([
-                fetchExpenses(authToken),
-                fetchIncomes(authToken)
-            ]);
-    
-            const expenses = expensesResponse.results || [];
-            const incomes = incomesResponse.results || [];
-    
-            const filteredExpenses = expenses.filter(expense => {
-                const expenseDate = new Date(expense.date.split('T')[0]);
-                return expenseDate >= new Date(startDate) && expenseDate <= new Date(endDate);
+            // Daily totals per category are summed on the server
+            const buckets = await fetchCashflowReport(authToken, {
+                granularity: 'day',
+                group_by: 'category',
+                start_date: startDate,
+                end_date: endDate,
             });
-    
-            const filteredIncomes = incomes.filter(income => {
-                const incomeDate = new Date(income.date.split('T')[0]);
-                return incomeDate >= new Date(startDate) && incomeDate <= new Date(endDate);
-            });
-    
-            setExpenseData(filteredExpenses);
-            setIncomeData(filteredIncomes);
-    
+
+            setExpenseData(buckets.filter(bucket => bucket.transaction_type === 'expense'));
+            setIncomeData(buckets.filter(bucket => bucket.transaction_type === 'income'));
+
         } catch (error) {
             console.error('Failed to fetch transactions:', error);
         }
     }, [startDate, endDate, authToken]);
-    
+
+    const sumByDate = (buckets, categoryId) => {
+        const totals = {};
+        buckets.forEach(bucket => {
+            if (categoryId === undefined || bucket.category === categoryId) {
+                totals[bucket.period] = (totals[bucket.period] || 0) + parseFloat(bucket.total);
+            }
+        });
+        return totals;
+    };
 
     const uniqueDates = Array.from(new Set([
-        ...expenseData.map(entry => entry.date.split('T')[0]),
-        ...incomeData.map(entry => entry.date.split('T')[0])
+        ...expenseData.map(entry => entry.period),
+        ...incomeData.map(entry => entry.period)
     ])).sort();
 
     const getMonthlyAnnotations = () => {
@@ -119,28 +118,24 @@ function TransactionsReportPage() {
     const chartData = {
         labels: uniqueDates,
         datasets: [
-            ...selectedExpenseCategories.map((categoryId, index) => ({
-                label: expenseCategories.find(cat => cat.id === categoryId)?.name || `Expense Category ${categoryId}`,
-                data: uniqueDates.map(date => {
-                    const total = expenseData
-                        .filter(exp => exp.category === categoryId && exp.date.startsWith(date))
-                        .reduce((sum, exp) => sum + parseFloat(exp.amount), 0);
-                    return total;
-                }),
-                borderColor: `hsl(${index * 60}, 70%, 50%)`,
-                fill: false,
-            })),
-            ...selectedIncomeCategories.map((categoryId, index) => ({
-                label: incomeCategories.find(cat => cat.id === categoryId)?.name || `Income Category ${categoryId}`,
-                data: uniqueDates.map(date => {
-                    const total = incomeData
-                        .filter(inc => inc.category === categoryId && inc.date.startsWith(date))
-                        .reduce((sum, inc) => sum + parseFloat(inc.amount), 0);
-                    return total;
-                }),
-                borderColor: `hsl(${index * 60 + 120}, 70%, 50%)`,
-                fill: false,
-            }))
+            ...selectedExpenseCategories.map((categoryId, index) => {
+                const totals = sumByDate(expenseData, categoryId);
+                return {
+                    label: expenseCategories.find(cat => cat.id === categoryId)?.name || `Expense Category ${categoryId}`,
+                    data: uniqueDates.map(date => totals[date] || 0),
+                    borderColor: `hsl(${index * 60}, 70%, 50%)`,
+                    fill: false,
+                };
+            }),
+            ...selectedIncomeCategories.map((categoryId, index) => {
+                const totals = sumByDate(incomeData, categoryId);
+                return {
+                    label: incomeCategories.find(cat => cat.id === categoryId)?.name || `Income Category ${categoryId}`,
+                    data: uniqueDates.map(date => totals[date] || 0),
+                    borderColor: `hsl(${index * 60 + 120}, 70%, 50%)`,
+                    fill: false,
+                };
+            })
         ]
     };
 
@@ -153,17 +148,10 @@ function TransactionsReportPage() {
     };
 
     if (showCombinedChart) {
-        const combinedExpenseData = uniqueDates.map(date => {
-            return expenseData
-                .filter(exp => exp.date.startsWith(date))
-                .reduce((sum, exp) => sum + parseFloat(exp.amount), 0);
-        });
-
-        const combinedIncomeData = uniqueDates.map(date => {
-            return incomeData
-                .filter(inc => inc.date.startsWith(date))
-                .reduce((sum, inc) => sum + parseFloat(inc.amount), 0);
-        });
+        const expenseTotals = sumByDate(expenseData);
+        const incomeTotals = sumByDate(incomeData);
+        const combinedExpenseData = uniqueDates.map(date => expenseTotals[date] || 0);
+        const combinedIncomeData = uniqueDates.map(date => incomeTotals[date] || 0);
 
         chartData.datasets = [
             {